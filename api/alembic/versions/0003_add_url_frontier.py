@@ -0,0 +1,41 @@
+"""add url frontier for incremental discovery
+
+Revision ID: 0003_add_url_frontier
+Revises: 0002_add_vertical_columns
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_add_url_frontier"
+down_revision: str | None = "0002_add_vertical_columns"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "url_frontier",
+        sa.Column("id", sa.String(length=36), primary_key=True),
+        sa.Column("retailer_id", sa.Integer(), sa.ForeignKey("retailers.id"), nullable=False),
+        sa.Column("url", sa.Text(), nullable=False),
+        sa.Column("first_seen_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("sitemap_lastmod", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_fetched_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_changed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint("retailer_id", "url", name="uq_url_frontier_retailer_url"),
+    )
+
+    op.create_index("ix_url_frontier_retailer_id", "url_frontier", ["retailer_id"])
+    op.create_index("ix_url_frontier_last_fetched_at", "url_frontier", ["last_fetched_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_url_frontier_last_fetched_at", table_name="url_frontier")
+    op.drop_index("ix_url_frontier_retailer_id", table_name="url_frontier")
+    op.drop_table("url_frontier")
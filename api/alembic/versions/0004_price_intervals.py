@@ -0,0 +1,46 @@
+"""collapse unchanged observations into price intervals
+
+Revision ID: 0004_price_intervals
+Revises: 0003_add_url_frontier
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_price_intervals"
+down_revision: str | None = "0003_add_url_frontier"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("prices", sa.Column("last_seen_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("prices", sa.Column("observed_count", sa.Integer(), nullable=False, server_default="1"))
+    op.execute("UPDATE prices SET last_seen_at = captured_at")
+
+    with op.batch_alter_table("latest_prices") as batch_op:
+        batch_op.add_column(sa.Column("price_id", sa.String(length=36), nullable=True))
+        batch_op.create_foreign_key("fk_latest_prices_price_id", "prices", ["price_id"], ["id"])
+    op.execute(
+        """
+        UPDATE latest_prices SET price_id = (
+            SELECT prices.id FROM prices
+            WHERE prices.retailer_product_id = latest_prices.retailer_product_id
+            ORDER BY prices.captured_at DESC
+            LIMIT 1
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("latest_prices") as batch_op:
+        batch_op.drop_constraint("fk_latest_prices_price_id", type_="foreignkey")
+        batch_op.drop_column("price_id")
+
+    op.drop_column("prices", "observed_count")
+    op.drop_column("prices", "last_seen_at")
@@ -0,0 +1,25 @@
+"""count product detail views for recrawl priority
+
+Revision ID: 0005_product_view_count
+Revises: 0004_price_intervals
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_product_view_count"
+down_revision: str | None = "0004_price_intervals"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("view_count", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("products", "view_count")
@@ -0,0 +1,30 @@
+"""record processed items per ingestion run for resume
+
+Revision ID: 0006_ingestion_run_items
+Revises: 0005_product_view_count
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_ingestion_run_items"
+down_revision: str | None = "0005_product_view_count"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ingestion_run_items",
+        sa.Column("run_id", sa.String(length=36), sa.ForeignKey("ingestion_runs.id"), primary_key=True),
+        sa.Column("source_product_id", sa.String(length=256), primary_key=True),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ingestion_run_items")
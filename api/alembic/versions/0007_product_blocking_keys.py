@@ -0,0 +1,37 @@
+"""add blocking keys for fuzzy product matching
+
+Revision ID: 0007_product_blocking_keys
+Revises: 0006_ingestion_run_items
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_product_blocking_keys"
+down_revision: str | None = "0006_ingestion_run_items"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Rows are filled by the worker: products without keys are indexed on its next run.
+    op.create_table(
+        "product_blocking_keys",
+        sa.Column("product_id", sa.String(length=36), sa.ForeignKey("products.id"), primary_key=True),
+        sa.Column("key", sa.String(length=64), primary_key=True),
+        sa.Column("vertical", sa.String(length=32), nullable=False),
+        sa.Column("brand", sa.String(length=128), nullable=False),
+        sa.Column("category", sa.String(length=128), nullable=False),
+    )
+    op.create_index(
+        "ix_product_blocking_keys_block", "product_blocking_keys", ["vertical", "brand", "category", "key"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_product_blocking_keys_block", table_name="product_blocking_keys")
+    op.drop_table("product_blocking_keys")
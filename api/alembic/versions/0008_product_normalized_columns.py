@@ -0,0 +1,87 @@
+"""add normalized name and identifier key columns to products
+
+Revision ID: 0008_product_normalized_columns
+Revises: 0007_product_blocking_keys
+Create Date: 2026-10-17
+"""
+
+import re
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_product_normalized_columns"
+down_revision: str | None = "0007_product_blocking_keys"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+BACKFILL_BATCH_SIZE = 1000
+KEY_COLUMNS = ("normalized_name", "name_tokens", "gtin_key", "mpn_key", "model_key")
+
+
+# Copies of worker.matching.normalization as of this revision.
+def _normalize_text(value: str | None) -> str:
+    if not value:
+        return ""
+    clean = re.sub(r"[^A-Z0-9 ]", " ", value.strip().upper())
+    return re.sub(r"\s+", " ", clean)
+
+
+def _normalize_identifier(value: str | None) -> str | None:
+    if not value:
+        return None
+    clean = re.sub(r"[^A-Z0-9/-]", "", value.upper().strip()).replace("//", "/")
+    return clean or None
+
+
+def upgrade() -> None:
+    op.add_column("products", sa.Column("normalized_name", sa.String(length=512), nullable=False, server_default=""))
+    op.add_column("products", sa.Column("name_tokens", sa.String(length=512), nullable=False, server_default=""))
+    op.add_column("products", sa.Column("gtin_key", sa.String(length=64), nullable=True))
+    op.add_column("products", sa.Column("mpn_key", sa.String(length=128), nullable=True))
+    op.add_column("products", sa.Column("model_key", sa.String(length=128), nullable=True))
+
+    products = sa.table(
+        "products",
+        sa.column("id", sa.String),
+        sa.column("canonical_name", sa.String),
+        sa.column("gtin", sa.String),
+        sa.column("mpn", sa.String),
+        sa.column("model_number", sa.String),
+        *(sa.column(name, sa.String) for name in KEY_COLUMNS),
+    )
+    update = (
+        products.update()
+        .where(products.c.id == sa.bindparam("product_id"))
+        .values({name: sa.bindparam(f"new_{name}") for name in KEY_COLUMNS})
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(products.c.id, products.c.canonical_name, products.c.gtin, products.c.mpn, products.c.model_number)
+    ).all()
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        params = []
+        for product_id, canonical_name, gtin, mpn, model_number in rows[start : start + BACKFILL_BATCH_SIZE]:
+            name = _normalize_text(canonical_name)
+            params.append(
+                {
+                    "product_id": product_id,
+                    "new_normalized_name": name,
+                    "new_name_tokens": " ".join(sorted(set(name.split()))),
+                    "new_gtin_key": _normalize_identifier(gtin),
+                    "new_mpn_key": _normalize_identifier(mpn),
+                    "new_model_key": _normalize_identifier(model_number),
+                }
+            )
+        bind.execute(update, params)
+
+    for name in KEY_COLUMNS:
+        op.create_index(f"ix_products_{name}", "products", [name])
+
+
+def downgrade() -> None:
+    for name in reversed(KEY_COLUMNS):
+        op.drop_index(f"ix_products_{name}", table_name="products")
+        op.drop_column("products", name)
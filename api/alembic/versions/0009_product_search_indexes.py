@@ -0,0 +1,44 @@
+"""index product search predicates
+
+Revision ID: 0009_product_search_indexes
+Revises: 0008_product_normalized_columns
+Create Date: 2026-10-17
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_product_search_indexes"
+down_revision: str | None = "0008_product_normalized_columns"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+IDENTIFIER_KEYS = ("gtin_key", "mpn_key", "model_key")
+
+
+def upgrade() -> None:
+    # Search matches names by substring, which B-tree indexes cannot serve, and nothing looks up name_tokens.
+    op.drop_index("ix_products_name_tokens", table_name="products")
+    op.drop_index("ix_products_normalized_name", table_name="products")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_products_normalized_name_trgm ON products USING gin (normalized_name gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX ix_products_searchable_text_trgm ON products USING gin (lower(searchable_text) gin_trgm_ops)"
+        )
+        # Partial model numbers and MPNs match the identifier keys by substring.
+        for column in IDENTIFIER_KEYS:
+            op.execute(f"CREATE INDEX ix_products_{column}_trgm ON products USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for column in IDENTIFIER_KEYS:
+            op.drop_index(f"ix_products_{column}_trgm", table_name="products")
+        op.drop_index("ix_products_searchable_text_trgm", table_name="products")
+        op.drop_index("ix_products_normalized_name_trgm", table_name="products")
+    op.create_index("ix_products_normalized_name", "products", ["normalized_name"])
+    op.create_index("ix_products_name_tokens", "products", ["name_tokens"])
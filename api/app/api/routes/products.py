@@ -1,9 +1,9 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.schemas.products import ProductDetailOut, ProductsListOut
-from app.services.details import get_product_detail
+from app.services.details import flush_product_views_task, get_product_detail, record_product_view
 from app.services.search import ProductSearchParams, search_products
 
 router = APIRouter(prefix="/v1/products", tags=["products"])
@@ -46,7 +46,11 @@ def list_products(
 @router.get("/{product_id}", response_model=ProductDetailOut)
 def product_detail(
     product_id: str,
+    background_tasks: BackgroundTasks,
     include_history: bool = Query(default=False),
     db: Session = Depends(get_db),
 ) -> ProductDetailOut:
-    return get_product_detail(db, product_id=product_id, include_history=include_history)
+    detail = get_product_detail(db, product_id=product_id, include_history=include_history)
+    if record_product_view(product_id):
+        background_tasks.add_task(flush_product_views_task)
+    return detail
@@ -1,4 +1,6 @@
 import json
+import threading
+from collections import Counter, defaultdict
 from dataclasses import dataclass
 from typing import Any
 
@@ -18,6 +20,8 @@ class CacheClient:
     def __init__(self) -> None:
         self.settings = get_settings()
         self._fallback: dict[str, str] = {}
+        self._counters: defaultdict[str, Counter[str]] = defaultdict(Counter)
+        self._counter_lock = threading.Lock()
         self._redis: Redis | None = None
         if self.settings.cache_enabled:
             try:
@@ -49,5 +53,31 @@ class CacheClient:
         except RedisError:
             self._fallback[key] = encoded
 
+    def increment(self, key: str, field: str, amount: int = 1) -> None:
+        try:
+            if self._redis:
+                self._redis.hincrby(key, field, amount)
+                return
+        except RedisError:
+            pass
+        with self._counter_lock:
+            self._counters[key][field] += amount
+
+    def drain_counts(self, key: str) -> dict[str, int]:
+        """Returns and resets the counts under ``key``; each increment is returned by exactly one drain."""
+        counts: Counter[str] = Counter()
+        try:
+            if self._redis:
+                pipeline = self._redis.pipeline()
+                pipeline.hgetall(key)
+                pipeline.delete(key)
+                values, _ = pipeline.execute()
+                counts.update({field: int(value) for field, value in values.items()})
+        except RedisError:
+            pass
+        with self._counter_lock:
+            counts.update(self._counters.pop(key, Counter()))
+        return dict(counts)
+
 
 cache_client = CacheClient()
@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     cache_enabled: bool = True
     admin_token: str = "dev-admin-token"
     cache_schema_version: str = "1"
+    # Detail views are counted in the cache and written to products at most this often.
+    view_flush_interval_seconds: float = 30.0
 
     model_config = SettingsConfigDict(env_file=".env", env_prefix="WORTHIT_")
 
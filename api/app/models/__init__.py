@@ -1,11 +1,25 @@
-from app.models.entities import IngestionRun, LatestPrice, Price, Product, ProductOverride, Retailer, RetailerProduct
+from app.models.entities import (
+    IngestionRun,
+    IngestionRunItem,
+    LatestPrice,
+    Price,
+    Product,
+    ProductBlockingKey,
+    ProductOverride,
+    Retailer,
+    RetailerProduct,
+    UrlFrontier,
+)
 
 __all__ = [
     "IngestionRun",
+    "IngestionRunItem",
     "LatestPrice",
     "Price",
     "Product",
+    "ProductBlockingKey",
     "ProductOverride",
     "Retailer",
     "RetailerProduct",
+    "UrlFrontier",
 ]
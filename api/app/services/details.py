@@ -1,13 +1,16 @@
 from __future__ import annotations
 
 import hashlib
+import threading
+import time
 
-from sqlalchemy import desc, func, select
+from sqlalchemy import bindparam, desc, func, select, update
 from sqlalchemy.orm import Session
 
 from app.core.cache import cache_client
 from app.core.config import get_settings
 from app.core.errors import ApiError, AppHTTPException
+from app.db.session import SessionLocal
 from app.models import LatestPrice, Price, Product, Retailer, RetailerProduct
 from app.schemas.products import OfferOut, ProductDetailOut
 from app.services.value_scoring import compute_value_score
@@ -19,6 +22,52 @@ def _detail_cache_key(product_id: str, include_history: bool, vertical: str | No
     return f"product:{digest}:v:{settings.cache_schema_version}"
 
 
+VIEW_COUNTS_KEY = "product:views"
+HISTORY_LIMIT = 200
+_views_flushed_at = time.monotonic()
+_views_flush_lock = threading.Lock()
+
+
+def record_product_view(product_id: str) -> bool:
+    """Buffers a detail view in the cache; returns True for the one request that should schedule a flush."""
+    global _views_flushed_at
+    cache_client.increment(VIEW_COUNTS_KEY, product_id)
+    with _views_flush_lock:
+        now = time.monotonic()
+        if now - _views_flushed_at < get_settings().view_flush_interval_seconds:
+            return False
+        _views_flushed_at = now
+        return True
+
+
+def flush_product_views(db: Session) -> int:
+    """Adds buffered views to ``Product.view_count``; the worker's recrawl queue favours products people look at."""
+    counts = cache_client.drain_counts(VIEW_COUNTS_KEY)
+    if not counts:
+        return 0
+    products = Product.__table__
+    try:
+        db.execute(
+            update(products)
+            .where(products.c.id == bindparam("product_id"))
+            .values(view_count=products.c.view_count + bindparam("views")),
+            [{"product_id": product_id, "views": views} for product_id, views in counts.items()],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        for product_id, views in counts.items():
+            cache_client.increment(VIEW_COUNTS_KEY, product_id, views)
+        raise
+    return len(counts)
+
+
+def flush_product_views_task() -> int:
+    """Background-task entry point; the request's session is closed by the time it runs."""
+    with SessionLocal() as db:
+        return flush_product_views(db)
+
+
 def get_product_detail(
     db: Session,
     product_id: str,
@@ -102,33 +151,44 @@ def get_product_detail(
                 Price.promo_text,
                 Price.discount_pct,
                 Price.captured_at,
+                Price.last_seen_at,
             )
             .join(RetailerProduct, RetailerProduct.id == Price.retailer_product_id)
             .join(Retailer, Retailer.id == RetailerProduct.retailer_id)
             .where(RetailerProduct.product_id == product_id)
-            .order_by(desc(Price.captured_at))
-            .limit(200)
+            # The newest HISTORY_LIMIT points all come from the intervals seen most recently.
+            .order_by(desc(func.coalesce(Price.last_seen_at, Price.captured_at)))
+            .limit(HISTORY_LIMIT)
         )
         if vertical:
             history_query = history_query.where(Retailer.vertical == vertical)
 
         history_rows = db.execute(history_query).all()
-        history = [
-            OfferOut(
-                retailer=row.slug,
-                retailer_product_id=row.rp_id,
-                title=row.title,
-                url=row.url,
-                image_url=row.image_url,
-                availability=row.availability,
-                price_nzd=float(row.price_nzd),
-                promo_price_nzd=float(row.promo_price_nzd) if row.promo_price_nzd is not None else None,
-                promo_text=row.promo_text,
-                discount_pct=float(row.discount_pct) if row.discount_pct is not None else None,
-                captured_at=row.captured_at,
+        history = []
+        # Each row is an interval of identical observations; emit its last and first
+        # sighting so the timeline keeps both ends of every flat stretch.
+        for row in history_rows:
+            seen_at = [row.captured_at]
+            if row.last_seen_at is not None and row.last_seen_at != row.captured_at:
+                seen_at.insert(0, row.last_seen_at)
+            history.extend(
+                OfferOut(
+                    retailer=row.slug,
+                    retailer_product_id=row.rp_id,
+                    title=row.title,
+                    url=row.url,
+                    image_url=row.image_url,
+                    availability=row.availability,
+                    price_nzd=float(row.price_nzd),
+                    promo_price_nzd=float(row.promo_price_nzd) if row.promo_price_nzd is not None else None,
+                    promo_text=row.promo_text,
+                    discount_pct=float(row.discount_pct) if row.discount_pct is not None else None,
+                    captured_at=captured_at,
+                )
+                for captured_at in seen_at
             )
-            for row in history_rows
-        ]
+        history.sort(key=lambda offer: offer.captured_at, reverse=True)
+        del history[HISTORY_LIMIT:]
 
     payload = ProductDetailOut(
         id=product.id,
@@ -11,6 +11,7 @@ from app.core.cache import cache_client
 from app.core.config import get_settings
 from app.models import LatestPrice, Product, Retailer, RetailerProduct
 from app.schemas.products import OfferOut, ProductListItemOut, ProductsListOut
+from app.services.normalization import normalize_identifier, normalize_text
 from app.services.value_scoring import compute_value_score
 
 
@@ -97,6 +98,14 @@ def _best_offer_for_product(db: Session, product_id: str) -> OfferOut | None:
     return _offer_from_row(row)
 
 
+def _identifier_match(q: str) -> Any:
+    identifier = normalize_identifier(q)
+    if not identifier:
+        return None
+    pattern = f"%{identifier}%"
+    return or_(Product.gtin_key.like(pattern), Product.mpn_key.like(pattern), Product.model_key.like(pattern))
+
+
 def search_products(db: Session, params: ProductSearchParams) -> ProductsListOut:
     key = _build_cache_key(params)
     cached = cache_client.get_json(key)
@@ -127,15 +136,15 @@ def search_products(db: Session, params: ProductSearchParams) -> ProductsListOut
     if params.vertical:
         filters.append(Product.vertical == params.vertical)
     if params.q:
-        term = f"%{params.q.lower()}%"
-        filters.append(
-            or_(
-                func.lower(Product.canonical_name).like(term),
-                func.lower(Product.searchable_text).like(term),
-                func.lower(func.coalesce(Product.model_number, "")).like(term),
-                func.lower(func.coalesce(Product.mpn, "")).like(term),
-            )
-        )
+        # On Postgres every substring match here is served by a trigram index.
+        matches = [func.lower(Product.searchable_text).like(f"%{params.q.lower()}%")]
+        name = normalize_text(params.q).strip()
+        if name:
+            matches.append(Product.normalized_name.like(f"%{name}%"))
+        identifier_match = _identifier_match(params.q)
+        if identifier_match is not None:
+            matches.append(identifier_match)
+        filters.append(or_(*matches))
     if params.category:
         filters.append(Product.category == params.category)
     if params.brand:
@@ -171,10 +180,12 @@ def search_products(db: Session, params: ProductSearchParams) -> ProductsListOut
     elif params.sort == "discount_desc":
         stmt = stmt.order_by(func.max(LatestPrice.discount_pct).desc().nullslast(), Product.canonical_name.asc())
     elif params.sort == "relevance" and params.q:
-        term = f"%{params.q.lower()}%"
-        relevance = case((func.lower(Product.canonical_name).like(term), 2), else_=0) + case(
-            (func.lower(Product.searchable_text).like(term), 1), else_=0
+        relevance = case((Product.normalized_name.like(f"%{normalize_text(params.q).strip()}%"), 2), else_=0) + case(
+            (func.lower(Product.searchable_text).like(f"%{params.q.lower()}%"), 1), else_=0
         )
+        identifier_match = _identifier_match(params.q)
+        if identifier_match is not None:
+            relevance = relevance + case((identifier_match, 2), else_=0)
         stmt = stmt.order_by(relevance.desc(), func.min(effective_price).asc())
     else:
         stmt = stmt.order_by(Product.canonical_name.asc())
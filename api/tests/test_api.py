@@ -1,3 +1,21 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from app.core.cache import cache_client
+from app.core.config import get_settings
+from app.models import Price, Product, Retailer, RetailerProduct
+from app.services import details
+from app.services.details import flush_product_views
+from app.services.normalization import normalize_identifier, normalize_text
+
+
 def test_products_list(client):
     response = client.get("/v1/products", params={"q": "acer", "sort": "price_asc"})
     assert response.status_code == 200
@@ -126,3 +144,175 @@ def test_admin_ingestion_runs(client):
     assert response.status_code == 200
     payload = response.json()
     assert payload[0]["status"] == "completed"
+
+
+def test_product_detail_history_expands_price_intervals(client, session):
+    product = session.query(Product).filter(Product.canonical_name == "Acer Nitro 16 Laptop").one()
+    listing = (
+        session.query(RetailerProduct)
+        .join(Retailer, Retailer.id == RetailerProduct.retailer_id)
+        .filter(RetailerProduct.product_id == product.id, Retailer.slug == "pb-tech")
+        .one()
+    )
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    session.add_all(
+        [
+            Price(
+                retailer_product_id=listing.id,
+                price_nzd=Decimal("2099.00"),
+                captured_at=start,
+                last_seen_at=start + timedelta(days=6),
+                observed_count=7,
+            ),
+            Price(
+                retailer_product_id=listing.id,
+                price_nzd=Decimal("1999.00"),
+                captured_at=start + timedelta(days=7),
+                last_seen_at=start + timedelta(days=7),
+                observed_count=1,
+            ),
+        ]
+    )
+    session.commit()
+
+    response = client.get(f"/v1/products/{product.id}", params={"include_history": True})
+    assert response.status_code == 200
+    history = [(point["price_nzd"], point["captured_at"][:10]) for point in response.json()["history"]]
+    assert history == [(1999.0, "2026-01-08"), (2099.0, "2026-01-07"), (2099.0, "2026-01-01")]
+
+
+def test_product_detail_history_caps_expanded_points(client, session, monkeypatch):
+    monkeypatch.setattr("app.services.details.HISTORY_LIMIT", 5)
+    product = session.query(Product).filter(Product.canonical_name == "Acer Nitro 16 Laptop").one()
+    listings = (
+        session.query(RetailerProduct).filter(RetailerProduct.product_id == product.id).order_by(RetailerProduct.id).all()
+    )
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    session.add_all(
+        Price(
+            retailer_product_id=listings[0].id,
+            price_nzd=Decimal(2000 + day),
+            captured_at=start + timedelta(days=day),
+            last_seen_at=start + timedelta(days=day, hours=12),
+            observed_count=2,
+        )
+        for day in range(5)
+    )
+    # A flat stretch opened long ago but seen most recently of all.
+    session.add(
+        Price(
+            retailer_product_id=listings[1].id,
+            price_nzd=Decimal("1899.00"),
+            captured_at=start - timedelta(days=30),
+            last_seen_at=start + timedelta(days=10),
+            observed_count=40,
+        )
+    )
+    session.commit()
+
+    response = client.get(f"/v1/products/{product.id}", params={"include_history": True})
+    assert response.status_code == 200
+    history = [(point["price_nzd"], point["captured_at"][:13]) for point in response.json()["history"]]
+    assert history == [
+        (1899.0, "2026-01-11T00"),
+        (2004.0, "2026-01-05T12"),
+        (2004.0, "2026-01-05T00"),
+        (2003.0, "2026-01-04T12"),
+        (2003.0, "2026-01-04T00"),
+    ]
+
+
+def test_product_detail_buffers_views_until_flushed(client, session, monkeypatch):
+    product_id = session.query(Product.id).filter(Product.canonical_name == "Acer Nitro 16 Laptop").scalar()
+    flush_product_views(session)
+    monkeypatch.setattr(details, "SessionLocal", lambda: session)
+    monkeypatch.setattr(get_settings(), "view_flush_interval_seconds", 3600.0)
+    statements: list[str] = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert client.get(f"/v1/products/{product_id}").status_code == 200
+    assert client.get(f"/v2/products/{product_id}", params={"vertical": "tech"}).status_code == 200
+    assert client.get("/v1/products/missing").status_code == 404
+
+    assert not [statement for statement in statements if statement.lstrip().upper().startswith("UPDATE")]
+    session.expire_all()
+    assert session.get(Product, product_id).view_count == 0
+
+    assert flush_product_views(session) == 1
+    session.expire_all()
+    assert session.get(Product, product_id).view_count == 2
+
+    monkeypatch.setattr(get_settings(), "view_flush_interval_seconds", 0.0)
+    assert client.get(f"/v1/products/{product_id}").status_code == 200
+    session.expire_all()
+    assert session.get(Product, product_id).view_count == 3
+
+
+def test_flush_product_views_restores_counts_when_the_update_fails(session):
+    class FailingSession:
+        rolled_back = False
+
+        def execute(self, *args, **kwargs):
+            raise OperationalError("UPDATE products", {}, Exception("database is locked"))
+
+        def rollback(self):
+            self.rolled_back = True
+
+    flush_product_views(session)
+    cache_client.increment(details.VIEW_COUNTS_KEY, "product-1")
+    cache_client.increment(details.VIEW_COUNTS_KEY, "product-1")
+    failing = FailingSession()
+
+    with pytest.raises(OperationalError):
+        flush_product_views(failing)
+
+    assert failing.rolled_back
+    assert cache_client.drain_counts(details.VIEW_COUNTS_KEY) == {"product-1": 2}
+
+
+def test_only_one_request_schedules_each_view_flush(monkeypatch):
+    monkeypatch.setattr(get_settings(), "view_flush_interval_seconds", 3600.0)
+    monkeypatch.setattr(details, "_views_flushed_at", time.monotonic() - 3600.0)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        scheduled = list(executor.map(details.record_product_view, ["product-1"] * 32))
+
+    assert scheduled.count(True) == 1
+    cache_client.drain_counts(details.VIEW_COUNTS_KEY)
+
+
+def test_products_search_uses_normalized_name_and_identifier_keys(client, session):
+    product = session.query(Product).filter(Product.canonical_name == "Acer Nitro 16 Laptop").one()
+    product.normalized_name = "ACER NITRO 16 LAPTOP"
+    product.mpn_key = "AN16-51-99"
+    session.commit()
+
+    for query in ("nitro-16 laptop", "an16-51-99"):
+        response = client.get("/v1/products", params={"q": query, "sort": "relevance"})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == [product.id]
+    assert client.get("/v1/products", params={"q": "nitro-17"}).json()["total"] == 0
+
+
+def test_products_search_matches_partial_model_numbers(client, session):
+    product = session.query(Product).filter(Product.canonical_name == "Acer Nitro 16 Laptop").one()
+    product.model_key = "AN16-51-99XY"
+    product.searchable_text = "acer nitro 16 laptop"
+    session.commit()
+
+    for query in ("an16-51", "51-99x"):
+        response = client.get("/v1/products", params={"q": query, "sort": "relevance"})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == [product.id]
+
+
+def test_normalization_matches_worker():
+    worker_normalization = pytest.importorskip("worker.matching.normalization")
+    samples = ["", "  Acer Nitro-16 (AN16-51) ", "ultra//sharp u2723qe!", "Ünïcode 500mg\t20 pack", "a/b//c--d"]
+    rng = random.Random(3)
+    alphabet = "aZ09 -/_.!é\t"
+    samples += ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(200)]
+
+    for value in [*samples, None]:
+        assert normalize_text(value) == worker_normalization.normalize_text(value)
+        assert normalize_identifier(value) == worker_normalization.normalize_identifier(value)
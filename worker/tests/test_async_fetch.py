@@ -0,0 +1,117 @@
+import asyncio
+import threading
+
+import httpx
+
+from worker.fetchers.async_http import AsyncFetchEngine
+
+
+def _engine(handler, **overrides) -> AsyncFetchEngine:
+    options = {
+        "headers": {"User-Agent": "test"},
+        "max_fetch_retries": 2,
+        "retry_backoff_seconds": 0,
+        "per_host_concurrency": 2,
+        "transport": httpx.MockTransport(handler),
+    }
+    options.update(overrides)
+    return AsyncFetchEngine(**options)
+
+
+def test_fetch_all_bounds_in_flight_requests_per_host() -> None:
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return httpx.Response(200, text=f"body {request.url.path}")
+
+    urls = [f"https://example.com/product/{idx}" for idx in range(6)]
+    outcomes = _engine(handler).fetch_all(urls)
+
+    assert [outcome.text for outcome in outcomes] == [f"body /product/{idx}" for idx in range(6)]
+    assert state["peak"] == 2
+
+
+def test_fetch_all_retries_retryable_status_and_reports_hard_failures() -> None:
+    calls: dict[str, int] = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        calls[path] = calls.get(path, 0) + 1
+        if path == "/flaky" and calls[path] == 1:
+            return httpx.Response(503, text="busy")
+        if path == "/missing":
+            return httpx.Response(404, text="missing")
+        return httpx.Response(200, text="ok")
+
+    flaky, missing = _engine(handler).fetch_all(["https://example.com/flaky", "https://example.com/missing"])
+
+    assert flaky.text == "ok"
+    assert calls["/flaky"] == 2
+    assert isinstance(missing.error, httpx.HTTPStatusError)
+    assert calls["/missing"] == 1
+
+
+def test_fetch_all_reports_persistent_bot_challenge() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text="challenge-form")
+
+    engine = _engine(handler, max_fetch_retries=1, challenge_detector=lambda text: "challenge" in text)
+    (outcome,) = engine.fetch_all(["https://example.com/product/a"])
+
+    assert isinstance(outcome.error, RuntimeError)
+    assert "anti-bot challenge" in str(outcome.error)
+
+
+def test_fetch_all_reports_not_modified_for_conditional_requests() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, text="<html>fresh</html>", headers={"ETag": '"v2"'})
+
+    outcomes = _engine(handler).fetch_all(
+        ["https://example.com/a", "https://example.com/b"],
+        {"https://example.com/a": {"If-None-Match": '"v1"'}},
+    )
+
+    assert outcomes[0].not_modified is True
+    assert outcomes[0].text is None
+    assert outcomes[1].not_modified is False
+    assert outcomes[1].text == "<html>fresh</html>"
+    assert outcomes[1].etag == '"v2"'
+
+
+def test_engine_reuses_one_client_across_calls_and_threads_until_closed() -> None:
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+        return httpx.Response(200, text="ok")
+
+    engine = _engine(handler)
+    engine.fetch_all(["https://example.com/warm"])
+    client = engine._client
+    batches = [[f"https://example.com/{batch}/{idx}" for idx in range(4)] for batch in range(3)]
+    threads = [threading.Thread(target=engine.fetch_all, args=(batch,)) for batch in batches]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert engine._client is client
+    # Concurrent batches share the engine's per-host limit.
+    assert state["peak"] == 2
+
+    loop_thread = engine._thread
+    engine.close()
+
+    assert client.is_closed
+    assert not loop_thread.is_alive()
+    assert [outcome.text for outcome in engine.fetch_all(["https://example.com/again"])] == ["ok"]
+    engine.close()
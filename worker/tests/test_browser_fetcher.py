@@ -1,4 +1,8 @@
-from worker.fetchers.browser import _playwright_proxy
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from worker.fetchers.browser import BrowserPool, _playwright_proxy
 
 
 def test_playwright_proxy_parses_auth_and_port() -> None:
@@ -7,3 +11,129 @@ def test_playwright_proxy_parses_auth_and_port() -> None:
     assert proxy["username"] == "user"
     assert proxy["password"] == "pass"
 
+
+class _FakePage:
+    def __init__(self, browser: "_FakeBrowser") -> None:
+        self.browser = browser
+        self.url = ""
+
+    def goto(self, url: str, wait_until: str, timeout: int) -> None:
+        if self.browser.crash_on and self.browser.crash_on in url:
+            raise RuntimeError("Target page, context or browser has been closed")
+        self.url = url
+
+    def wait_for_load_state(self, state: str, timeout: int) -> None:
+        return None
+
+    def content(self) -> str:
+        return f"<html><body>{self.url} via browser {self.browser.number}</body></html>"
+
+    def close(self) -> None:
+        return None
+
+
+class _FakeContext:
+    def __init__(self, browser: "_FakeBrowser") -> None:
+        self.browser = browser
+
+    def new_page(self) -> _FakePage:
+        return _FakePage(self.browser)
+
+    def close(self) -> None:
+        return None
+
+
+class _FakeBrowser:
+    def __init__(self, number: int, crash_on: str | None) -> None:
+        self.number = number
+        self.crash_on = crash_on
+        self.closed = False
+
+    def new_context(self, **_kwargs) -> _FakeContext:
+        return _FakeContext(self)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakePlaywrightFactory:
+    def __init__(self, crash_on: str | None = None) -> None:
+        self.crash_on = crash_on
+        self.browsers: list[_FakeBrowser] = []
+
+    def __call__(self) -> "_FakePlaywrightFactory":
+        return self
+
+    def start(self) -> "_FakePlaywrightFactory":
+        return self
+
+    def stop(self) -> None:
+        return None
+
+    @property
+    def chromium(self) -> "_FakePlaywrightFactory":
+        return self
+
+    def launch(self, **_kwargs) -> _FakeBrowser:
+        browser = _FakeBrowser(len(self.browsers) + 1, self.crash_on)
+        self.browsers.append(browser)
+        return browser
+
+
+def test_browser_pool_reuses_warm_browser_across_pages() -> None:
+    factory = _FakePlaywrightFactory()
+    pool = BrowserPool(size=1, max_navigations=10, playwright_factory=factory)
+    try:
+        first = pool.fetch("https://example.com/a")
+        second = pool.fetch("https://example.com/b")
+    finally:
+        pool.close()
+
+    assert "via browser 1" in first
+    assert "via browser 1" in second
+    assert pool.stats.launches == 1
+    assert pool.stats.navigations == 2
+    assert factory.browsers[0].closed is True
+
+
+def test_browser_pool_recycles_after_max_navigations() -> None:
+    factory = _FakePlaywrightFactory()
+    pool = BrowserPool(size=1, max_navigations=2, playwright_factory=factory)
+    try:
+        pages = [pool.fetch(f"https://example.com/{idx}") for idx in range(3)]
+    finally:
+        pool.close()
+
+    assert "via browser 2" in pages[2]
+    assert pool.stats.recycles == 1
+    assert factory.browsers[0].closed is True
+
+
+def test_browser_pool_relaunches_after_crash() -> None:
+    factory = _FakePlaywrightFactory(crash_on="/boom")
+    pool = BrowserPool(size=1, max_navigations=10, playwright_factory=factory)
+    try:
+        with pytest.raises(RuntimeError):
+            pool.fetch("https://example.com/boom")
+        html = pool.fetch("https://example.com/ok")
+    finally:
+        pool.close()
+
+    assert "via browser 2" in html
+    assert pool.stats.crashes == 1
+    assert pool.stats.launches == 2
+
+
+def test_browser_pool_counts_fetches_from_every_slot() -> None:
+    factory = _FakePlaywrightFactory()
+    pool = BrowserPool(size=4, max_navigations=3, playwright_factory=factory)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pages = list(executor.map(pool.fetch, [f"https://example.com/{idx}" for idx in range(200)]))
+    finally:
+        pool.close()
+
+    assert len(pages) == 200
+    assert pool.stats.navigations == 200
+    assert pool.stats.launches == len(factory.browsers)
+    assert pool.stats.launches - pool.stats.recycles <= 4
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import select
+
+from worker.dedup import MinHasher, apply_proposals, find_duplicates, lsh_pairs, shingles
+from worker.matching.blocking import ProductBlockingIndex
+from worker.matching.identity import ProductIdentityIndex
+from worker.models import Product, ProductOverride, Retailer, RetailerProduct
+
+
+def seed_product(session, name: str, brand: str, category: str, retailer: str, gtin: str | None = None, **attributes):
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == retailer))
+    product = Product(
+        canonical_name=name,
+        normalized_name=name.upper(),
+        brand=brand,
+        category=category,
+        gtin=gtin,
+        gtin_key=gtin,
+        attributes=attributes,
+        searchable_text="",
+    )
+    session.add(product)
+    session.flush()
+    listing = RetailerProduct(
+        retailer_id=retailer_id,
+        product_id=product.id,
+        source_product_id=f"{retailer}-{product.id}",
+        title=name,
+        url=f"https://example.com/{product.id}",
+    )
+    session.add(listing)
+    session.flush()
+    return product, listing
+
+
+def test_minhash_signatures_estimate_jaccard_and_band_similar_sets() -> None:
+    hasher = MinHasher(256)
+    base = {f"n:token{index}" for index in range(20)}
+    similar = (base - {"n:token0", "n:token1"}) | {"n:other0", "n:other1"}
+    unrelated = {f"n:word{index}" for index in range(20)}
+    signatures = {"base": hasher.signature(base), "similar": hasher.signature(similar), "other": hasher.signature(unrelated)}
+
+    estimate = float((signatures["base"] == signatures["similar"]).mean())
+
+    assert estimate == pytest.approx(len(base & similar) / len(base | similar), abs=0.1)
+    assert lsh_pairs(signatures, bands=64) == {("base", "similar")}
+    assert shingles("ACER NITRO", {"ram_gb": 16, "flag": True}, ("AN16",)) == {"n:ACER", "n:NITRO", "a:ram_gb=16", "i:AN16"}
+
+
+def test_duplicates_are_found_across_brand_and_category_spellings(session) -> None:
+    specs = {"storage_gb": 256, "colour": "black", "screen_in": 6.8}
+    original, _ = seed_product(
+        session, "Samsung Galaxy S24 Ultra 256GB Black", "Samsung", "phones", "pb-tech", gtin="8806095300000", **specs
+    )
+    duplicate, listing = seed_product(
+        session, "Samsung Galaxy S24 Ultra 256GB Black", "Samsung NZ", "mobile-phones", "jb-hi-fi", **specs
+    )
+    seed_product(session, "Samsung Galaxy S24 128GB Violet", "Samsung", "phones", "jb-hi-fi", storage_gb=128)
+    seed_product(session, "Acer Nitro 16 Gaming Laptop", "Acer", "laptops", "pb-tech", ram_gb=16)
+    session.commit()
+
+    proposals = find_duplicates(session)
+
+    assert [(proposal.product_id, proposal.target_product_id) for proposal in proposals] == [(duplicate.id, original.id)]
+    assert proposals[0].retailer_product_ids == (listing.id,)
+    assert proposals[0].similarity >= 0.7
+    assert find_duplicates(session, vertical="pharmaceuticals") == []
+
+
+def test_applied_proposals_become_manual_overrides(session) -> None:
+    first, _ = seed_product(session, "Dyson V15 Detect Vacuum", "Dyson", "vacuums", "pb-tech", watts=660)
+    second, listing = seed_product(session, "Dyson V15 Detect Vacuum", "dyson", "floorcare", "jb-hi-fi", watts=660)
+    third, _ = seed_product(session, "Dyson V15 Detect Vacuum", "Dyson", "vacuums", "jb-hi-fi", watts=660)
+    second.view_count, third.view_count = 3, 4
+    session.commit()
+    first_id, second_id, third_id, listing_id = first.id, second.id, third.id, listing.id
+    blocking = ProductBlockingIndex(session)
+    blocking.backfill()
+
+    proposals = find_duplicates(session)
+    written = apply_proposals(session, proposals)
+
+    # All three were created alike; the oldest becomes the target for both others.
+    assert {(proposal.product_id, proposal.target_product_id) for proposal in proposals} == {
+        (second_id, first_id),
+        (third_id, first_id),
+    }
+    assert written == 2
+    override = session.scalar(select(ProductOverride).where(ProductOverride.retailer_product_id == listing_id))
+    assert override.product_id == first_id and override.reason.startswith("dedup: minhash")
+    assert session.get(RetailerProduct, listing_id).product_id == first_id
+    assert ProductIdentityIndex.load(session).override(listing_id) == first_id
+    # Emptied duplicates are gone, so neither the index nor a later backfill offers them as candidates.
+    assert session.get(Product, second_id) is None and session.get(Product, third_id) is None
+    assert session.get(Product, first_id).view_count == 7
+    assert ProductBlockingIndex(session).backfill() == 0
+    assert blocking.candidates("tech", "dyson", "floorcare", "Dyson V15 Detect Vacuum") == []
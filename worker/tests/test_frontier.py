@@ -0,0 +1,91 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import select
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.frontier import CrawlFrontier, parse_lastmod
+from worker.models import Retailer, UrlFrontier
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "pb-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+    exclude_url_patterns = ["/blog", "?", "#"]
+
+
+def _retailer_id(session) -> int:
+    return session.execute(select(Retailer.id).where(Retailer.slug == "pb-tech")).scalar_one()
+
+
+def test_prioritize_orders_new_then_modified_then_oldest_fetched(session) -> None:
+    frontier = CrawlFrontier(session, _retailer_id(session))
+    now = datetime.now(timezone.utc)
+    urls = [f"https://example.com/product/{name}" for name in ("stale", "recent", "modified", "new")]
+    frontier.record_discovered(urls[:3], {urls[2]: now})
+    session.flush()
+    entries = {row.url: row for row in session.execute(select(UrlFrontier)).scalars()}
+    entries[urls[0]].last_fetched_at = now - timedelta(days=9)
+    entries[urls[1]].last_fetched_at = now - timedelta(days=1)
+    entries[urls[2]].last_fetched_at = now - timedelta(days=3)
+
+    assert frontier.prioritize(urls) == [urls[3], urls[2], urls[0], urls[1]]
+    assert frontier.is_fresh(urls[3]) is True
+    assert frontier.is_fresh(urls[1]) is False
+    assert frontier.is_fresh(urls[1], now) is True
+    assert parse_lastmod("2026-10-01") == datetime(2026, 10, 1, tzinfo=timezone.utc)
+    assert parse_lastmod("yesterday") is None
+
+
+def test_discovery_skips_past_unchanged_urls_to_unseen_ones(session) -> None:
+    rows = "".join(
+        f"<url><loc>https://example.com/product/{idx}</loc><lastmod>2026-01-01</lastmod></url>" for idx in range(60)
+    )
+    sitemap = f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{rows}</urlset>'
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(200, text=sitemap)
+        return httpx.Response(404)
+
+    frontier = CrawlFrontier(session, _retailer_id(session))
+    seen = [f"https://example.com/product/{idx}" for idx in range(50)]
+    frontier.record_discovered(seen)
+    for url in seen:
+        frontier.mark_fetched(url)
+    session.flush()
+
+    adapter = DummyTechLiveAdapter(max_products=2, max_fetch_retries=0)
+    adapter.client = httpx.Client(transport=httpx.MockTransport(handler))
+    adapter.frontier = frontier
+
+    urls = adapter._discover_product_urls()
+
+    assert urls[:8] == [f"https://example.com/product/{idx}" for idx in range(50, 58)]
+    assert len(urls) == 40
+    session.flush()
+    stored = session.execute(select(UrlFrontier).where(UrlFrontier.url == "https://example.com/product/55")).scalar_one()
+    assert stored.sitemap_lastmod is not None
+
+
+def test_updates_from_other_threads_wait_for_sync(session) -> None:
+    frontier = CrawlFrontier(session, _retailer_id(session))
+    url = "https://example.com/product/threaded"
+    frontier.record_discovered([url])
+    session.flush()
+
+    worker = threading.Thread(target=lambda: (frontier.mark_fetched(url), frontier.record_discovered([url + "-2"])))
+    worker.start()
+    worker.join()
+    entry = session.execute(select(UrlFrontier).where(UrlFrontier.url == url)).scalar_one()
+    assert entry.last_fetched_at is None
+
+    frontier.sync()
+    session.flush()
+
+    assert entry.last_fetched_at is not None
+    assert session.execute(select(UrlFrontier).where(UrlFrontier.url == url + "-2")).scalar_one_or_none() is not None
@@ -0,0 +1,115 @@
+import re
+
+import pytest
+from bs4 import BeautifulSoup
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.benchmarks.html_parsers import run_benchmark, synthetic_product_page
+from worker.html_parsing import PageIndex, resolve_html_parser
+
+SPEC_PAGE = """
+<html><head>
+<title>Fallback Title</title>
+<meta property="og:title" content="Glow Serum 30ml" />
+<meta name="twitter:image" content="https://cdn.example.com/serum.jpg" />
+</head><body>
+<nav aria-label="breadcrumb"><ol><li>Home</li><li>Skincare</li><li>Serums</li></ol></nav>
+<span class="price">NZ$ 49.99</span> <span class="was-price">was $59.99</span>
+<dl class="specs"><dt>Size</dt><dd>30ml</dd><dt>Skin Type</dt><dd>All</dd></dl>
+<table><tr><td>Ingredients</td><td>Aqua, Glycerin, Niacinamide</td></tr></table>
+</body></html>
+"""
+
+MIXED_PAGE = """
+<html><head><title>Widget</title>
+<meta name="description" content="First" /><meta name="description" content="" />
+<script type="Application/LD+JSON">{"@type": "Product", "name": "Widget"}</script>
+<script type="application/ld+json">not json</script>
+<style>.price { color: red }</style>
+</head><body>
+<!-- hidden $1.00 -->
+<template><p>$2.00</p></template>
+<h2>Spec sheet</h2><h1>Widget</h1><h2>Reviews</h2><h2>More</h2>
+<tr><td>Loose</td><td>row</td></tr>
+<table><tbody><tr><th>Weight</th><td>1kg</td></tr></tbody></table>
+<span itemprop="price" content="19.99">$19.99</span><div data-price="">x</div><div data-product-price="21">y</div>
+<img src="/a.jpg" /><script>var state = {"price": 19.99};</script>
+</body></html>
+"""
+
+
+class DummyBeautyLiveAdapter(LiveRetailerAdapter):
+    vertical = "beauty"
+    retailer_slug = "dummy-beauty"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+
+
+class DummyLxmlAdapter(DummyBeautyLiveAdapter):
+    html_parser = "lxml"
+
+
+@pytest.mark.parametrize("html", [SPEC_PAGE, synthetic_product_page(7)])
+def test_lxml_backend_matches_html_parser_output(html: str) -> None:
+    url = "https://example.com/product/item"
+    default = DummyBeautyLiveAdapter()
+    fast = DummyBeautyLiveAdapter(html_parser="lxml")
+
+    assert default.html_parser == "html.parser"
+    assert fast.html_parser == "lxml"
+    assert fast._parse_product_html(url, "item", html) == default._parse_product_html(url, "item", html)
+
+
+def test_html_parser_selectable_per_adapter_class() -> None:
+    assert DummyLxmlAdapter().html_parser == "lxml"
+    assert DummyLxmlAdapter(html_parser="html.parser").html_parser == "html.parser"
+    with pytest.raises(ValueError):
+        resolve_html_parser("selectolax")
+
+
+def test_benchmark_reports_identical_outputs_per_backend() -> None:
+    pages = [(f"https://example.com/product/laptop-{idx}", synthetic_product_page(idx)) for idx in range(3)]
+
+    results = run_benchmark(pages, repeat=1)
+
+    assert [result.backend for result in results] == ["html.parser", "lxml"]
+    assert all(result.mismatches == 0 for result in results)
+
+
+@pytest.mark.parametrize("backend", ["html.parser", "lxml"])
+@pytest.mark.parametrize("html", [SPEC_PAGE, MIXED_PAGE, synthetic_product_page(3)])
+def test_page_index_matches_equivalent_soup_queries(html: str, backend: str) -> None:
+    soup = BeautifulSoup(html, backend)
+    page = PageIndex(soup)
+
+    assert page.text == soup.get_text(" ", strip=True)
+    assert page.scripts == soup.find_all("script")
+    assert page.script_text == " ".join(node.get_text(" ", strip=True) for node in soup.find_all("script"))
+    assert page.ld_json_scripts == soup.find_all("script", attrs={"type": re.compile("application/ld\\+json", re.I)})
+    assert page.title_tag is soup.title
+    assert page.headings == soup.find_all(["h1", "h2"], limit=3)
+    assert page.images == soup.find_all("img")
+    assert page.itemprop_prices == soup.find_all(attrs={"itemprop": "price"})
+    assert page.data_prices == soup.find_all(attrs={"data-price": True})
+    assert page.data_product_prices == soup.find_all(attrs={"data-product-price": True})
+    assert page.table_rows == soup.select("table tr")
+    assert page.definition_lists == soup.find_all("dl")
+    assert page.meta_contents("name", "description") == [node.get("content") for node in soup.find_all("meta", attrs={"name": "description"})]
+
+
+def test_product_extraction_walks_the_document_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    walks = []
+    original = PageIndex._index
+
+    def counting_index(self: PageIndex, soup: BeautifulSoup) -> None:
+        walks.append(soup)
+        original(self, soup)
+
+    monkeypatch.setattr(PageIndex, "_index", counting_index)
+    adapter = DummyBeautyLiveAdapter(html_parser="html.parser")
+
+    parsed = adapter._parse_product_html("https://example.com/product/laptop-3", "laptop-3", synthetic_product_page(3))
+
+    assert parsed.price_nzd == 1002.0
+    assert len(walks) == 1
@@ -0,0 +1,81 @@
+import random
+
+import pytest
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.matching.keywords import KeywordMatcher, KeywordRules
+from worker.matching.vertical_rules import RX_EXCLUSION_TOKENS, load_vertical_rules
+
+RULE_SETS = {rule_set.vertical: rule_set for rule_set in load_vertical_rules().rule_sets}
+
+
+class DummyLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "dummy"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+
+
+@pytest.mark.parametrize("backend", ["python", "pyahocorasick"])
+def test_matcher_returns_every_overlapping_keyword(backend: str) -> None:
+    if backend == "pyahocorasick":
+        pytest.importorskip("ahocorasick")
+    matcher = KeywordMatcher(["pet", "pet shampoo", "shampoo", "ham", "he", "she", "hers"], backend=backend)
+
+    assert matcher.find("ushers pet shampoo") == {"pet", "pet shampoo", "shampoo", "ham", "he", "she", "hers"}
+    assert matcher.find("petrol") == {"pet"}
+    assert matcher.find("") == set()
+    assert KeywordMatcher([], backend=backend).find("anything") == set()
+
+
+def test_rules_answer_in_declared_order() -> None:
+    rules = KeywordRules([("suncare", ("spf",)), ("skincare", ("serum",))], backend="python")
+
+    assert rules.first("hydrating serum spf 50") == "suncare"
+    assert rules.first("hydrating serum") == "skincare"
+    assert rules.first("lipstick") is None
+    assert rules.counts("serum spf") == {"suncare": 1, "skincare": 1}
+
+
+def _reference_vertical(text: str) -> str | None:
+    best_vertical, best_score = None, 0
+    for vertical, rule_set in RULE_SETS.items():
+        score = sum(token in text for token in rule_set.signals)
+        if score > best_score:
+            best_vertical, best_score = vertical, score
+    return best_vertical
+
+
+def _reference_category(text: str, vertical: str) -> str:
+    rule_set = RULE_SETS[vertical]
+    rules = rule_set.categories
+    if vertical == "pharma":
+        rules = (("excluded-rx", tuple(RX_EXCLUSION_TOKENS)), *rules)
+    for category, tokens in rules:
+        if any(token in text for token in tokens):
+            return category
+    return rule_set.fallback
+
+
+def test_classifiers_match_substring_scans_on_random_text() -> None:
+    vocabulary = sorted(
+        {token for rule_set in RULE_SETS.values() for token in rule_set.signals}
+        | {token for rule_set in RULE_SETS.values() for _, tokens in rule_set.categories for token in tokens}
+        | RX_EXCLUSION_TOKENS
+        | {"ultra", "pack", "classic", "x"}
+    )
+    rng = random.Random(7)
+    adapter = DummyLiveAdapter()
+    try:
+        for _ in range(400):
+            title = "".join(rng.choice(["", " ", "-"]) + rng.choice(vocabulary) for _ in range(rng.randint(0, 5)))
+            raw_category = rng.choice(["", "Health", "Beauty > Skin", "Pet Supplies"])
+            text = f"{raw_category} {title}".lower()
+
+            assert adapter._infer_vertical_from_text(title) == _reference_vertical(title.lower())
+            assert adapter._contains_rx_exclusion(raw_category, title) == any(token in text for token in RX_EXCLUSION_TOKENS)
+            for vertical in ("pharma", "beauty", "home-appliances", "pet-goods", "tech"):
+                assert adapter._normalize_category(raw_category, title, vertical) == _reference_category(text, vertical)
+    finally:
+        adapter.close()
@@ -1,4 +1,7 @@
 import gzip
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 
 import httpx
@@ -7,6 +10,7 @@ from bs4 import BeautifulSoup
 
 from worker.adapters.base import RawDetail, RawListing
 from worker.adapters.live_base import LiveRetailerAdapter, NonProductPageError, ParsedProductPage
+from worker.fetchers.async_http import FetchOutcome
 
 
 class DummyLiveAdapter(LiveRetailerAdapter):
@@ -105,20 +109,20 @@ def test_fetch_text_retries_on_challenge_page(monkeypatch: pytest.MonkeyPatch) -
     assert calls["count"] == 2
 
 
-def test_fetch_sitemap_text_supports_gzip(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_iter_sitemap_supports_gzip() -> None:
     adapter = DummyLiveAdapter(max_fetch_retries=0)
     url = "https://example.com/sitemap.xml.gz"
     xml = "<urlset><url><loc>https://example.com/product/abc</loc></url></urlset>"
     compressed = gzip.compress(xml.encode("utf-8"))
+    adapter.client = httpx.Client(
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, content=compressed, headers={"content-type": "application/x-gzip"})
+        )
+    )
 
-    def fake_get(target_url: str) -> httpx.Response:
-        return _response(target_url, content=compressed, headers={"content-type": "application/x-gzip"})
-
-    monkeypatch.setattr(adapter.client, "get", fake_get)
+    entries = list(adapter._iter_sitemap(url))
 
-    body = adapter._fetch_sitemap_text(url)
-    assert "<urlset>" in body
-    assert "/product/abc" in body
+    assert [(entry.kind, entry.loc) for entry in entries] == [("url", "https://example.com/product/abc")]
 
 
 def test_discover_robots_sitemaps(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -134,7 +138,7 @@ def test_discover_robots_sitemaps(monkeypatch: pytest.MonkeyPatch) -> None:
     assert found == ["https://example.com/sitemap.xml", "https://example.com/products.xml.gz"]
 
 
-def test_parse_sitemap_index_extracts_child_sitemaps() -> None:
+def test_iter_sitemap_index_extracts_child_sitemaps() -> None:
     adapter = DummyLiveAdapter(max_fetch_retries=0)
     xml = """
     <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
@@ -142,10 +146,14 @@ def test_parse_sitemap_index_extracts_child_sitemaps() -> None:
       <sitemap><loc>https://example.com/b.xml</loc></sitemap>
     </sitemapindex>
     """
+    adapter.client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=xml)))
 
-    children, urls = adapter._parse_sitemap(xml)
-    assert children == ["https://example.com/a.xml", "https://example.com/b.xml"]
-    assert urls == []
+    entries = list(adapter._iter_sitemap("https://example.com/sitemap.xml"))
+
+    assert [(entry.kind, entry.loc) for entry in entries] == [
+        ("sitemap", "https://example.com/a.xml"),
+        ("sitemap", "https://example.com/b.xml"),
+    ]
 
 
 def test_discover_product_urls_from_html_when_sitemaps_unavailable(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -193,7 +201,7 @@ def test_discovery_failure_reason_when_rate_limited(monkeypatch: pytest.MonkeyPa
         response = _response(url, status_code=429, text="too many requests")
         raise httpx.HTTPStatusError("429", request=response.request, response=response)
 
-    monkeypatch.setattr(adapter, "_fetch_sitemap_text", always_429)
+    monkeypatch.setattr(adapter, "_iter_sitemap", always_429)
     monkeypatch.setattr(adapter, "_discover_product_urls_from_html", lambda: [])
 
     urls = adapter._discover_product_urls()
@@ -212,11 +220,75 @@ def test_list_pages_uses_fixture_when_live_probe_fails(monkeypatch: pytest.Monke
     monkeypatch.setattr(adapter, "_probe_live_urls", lambda _: (False, "live product pages blocked by anti-bot/WAF"))
     adapter._fixture_fallback = _Fallback()  # type: ignore[attr-defined]
 
-    pages = adapter.list_pages()
+    pages = list(adapter.list_pages())
     assert pages == [{"items": [{"source_product_id": "fixture-1"}]}]
     assert adapter.used_fixture_fallback is True
 
 
+def test_fetch_detail_uses_fixture_only_for_fixture_listings(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, use_fixture_fallback=True)
+    fixture_calls: list[str] = []
+
+    def listing(title: str, url: str) -> RawListing:
+        return RawListing(
+            source_product_id="shared",
+            title=title,
+            url=url,
+            image_url=None,
+            category="laptops",
+            brand="Acer",
+            availability="in_stock",
+        )
+
+    class _Fallback:
+        def parse_listing(self, page):
+            return [listing("Fixture", "https://fixture.example/shared")]
+
+        def fetch_detail(self, item):
+            fixture_calls.append(item.source_product_id)
+            return RawDetail(
+                gtin=None,
+                mpn=None,
+                model_number=None,
+                attributes={},
+                price_nzd=1.0,
+                promo_price_nzd=None,
+                promo_text=None,
+                discount_pct=None,
+                captured_at=datetime.now(timezone.utc),
+            )
+
+    adapter._fixture_fallback = _Fallback()  # type: ignore[attr-defined]
+    live_page = ParsedProductPage(
+        source_product_id="shared",
+        url="https://example.com/product/shared",
+        title="Live",
+        image_url=None,
+        brand="Acer",
+        category="laptops",
+        availability="in_stock",
+        gtin=None,
+        mpn=None,
+        model_number=None,
+        attributes={},
+        price_nzd=999.0,
+        promo_price_nzd=None,
+        promo_text=None,
+        discount_pct=None,
+    )
+    monkeypatch.setattr(adapter, "_parse_product_page", lambda **_: live_page)
+    (live,) = adapter.parse_listing({"url": live_page.url, "source_product_id": "shared"})
+
+    assert adapter.fetch_detail(live).price_nzd == 999.0
+    # A live page that fell out of the cache is parsed again, never swapped for the fixture.
+    assert adapter.fetch_detail(live).price_nzd == 999.0
+    assert fixture_calls == [] and adapter.used_fixture_fallback is False
+
+    (fixture,) = adapter.parse_listing({"items": [{"source_product_id": "shared"}]})
+    assert adapter.fetch_detail(fixture).price_nzd == 1.0
+    assert fixture_calls == ["shared"] and adapter.used_fixture_fallback is True
+
+
 def test_extract_prices_from_scripts_parses_price_keys() -> None:
     adapter = DummyLiveAdapter(max_fetch_retries=0)
     soup = BeautifulSoup(
@@ -467,7 +539,7 @@ def test_list_pages_raises_when_live_probe_fails_without_fixture(monkeypatch: py
     monkeypatch.setattr(adapter, "_probe_live_urls", lambda _: (False, "live product pages reachable but price extraction failed"))
 
     with pytest.raises(RuntimeError, match="Live probe failed for dummy-beauty"):
-        adapter.list_pages()
+        list(adapter.list_pages())
 
 
 def test_normalize_category_handles_beauty_taxonomy() -> None:
@@ -676,3 +748,100 @@ def test_normalize_falls_back_to_adapter_vertical_when_no_clear_signal() -> None
     assert normalized.vertical == "tech"
     assert normalized.vertical_source == "adapter_default"
     assert normalized.vertical_confidence == pytest.approx(0.55)
+
+
+def test_parse_product_page_prefetches_planned_urls_concurrently(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, fetch_concurrency=3)
+    urls = [f"https://example.com/product/{idx}" for idx in range(5)]
+    batches: list[list[str]] = []
+
+    def fake_fetch_pages(batch: list[str], _headers: dict[str, dict[str, str]]) -> list[FetchOutcome | Exception]:
+        batches.append(list(batch))
+        return [
+            FetchOutcome(
+                url=url,
+                text=f'<html><head><title>Item {url[-1]}</title><meta property="og:price:amount" content="10.00" /></head></html>',
+            )
+            for url in batch
+        ]
+
+    monkeypatch.setattr(adapter, "_fetch_pages", fake_fetch_pages)
+    monkeypatch.setattr(adapter, "_fetch_text", lambda _url: pytest.fail("unexpected sequential fetch"))
+    adapter._plan_prefetch(urls)
+
+    titles = [adapter._parse_product_page(url=url, source_product_id=url[-1]).title for url in urls]
+
+    assert titles == [f"Item {idx}" for idx in range(5)]
+    assert batches == [urls]
+
+
+def test_parse_product_page_fetches_outside_the_page_lock(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, fetch_concurrency=2)
+    urls = [f"https://example.com/product/{idx}" for idx in range(8)]
+    release = threading.Event()
+    batches: list[list[str]] = []
+
+    def fake_fetch_pages(batch: list[str], _headers: dict[str, dict[str, str]]) -> list[FetchOutcome | Exception]:
+        batches.append(list(batch))
+        if urls[0] in batch:
+            release.wait(5)
+        return [
+            FetchOutcome(
+                url=url,
+                text=f'<html><head><title>Item {url[-1]}</title><meta property="og:price:amount" content="10.00" /></head></html>',
+            )
+            for url in batch
+        ]
+
+    monkeypatch.setattr(adapter, "_fetch_pages", fake_fetch_pages)
+    adapter._plan_prefetch(urls)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        slow = pool.submit(adapter._parse_product_page, urls[0], "0")
+        while not batches:
+            time.sleep(0.01)
+        waiting = pool.submit(adapter._parse_product_page, urls[1], "1")
+        # A page from the next window is fetched and parsed while the first window is still downloading.
+        assert pool.submit(adapter._parse_product_page, urls[4], "4").result(timeout=5).title == "Item 4"
+        assert not slow.done() and not waiting.done()
+        release.set()
+
+        assert (slow.result(timeout=5).title, waiting.result(timeout=5).title) == ("Item 0", "Item 1")
+    assert batches == [urls[:4], urls[4:]]
+    adapter.close()
+
+
+def test_list_pages_leaves_skipped_products_out_of_prefetch(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, fetch_concurrency=4)
+    urls = [f"https://example.com/product/{idx}" for idx in range(6)]
+    batches: list[list[str]] = []
+
+    def fake_probe(_urls: list[str]) -> tuple[bool, None]:
+        # The probe keeps the bodies it fetched, including one that was already written.
+        for url in urls[:2]:
+            adapter._prefetched[url] = Future()
+        return True, None
+
+    def fake_fetch_pages(batch: list[str], _headers: dict[str, dict[str, str]]) -> list[FetchOutcome | Exception]:
+        batches.append(list(batch))
+        return [
+            FetchOutcome(
+                url=url,
+                text=f'<html><head><title>Item {url[-1]}</title><meta property="og:price:amount" content="10.00" /></head></html>',
+            )
+            for url in batch
+        ]
+
+    monkeypatch.setattr(adapter, "_discover_product_urls", lambda: list(urls))
+    monkeypatch.setattr(adapter, "_probe_live_urls", fake_probe)
+    monkeypatch.setattr(adapter, "_fetch_pages", fake_fetch_pages)
+    adapter.skip_products({adapter._source_id_from_url(url) for url in urls[:3]})
+
+    pages = list(adapter.list_pages())
+    titles = [adapter._parse_product_page(str(page["url"]), str(page["source_product_id"])).title for page in pages]
+
+    assert [page["url"] for page in pages] == urls[3:]
+    assert titles == ["Item 3", "Item 4", "Item 5"]
+    assert batches == [urls[3:]]
+    assert adapter._prefetched == {}
+    adapter.close()
@@ -1,8 +1,13 @@
+import re
 from datetime import datetime, timezone
 
+from sqlalchemy import event, func, select
+
 from worker.adapters.base import NormalizedRetailerProduct
+from worker.matching import engine as engine_module
 from worker.matching.engine import MatchingEngine
-from worker.models import Product
+from worker.matching.blocking import CANDIDATE_LIMIT
+from worker.models import Product, ProductBlockingKey, ProductOverride
 
 
 def _item(**overrides):
@@ -96,3 +101,173 @@ def test_pharmaceuticals_variant_mismatch_creates_new(session):
     )
     match = MatchingEngine(session).match(item)
     assert match.product_id is None
+
+
+def test_exact_tiers_are_answered_from_the_identity_index(session):
+    product = Product(
+        canonical_name="Acer Nitro 16",
+        brand="ACER",
+        category="laptops",
+        gtin="1234567890123",
+        mpn="AN16-51-99",
+        model_number="AN16-51",
+        attributes={},
+        searchable_text="Acer Nitro",
+    )
+    other = Product(canonical_name="Acer Swift 3", brand="Acer", category="laptops", attributes={}, searchable_text="")
+    session.add_all([product, other])
+    session.flush()
+    session.add(ProductOverride(retailer_product_id="rp-1", product_id=other.id))
+    session.commit()
+    product_id, other_id = product.id, other.id
+    engine = MatchingEngine(session)
+    engine.index  # loaded once, up front
+    statements: list[str] = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    gtin = engine.match(_item())
+    model = engine.match(_item(gtin=None, mpn=None, model_number="AN16-51"))
+    override = engine.match(_item(gtin=None, mpn=None, model_number=None), retailer_product_id="rp-1")
+
+    assert (gtin.tier, gtin.product_id) == ("gtin", product_id)
+    assert (model.tier, model.product_id) == ("model", product_id)
+    assert (override.tier, override.product_id) == ("manual_override", other_id)
+    assert statements == []
+
+
+def test_identity_index_tracks_added_and_rekeyed_products(session):
+    engine = MatchingEngine(session)
+    assert engine.match(_item(attributes={})).tier == "new"
+
+    tablets = Product(
+        canonical_name="Panadol Tablets 500mg",
+        vertical="pharmaceuticals",
+        brand="Panadol",
+        category="otc",
+        gtin="9300673830010",
+        attributes={"strength": "500mg", "form": "tablet"},
+        searchable_text="",
+    )
+    caplets = Product(
+        canonical_name="Panadol Caplets 500mg",
+        vertical="pharmaceuticals",
+        brand="Panadol",
+        category="otc",
+        gtin="9300673830010",
+        attributes={"strength": "500mg", "form": "caplet"},
+        searchable_text="",
+    )
+    session.add_all([tablets, caplets])
+    session.flush()
+    engine.index.add(tablets)
+    engine.index.add(caplets)
+    pharma = _item(vertical="pharmaceuticals", brand="Panadol", gtin="9300673830010", attributes={"form": "caplet"})
+
+    assert engine.match(pharma).product_id == caplets.id
+
+    caplets.gtin = "9300673830027"
+    engine.index.add(caplets)
+    assert engine.match(pharma).tier != "gtin"
+    engine.index.remove(tablets.id)
+    assert len(engine.index) == 1
+
+
+def test_fuzzy_match_finds_products_beyond_the_first_two_hundred_in_a_block(session):
+    attributes = {"cpu_score": 7000, "ram_gb": 16, "storage_gb": 512}
+    session.add_all(
+        Product(
+            canonical_name=f"Acer Aspire {n} Slim Laptop",
+            brand="Acer",
+            category="laptops",
+            attributes=attributes,
+            searchable_text="",
+        )
+        for n in range(250)
+    )
+    target = Product(
+        canonical_name="Acer Nitro16 Gaming Laptop", brand="Acer", category="laptops", attributes=attributes, searchable_text=""
+    )
+    session.add(target)
+    session.commit()
+    engine = MatchingEngine(session)
+
+    item = _item(gtin=None, mpn=None, model_number=None, canonical_name="Acer Nitro 16 Gaming")
+    candidates = engine.blocking.candidates("tech", "ACER", "Laptops", item.canonical_name)
+    match = engine.match(item)
+
+    assert len(candidates) == CANDIDATE_LIMIT and candidates[0] == target.id
+    assert (match.tier, match.product_id) == ("fuzzy", target.id)
+
+
+def test_blocking_keys_follow_registered_and_forgotten_products(session):
+    engine = MatchingEngine(session)
+    item = _item(gtin=None, mpn=None, model_number=None, canonical_name="Acer Nitro 16 Gaming")
+    assert engine.match(item).tier == "new"
+
+    product = Product(
+        canonical_name="Acer Nitro16 Gaming Laptop",
+        brand="Acer",
+        category="laptops",
+        attributes={"cpu_score": 7000, "ram_gb": 16, "storage_gb": 512},
+        searchable_text="",
+    )
+    session.add(product)
+    session.flush()
+    engine.register(product)
+    assert engine.match(item).product_id == product.id
+
+    product.category = "desktops"
+    engine.register(product)
+    assert engine.match(item).tier == "new"
+    engine.forget(product.id)
+    assert session.scalar(select(func.count()).select_from(ProductBlockingKey)) == 0
+
+
+def test_match_many_scores_each_block_in_one_call_and_caches_profiles(session, monkeypatch):
+    attributes = {"cpu_score": 7000, "ram_gb": 16, "storage_gb": 512}
+    nitro = Product(
+        canonical_name="Acer Nitro16 Gaming Laptop", brand="Acer", category="laptops", attributes=attributes, searchable_text=""
+    )
+    swift = Product(
+        canonical_name="Acer Swift Go 14 Laptop", brand="Acer", category="laptops", attributes=attributes, searchable_text=""
+    )
+    predator = Product(
+        canonical_name="Acer Predator XB273 Monitor",
+        brand="Acer",
+        category="monitors",
+        attributes={"refresh_hz": 240, "panel": "ips"},
+        searchable_text="",
+    )
+    session.add_all([nitro, swift, predator])
+    session.commit()
+    items = [
+        _item(gtin=None, mpn=None, model_number=None, canonical_name="Acer Nitro 16 Gaming"),
+        _item(gtin=None, mpn=None, model_number=None, canonical_name="Acer Swift Go 14"),
+        _item(
+            gtin=None,
+            mpn=None,
+            model_number=None,
+            canonical_name="Acer Predator XB273",
+            category="monitors",
+            attributes={"refresh_hz": 240, "panel": "IPS"},
+        ),
+    ]
+    expected = [nitro.id, swift.id, predator.id]
+    engine = MatchingEngine(session, workers=2)
+    calls: list[int] = []
+    cdist = engine_module.process.cdist
+
+    def counting_cdist(queries, choices, **kwargs):
+        calls.append(len(queries))
+        return cdist(queries, choices, **kwargs)
+
+    monkeypatch.setattr(engine_module.process, "cdist", counting_cdist)
+    results = engine.match_many(items)
+    statements: list[str] = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+    again = engine.match_many(items)
+
+    assert [(result.tier, result.product_id) for result in results] == [("fuzzy", product_id) for product_id in expected]
+    assert [result.product_id for result in again] == expected
+    assert sorted(calls[:2]) == [1, 2]
+    assert not any(re.search(r"FROM products\b", statement) for statement in statements)
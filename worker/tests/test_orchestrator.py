@@ -0,0 +1,58 @@
+import time
+from pathlib import Path
+
+from worker.main import RunSummary
+from worker.orchestrator import format_summary, host_groups, retailer_host, run_all, run_retailer
+
+
+def record_run(retailer_slug: str, log_dir: str, seconds: float = 0.3) -> RunSummary:
+    started = time.time()
+    time.sleep(seconds)
+    Path(log_dir, retailer_slug).write_text(f"{started} {time.time()}")
+    return RunSummary(
+        run_id=retailer_slug,
+        status="completed",
+        items_total=2,
+        items_new=1,
+        items_updated=1,
+        items_failed=0,
+        fixture_fallback=False,
+    )
+
+
+def failing_run(retailer_slug: str) -> RunSummary:
+    if retailer_slug == "apple":
+        raise RuntimeError("no products")
+    time.sleep(30)
+    raise AssertionError("should have been stopped")
+
+
+def test_home_variants_share_their_parent_host() -> None:
+    groups = host_groups(["noel-leeming", "pb-tech", "noel-leeming-home", "farmers", "farmers-home", "apple"])
+
+    assert groups == [["noel-leeming", "noel-leeming-home"], ["pb-tech"], ["farmers", "farmers-home"], ["apple"]]
+    assert retailer_host("pet-co-nz") == "pet.co.nz"
+
+
+def test_hosts_run_in_parallel_and_shared_hosts_in_turn(tmp_path: Path) -> None:
+    retailers = ["noel-leeming", "noel-leeming-home", "pb-tech", "apple"]
+
+    outcomes = run_all(retailers, {"log_dir": str(tmp_path)}, max_parallel=3, target=record_run)
+
+    spans = {retailer: tuple(map(float, (tmp_path / retailer).read_text().split())) for retailer in retailers}
+    assert [outcome.retailer for outcome in outcomes] == retailers
+    assert all(outcome.ok and outcome.summary.items_total == 2 for outcome in outcomes)
+    assert spans["noel-leeming"][1] <= spans["noel-leeming-home"][0]
+    assert spans["pb-tech"][0] < spans["apple"][1] and spans["apple"][0] < spans["pb-tech"][1]
+    assert "=== Summary: 4 passed, 0 failed ===" in format_summary(outcomes)
+
+
+def test_errors_and_timeouts_are_reported_per_retailer() -> None:
+    crashed = run_retailer("apple", {}, target=failing_run)
+    hung = run_retailer("pb-tech", {}, timeout_seconds=0.5, target=failing_run)
+
+    assert (crashed.status, crashed.error) == ("error", "RuntimeError: no products")
+    assert hung.status == "timeout" and hung.seconds < 10
+    summary = format_summary([crashed, hung])
+    assert "=== Summary: 0 passed, 2 failed ===" in summary
+    assert "Failed retailers: apple pb-tech" in summary
@@ -0,0 +1,91 @@
+from worker.adapters.live_base import LiveRetailerAdapter, ParsedProductPage
+from worker.page_cache import PageCache
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "dummy-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+
+
+def parsed_page(source_product_id: str, attributes: dict[str, object] | None = None) -> ParsedProductPage:
+    return ParsedProductPage(
+        source_product_id=source_product_id,
+        url=f"https://example.com/product/{source_product_id}",
+        title=f"Laptop {source_product_id}",
+        image_url=None,
+        brand="Acer",
+        category="laptops",
+        availability="in_stock",
+        gtin=None,
+        mpn=None,
+        model_number=None,
+        attributes=attributes or {},
+        price_nzd=999.0,
+        promo_price_nzd=None,
+        promo_text=None,
+        discount_pct=None,
+    )
+
+
+def test_cache_evicts_least_recently_used_by_count_and_size() -> None:
+    cache: PageCache[str] = PageCache(max_entries=3, max_bytes=10, sizer=len)
+    cache.put("a", "aa")
+    cache.put("b", "bb")
+    cache.put("c", "cc")
+    assert cache.get("a") == "aa"
+    cache.put("d", "dd")
+
+    assert "b" not in cache
+    assert [key for key in ("a", "c", "d") if key in cache] == ["a", "c", "d"]
+
+    cache.put("e", "eeeeee")
+
+    assert "c" not in cache and "a" in cache
+    assert (cache.stats.entries, cache.stats.bytes, cache.stats.evictions) == (3, 10, 2)
+
+
+def test_take_consumes_entries_and_counts_misses() -> None:
+    cache: PageCache[str] = PageCache(max_entries=4, sizer=len)
+    cache.put("a", "page")
+
+    assert cache.take("a") == "page"
+    assert cache.take("a") is None
+    assert cache.get("missing") is None
+    assert len(cache) == 0
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.consumed, cache.stats.bytes) == (1, 2, 1, 0)
+
+
+def test_pinned_entries_are_never_evicted() -> None:
+    cache: PageCache[str] = PageCache(max_entries=2, sizer=len)
+    cache.put("a", "aa", pinned=True)
+    cache.put("b", "bb", pinned=True)
+    cache.put("c", "cc")
+    cache.put("d", "dd", pinned=True)
+
+    assert [key for key in ("a", "b", "c", "d") if key in cache] == ["a", "b", "d"]
+    assert cache.stats.evictions == 1
+    assert cache.take("a") == "aa"
+    cache.clear()
+    assert len(cache) == 0 and cache.stats.bytes == 0
+
+
+def test_adapter_drops_pages_once_fetch_detail_consumes_them(monkeypatch) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, use_fixture_fallback=False, page_cache_entries=2)
+    monkeypatch.setattr(adapter, "_parse_product_page", lambda url, source_product_id: parsed_page(source_product_id))
+    try:
+        listings = [
+            listing
+            for sid in ("a", "b", "c")
+            for listing in adapter.parse_listing({"url": f"https://example.com/product/{sid}", "source_product_id": sid})
+        ]
+        details = [adapter.fetch_detail(listing) for listing in listings]
+    finally:
+        adapter.close()
+
+    assert [detail.price_nzd for detail in details] == [999.0, 999.0, 999.0]
+    stats = adapter.page_cache_stats
+    # Handed-out pages stay pinned past the entry bound until fetch_detail takes them.
+    assert (stats.hits, stats.misses, stats.evictions, stats.entries) == (3, 0, 0, 0)
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.fetchers.async_http import FetchOutcome
+from worker.parse_pool import ProductParsePool
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "dummy-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+
+
+def product_html(idx: int) -> str:
+    return (
+        f"<html><head><title>Laptop {idx}</title>"
+        f'<meta property="og:price:amount" content="{100 + idx}.00" /></head>'
+        f"<body><h1>Laptop {idx}</h1></body></html>"
+    )
+
+
+def missing_html() -> str:
+    return "<html><head><title>Page not found</title></head><body><h1>404</h1></body></html>"
+
+
+def test_pool_returns_same_page_as_inline_parse() -> None:
+    adapter = DummyTechLiveAdapter()
+    pool = ProductParsePool(workers=1)
+    url = "https://example.com/product/laptop-1"
+    try:
+        parsed = pool.submit(adapter, url, "laptop-1", product_html(1)).result(timeout=30)
+    finally:
+        pool.close()
+        adapter.close()
+
+    assert parsed == adapter._parse_product_html(url, "laptop-1", product_html(1))
+
+
+def test_adapter_parses_prefetched_pages_in_worker_processes(monkeypatch: pytest.MonkeyPatch) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, parse_workers=2)
+    urls = [f"https://example.com/product/laptop-{idx}" for idx in range(6)]
+    batches: list[list[str]] = []
+
+    def fake_fetch_pages(batch: list[str], _headers: dict[str, dict[str, str]]) -> list[FetchOutcome | Exception]:
+        batches.append(list(batch))
+        return [
+            FetchOutcome(url=url, text=missing_html() if url.endswith("-3") else product_html(int(url[-1])))
+            for url in batch
+        ]
+
+    parsed_in: list[int] = []
+    original = adapter._parse_product_html
+
+    def tracking_parse(url: str, source_product_id: str, html: str):
+        parsed_in.append(os.getpid())
+        return original(url, source_product_id, html)
+
+    monkeypatch.setattr(adapter, "_fetch_pages", fake_fetch_pages)
+    monkeypatch.setattr(adapter, "_fetch_text", lambda _url: pytest.fail("unexpected sequential fetch"))
+    monkeypatch.setattr(adapter, "_parse_product_html", tracking_parse)
+    adapter._plan_prefetch(urls)
+    try:
+        listings = [adapter.parse_listing({"url": url, "source_product_id": f"sku-{url[-1]}"}) for url in urls]
+    finally:
+        adapter.close()
+
+    assert [[listing.title for listing in items] for items in listings] == [
+        ["Laptop 0"],
+        ["Laptop 1"],
+        ["Laptop 2"],
+        [],
+        ["Laptop 4"],
+        ["Laptop 5"],
+    ]
+    assert adapter._page_cache["sku-5"].source_product_id == "sku-5"
+    assert adapter._page_cache["sku-5"].price_nzd == 105.0
+    # The window after the first is read ahead while workers parse the first.
+    assert batches == [urls[:4], urls[4:]]
+    assert parsed_in == []
@@ -1,5 +1,9 @@
+from dataclasses import replace
 from datetime import datetime, timezone
 
+import pytest
+from sqlalchemy import event, select
+
 from worker.adapters.apple import AppleFixtureAdapter
 from worker.adapters.bargain_chemist import BargainChemistFixtureAdapter
 from worker.adapters.base import NormalizedRetailerProduct, RawDetail, RawListing, SourceAdapter
@@ -11,7 +15,7 @@ from worker.adapters.pb_tech import PBTechFixtureAdapter
 from worker.adapters.sephora import SephoraFixtureAdapter
 from worker.adapters.animates import AnimatesFixtureAdapter
 from worker.pipeline import IngestionPipeline
-from worker.models import LatestPrice, Product, RetailerProduct
+from worker.models import IngestionRun, IngestionRunItem, LatestPrice, Price, Product, RetailerProduct
 
 
 def test_pipeline_ingests_fixture(session):
@@ -251,3 +255,290 @@ def test_vertical_transition_accepts_strong_structured_signal(session):
     normalized = _normalized_vertical_sample(vertical="home-appliances", source="json_ld", confidence=0.96)
 
     assert pipeline._should_transition_vertical("tech", normalized) is True
+
+
+class PricedListingAdapter(SourceAdapter):
+    retailer_slug = "pb-tech"
+    vertical = "tech"
+
+    def __init__(self, items: list[tuple[str, str, object]]) -> None:
+        self.items = items
+        self._prices: dict[int, object] = {}
+
+    def list_pages(self):
+        yield {"items": self.items}
+
+    def parse_listing(self, page: dict[str, object]) -> list[RawListing]:
+        listings = []
+        for source_product_id, gtin, price in page["items"]:  # type: ignore[union-attr]
+            listing = RawListing(
+                source_product_id=source_product_id,
+                title=f"Monitor {gtin}",
+                url=f"https://example.com/{source_product_id}",
+                image_url=None,
+                category="monitors",
+                brand="Dell",
+                availability="in_stock",
+            )
+            self._prices[id(listing)] = price
+            listings.append(listing)
+        return listings
+
+    def fetch_detail(self, listing: RawListing) -> RawDetail:
+        return RawDetail(
+            gtin=listing.title.split()[-1],
+            mpn=None,
+            model_number=None,
+            attributes={},
+            price_nzd=self._prices.pop(id(listing)),  # type: ignore[arg-type]
+            promo_price_nzd=None,
+            promo_text=None,
+            discount_pct=None,
+            captured_at=datetime.now(timezone.utc),
+        )
+
+    def normalize(self, listing: RawListing, detail: RawDetail) -> NormalizedRetailerProduct:
+        return NormalizedRetailerProduct(
+            vertical="tech",
+            source_product_id=listing.source_product_id,
+            title=listing.title,
+            url=listing.url,
+            image_url=None,
+            canonical_name=listing.title,
+            brand="Dell",
+            category="monitors",
+            model_number=None,
+            gtin=detail.gtin,
+            mpn=None,
+            attributes={},
+            raw_attributes={},
+            availability=listing.availability,
+            price_nzd=detail.price_nzd,
+            promo_price_nzd=None,
+            promo_text=None,
+            discount_pct=None,
+            captured_at=detail.captured_at,
+        )
+
+
+def latest_prices(session) -> dict[str, float]:
+    rows = session.query(RetailerProduct.source_product_id, LatestPrice.price_nzd).join(
+        LatestPrice, LatestPrice.retailer_product_id == RetailerProduct.id
+    )
+    return {source_product_id: float(price) for source_product_id, price in rows}
+
+
+def test_batched_writes_upsert_latest_prices(session):
+    items = [("a", "100001", 100.0), ("b", "100001", 200.0), ("c", "100003", 300.0), ("d", "100004", 400.0)]
+    first = IngestionPipeline(session, PricedListingAdapter(items), batch_size=3).run()
+
+    assert (first.items_total, first.items_new, first.items_updated, first.items_failed) == (4, 4, 0, 0)
+    # "b" shares a GTIN with "a" and matches the product created earlier in the same batch.
+    assert session.query(Product).count() == 3
+    assert latest_prices(session) == {"a": 100.0, "b": 200.0, "c": 300.0, "d": 400.0}
+
+    items[2] = ("c", "100003", 279.0)
+    second = IngestionPipeline(session, PricedListingAdapter(items), batch_size=3).run()
+
+    assert (second.items_new, second.items_updated) == (0, 4)
+    # Only the repriced product gets a new history row; the rest extend their interval.
+    assert session.query(Price).count() == 5
+    assert latest_prices(session)["c"] == 279.0
+
+
+def test_products_store_normalized_name_and_identifier_keys(session):
+    IngestionPipeline(session, PricedListingAdapter([("a", " 100-001 ", 100.0)]), batch_size=1).run()
+
+    product = session.query(Product).one()
+    assert (product.normalized_name, product.name_tokens, product.gtin_key) == ("MONITOR 100 001", "001 100 MONITOR", "100-001")
+    assert product.mpn_key is None and product.model_key is None
+
+
+def test_batch_falls_back_to_single_item_writes_on_failure(session):
+    items = [("a", "200001", 10.0), ("b", "200002", "not-a-price"), ("c", "200003", 30.0)]
+    run = IngestionPipeline(session, PricedListingAdapter(items), batch_size=10).run()
+
+    assert run.status == "completed"
+    assert (run.items_total, run.items_new, run.items_updated, run.items_failed) == (3, 2, 0, 1)
+    assert latest_prices(session) == {"a": 10.0, "c": 30.0}
+    assert session.query(RetailerProduct).count() == 2
+
+
+def test_batched_writes_issue_fewer_statements(session):
+    items = [(f"sku-{idx}", f"3000{idx:02d}", 50.0 + idx) for idx in range(20)]
+    IngestionPipeline(session, PricedListingAdapter(items), batch_size=20).run()
+    statements: list[str] = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    repriced = [(sid, gtin, price + 1) for sid, gtin, price in items]
+    IngestionPipeline(session, PricedListingAdapter(repriced), batch_size=20).run()
+    batched = len(statements)
+    statements.clear()
+    IngestionPipeline(session, PricedListingAdapter(items), batch_size=1).run()
+
+    assert batched < len(statements) / 2
+    assert latest_prices(session)["sku-7"] == 57.0
+
+
+class NamedListingAdapter(PricedListingAdapter):
+    def parse_listing(self, page: dict[str, object]) -> list[RawListing]:
+        listings = super().parse_listing(page)
+        for listing, (_, name, _) in zip(listings, page["items"]):  # type: ignore[arg-type]
+            listing.title = name
+        return listings
+
+    def fetch_detail(self, listing: RawListing) -> RawDetail:
+        return replace(super().fetch_detail(listing), gtin=None)
+
+    def normalize(self, listing: RawListing, detail: RawDetail) -> NormalizedRetailerProduct:
+        return replace(super().normalize(listing, detail), attributes={"panel": "ips", "refresh_rate": "144hz"})
+
+
+def test_batch_rescores_only_against_products_written_earlier_in_it(session, monkeypatch):
+    names = ["UltraSharp U2723QE", "Alienware AW3423DW", "Odyssey G7 Curved", "ProArt PA278QV", "UltraSharp U2723QE"]
+    pipeline = IngestionPipeline(
+        session, NamedListingAdapter([(f"named-{idx}", name, 400.0 + idx) for idx, name in enumerate(names)])
+    )
+    monkeypatch.setattr(pipeline.matcher, "match", lambda *args, **kwargs: pytest.fail("unexpected rematch"))
+
+    run = pipeline.run()
+
+    assert (run.status, run.items_new) == ("completed", 5)
+    product_ids = dict(session.query(RetailerProduct.source_product_id, RetailerProduct.product_id))
+    # The repeat finds the product its first listing created earlier in the batch.
+    assert product_ids["named-4"] == product_ids["named-0"]
+    assert session.query(Product).count() == 4
+
+
+def price_intervals(session, source_product_id: str) -> list[tuple[float, int]]:
+    rows = (
+        session.query(Price.price_nzd, Price.observed_count)
+        .join(RetailerProduct, RetailerProduct.id == Price.retailer_product_id)
+        .filter(RetailerProduct.source_product_id == source_product_id)
+        .order_by(Price.captured_at)
+    )
+    return [(float(price), observed_count) for price, observed_count in rows]
+
+
+@pytest.mark.parametrize("batch_size", [1, 50])
+def test_unchanged_prices_extend_the_current_interval(session, batch_size):
+    for price in (10.0, 10.0, 10.0, 12.5, 12.5, 10.0):
+        IngestionPipeline(session, PricedListingAdapter([("a", "400001", price)]), batch_size=batch_size).run()
+
+    assert price_intervals(session, "a") == [(10.0, 3), (12.5, 2), (10.0, 1)]
+    latest = session.query(LatestPrice).one()
+    interval = session.get(Price, latest.price_id)
+    assert float(interval.price_nzd) == 10.0
+    assert interval.last_seen_at == interval.captured_at
+
+
+def test_repeats_within_one_batch_collapse_before_insert(session):
+    items = [("a", "500001", 20.0), ("a", "500001", 20.0), ("a", "500001", 21.0), ("a", "500001", 21.0)]
+    run = IngestionPipeline(session, PricedListingAdapter(items), batch_size=10).run()
+
+    assert (run.items_new, run.items_updated) == (1, 3)
+    assert price_intervals(session, "a") == [(20.0, 2), (21.0, 2)]
+
+
+def test_collapsing_can_be_disabled(session):
+    for _ in range(3):
+        IngestionPipeline(
+            session, PricedListingAdapter([("a", "600001", 5.0)]), collapse_unchanged_prices=False
+        ).run()
+
+    assert price_intervals(session, "a") == [(5.0, 1), (5.0, 1), (5.0, 1)]
+
+
+class StreamingAdapter(PricedListingAdapter):
+    def __init__(self, count: int) -> None:
+        super().__init__([(f"stream-{idx}", f"7{idx:05d}", 10.0 + idx) for idx in range(count)])
+        self.yielded = 0
+
+    def list_pages(self):
+        for item in self.items:
+            self.yielded += 1
+            yield {"items": [item]}
+
+
+def test_pipeline_streams_pages_into_batched_writes(session, monkeypatch):
+    adapter = StreamingAdapter(300)
+    pipeline = IngestionPipeline(session, adapter, batch_size=20, queue_size=8)
+    yielded_at_write: list[int] = []
+    write_items = pipeline._write_items
+
+    def tracking_write(retailer_id, items, run):
+        yielded_at_write.append(adapter.yielded)
+        write_items(retailer_id, items, run)
+
+    monkeypatch.setattr(pipeline, "_write_items", tracking_write)
+    run = pipeline.run()
+
+    assert (run.status, run.items_total, run.items_new) == ("completed", 300, 300)
+    # The first batch is written while discovery is still yielding pages.
+    assert yielded_at_write[0] < 300
+    assert latest_prices(session)["stream-299"] == 309.0
+
+
+class InterruptedAdapter(PricedListingAdapter):
+    def __init__(self, count: int, fail_after: int | None = None) -> None:
+        super().__init__([(f"resume-{idx}", f"8{idx:05d}", 20.0 + idx) for idx in range(count)])
+        self.fail_after = fail_after
+        self.fetched: list[str] = []
+        self.skipped: set[str] = set()
+
+    def skip_products(self, source_product_ids) -> None:
+        self.skipped = set(source_product_ids)
+
+    def list_pages(self):
+        for position, item in enumerate(self.items):
+            if position == self.fail_after:
+                raise RuntimeError("blocked by WAF")
+            yield {"items": [item], "source_product_id": item[0]}
+
+    def fetch_detail(self, listing: RawListing) -> RawDetail:
+        self.fetched.append(listing.source_product_id)
+        return super().fetch_detail(listing)
+
+
+def test_runs_checkpoint_and_resume_where_they_stopped(session, monkeypatch):
+    commits: list[int] = []
+    commit = session.commit
+    monkeypatch.setattr(session, "commit", lambda: commits.append(1) or commit())
+
+    first = IngestionPipeline(session, InterruptedAdapter(10, fail_after=6), batch_size=2, commit_every=2).run()
+    processed = set(
+        session.scalars(select(IngestionRunItem.source_product_id).where(IngestionRunItem.run_id == first.id))
+    )
+
+    assert (first.status, first.error_summary, first.items_new) == ("failed", "blocked by WAF", 6)
+    assert processed == {f"resume-{idx}" for idx in range(6)}
+    # Start, one checkpoint per two-item batch, and the final commit.
+    assert len(commits) == 5
+
+    adapter = InterruptedAdapter(10)
+    resumed = IngestionPipeline(session, adapter, batch_size=2, resume_run_id=first.id).run()
+
+    assert resumed.id == first.id
+    assert (resumed.status, resumed.error_summary, resumed.items_total, resumed.items_new) == ("completed", None, 10, 10)
+    assert adapter.fetched == [f"resume-{idx}" for idx in range(6, 10)]
+    assert adapter.skipped == processed
+    assert session.query(IngestionRunItem).filter(IngestionRunItem.run_id == first.id).count() == 10
+    with pytest.raises(ValueError, match="already completed"):
+        IngestionPipeline(session, InterruptedAdapter(1), resume_run_id=first.id).run()
+
+
+class SetupFailureAdapter(PricedListingAdapter):
+    def __init__(self) -> None:
+        super().__init__([("setup-0", "800000", 20.0)])
+
+    def skip_products(self, source_product_ids) -> None:
+        raise RuntimeError("adapter not ready")
+
+
+def test_setup_failures_after_the_run_starts_mark_it_failed(session):
+    run = IngestionPipeline(session, SetupFailureAdapter()).run()
+    session.expire_all()
+    stored = session.get(IngestionRun, run.id)
+
+    assert (stored.status, stored.error_summary, stored.items_total) == ("failed", "adapter not ready", 0)
+    assert stored.finished_at is not None
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import pytest
+from redis.exceptions import ConnectionError
+
+from worker.fetchers.rate_limit import (
+    RESERVE_SCRIPT,
+    HostRateLimiter,
+    InProcessRateLimitBackend,
+    RateLimit,
+    RedisRateLimitBackend,
+)
+
+
+class _FakeRedis:
+    """Runs the reservation script's arithmetic in Python, one call at a time like Redis does."""
+
+    def __init__(self, down: bool = False) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.expiries: dict[str, int] = {}
+        self.scripts: list[str] = []
+        self.down = down
+
+    def register_script(self, script: str):
+        self.scripts.append(script)
+
+        def run(keys: list[str], args: list[object]) -> str:
+            if self.down:
+                raise ConnectionError("redis is down")
+            burst, rate, now, ttl = int(args[0]), float(args[1]), float(args[2]), int(args[3])
+            state = self.hashes.get(keys[0], {})
+            tokens = float(state["tokens"]) if "tokens" in state else float(burst)
+            if "updated_at" in state:
+                tokens = min(burst, tokens + max(0.0, now - float(state["updated_at"])) * rate)
+            tokens -= 1
+            self.hashes[keys[0]] = {"tokens": repr(tokens), "updated_at": repr(now)}
+            self.expiries[keys[0]] = ttl
+            return "0" if tokens >= 0 else repr(-tokens / rate)
+
+        return run
+
+
+def test_in_process_bucket_allows_burst_then_spaces_requests() -> None:
+    backend = InProcessRateLimitBackend()
+    limit = RateLimit(rate_per_second=2.0, burst=2)
+
+    waits = [backend.reserve("example.com", limit, now=100.0) for _ in range(4)]
+
+    assert waits == [0.0, 0.0, pytest.approx(0.5), pytest.approx(1.0)]
+    assert backend.reserve("example.com", limit, now=103.0) == 0.0
+
+
+def test_in_process_buckets_are_keyed_by_host() -> None:
+    backend = InProcessRateLimitBackend()
+    limit = RateLimit(rate_per_second=1.0, burst=1)
+
+    assert backend.reserve("a.example.com", limit, now=10.0) == 0.0
+    assert backend.reserve("b.example.com", limit, now=10.0) == 0.0
+    assert backend.reserve("a.example.com", limit, now=10.0) == pytest.approx(1.0)
+
+
+def test_redis_backend_shares_budget_between_processes() -> None:
+    redis = _FakeRedis()
+    worker_a = RedisRateLimitBackend(redis)
+    worker_b = RedisRateLimitBackend(redis)
+    limit = RateLimit(rate_per_second=1.0, burst=1)
+
+    assert worker_a.reserve("www.harveynorman.co.nz", limit, now=50.0) == 0.0
+    assert worker_b.reserve("www.harveynorman.co.nz", limit, now=50.0) == pytest.approx(1.0)
+    assert worker_a.reserve("www.harveynorman.co.nz", limit, now=50.0) == pytest.approx(2.0)
+
+
+def test_redis_backend_reserves_with_one_script_call() -> None:
+    redis = _FakeRedis()
+    backend = RedisRateLimitBackend(redis)
+
+    assert backend.reserve("example.com", RateLimit(rate_per_second=1.0, burst=1), now=1.0) == 0.0
+    assert redis.scripts == [RESERVE_SCRIPT]
+    assert redis.hashes["worthit:ratelimit:example.com"] == {"tokens": "0.0", "updated_at": "1.0"}
+    assert redis.expiries["worthit:ratelimit:example.com"] == 61
+
+
+def test_redis_backend_falls_back_only_when_redis_fails() -> None:
+    backend = RedisRateLimitBackend(_FakeRedis(down=True))
+    limit = RateLimit(rate_per_second=1.0, burst=1)
+
+    assert backend.reserve("example.com", limit, now=1.0) == 0.0
+    assert backend.reserve("example.com", limit, now=1.0) == pytest.approx(1.0)
+
+
+def test_acquire_async_reserves_off_the_event_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    class ThreadRecordingBackend:
+        def __init__(self) -> None:
+            self.threads: list[int] = []
+
+        def reserve(self, key: str, limit: RateLimit, now: float) -> float:
+            self.threads.append(threading.get_ident())
+            return 0.25
+
+    backend = ThreadRecordingBackend()
+    slept: list[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        slept.append(seconds)
+
+    monkeypatch.setattr("worker.fetchers.rate_limit.asyncio.sleep", fake_sleep)
+
+    async def acquire() -> int:
+        await HostRateLimiter(backend).acquire_async("example.com", RateLimit(rate_per_second=4.0))
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(acquire())
+
+    assert backend.threads and backend.threads[0] != loop_thread
+    assert slept == [0.25]
+
+
+def test_adapters_on_same_host_share_limiter(monkeypatch: pytest.MonkeyPatch) -> None:
+    from worker.adapters.harvey_norman import HarveyNormanHomeLiveAdapter, HarveyNormanLiveAdapter
+
+    limiter = HostRateLimiter(InProcessRateLimitBackend())
+    tech = HarveyNormanLiveAdapter(use_fixture_fallback=False, request_delay_seconds=1.0, rate_limiter=limiter)
+    home = HarveyNormanHomeLiveAdapter(use_fixture_fallback=False, request_delay_seconds=1.0, rate_limiter=limiter)
+    waits: list[float] = []
+    monkeypatch.setattr("worker.fetchers.rate_limit.time.sleep", waits.append)
+
+    for adapter in (tech, home):
+        limiter.acquire("www.harveynorman.co.nz", adapter.rate_limit)
+
+    assert tech.rate_limit == RateLimit(rate_per_second=1.0, burst=1)
+    assert len(waits) == 1
+    assert waits[0] > 0.9
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.fetchers.raw_store import RawPageStore
+
+PRODUCT_HTML = """
+<html><head>
+<title>Archived Laptop</title>
+<meta property="og:price:amount" content="999.00" />
+</head><body><h1>Archived Laptop</h1></body></html>
+"""
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "dummy-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+    exclude_url_patterns = ["/blog", "?", "#"]
+
+
+@pytest.mark.parametrize("compression", ["gzip", "auto"])
+def test_raw_store_dedupes_identical_bodies(tmp_path: Path, compression: str) -> None:
+    store = RawPageStore(tmp_path / "raw", compression=compression)
+    first = store.put("https://example.com/a", "<html>same</html>", source="dummy")
+    second = store.put("https://example.com/b", "<html>same</html>", source="dummy")
+    store.put("https://example.com/a", "<html>changed</html>", source="dummy")
+
+    objects = [path for path in (tmp_path / "raw" / "objects").rglob("*") if path.is_file()]
+
+    assert first == second
+    assert len(objects) == 2
+    assert store.get(first) == "<html>same</html>"
+    assert store.latest("https://example.com/a") == "<html>changed</html>"
+    assert dict(store.iter_latest(source="dummy")) == {
+        "https://example.com/b": "<html>same</html>",
+        "https://example.com/a": "<html>changed</html>",
+    }
+
+
+def test_raw_store_prune_keeps_latest_body_per_url(tmp_path: Path) -> None:
+    store = RawPageStore(tmp_path / "raw", compression="gzip")
+    old = store.put("https://example.com/a", "<html>old</html>")
+    store.put("https://example.com/a", "<html>new</html>")
+    store._conn.execute("UPDATE fetches SET fetched_at = '2000-01-01T00:00:00+00:00'")
+    store._conn.commit()
+
+    removed = store.prune(retention_days=30)
+
+    assert removed == 1
+    with pytest.raises(KeyError):
+        store.get(old)
+    assert store.latest("https://example.com/a") == "<html>new</html>"
+
+
+def test_replay_reparses_archived_pages_without_network(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    store = RawPageStore(tmp_path / "raw")
+    url = "https://example.com/product/laptop-1"
+
+    live = DummyTechLiveAdapter(max_fetch_retries=0, raw_store=store)
+    monkeypatch.setattr(
+        live.client,
+        "get",
+        lambda target_url: httpx.Response(200, request=httpx.Request("GET", target_url), text=PRODUCT_HTML),
+    )
+    live_page = live._parse_product_page(url=url, source_product_id="laptop-1")
+
+    replay = DummyTechLiveAdapter(max_fetch_retries=0, raw_store=store, replay=True)
+    monkeypatch.setattr(replay.client, "get", lambda _url: pytest.fail("replay hit the network"))
+    replayed = replay._parse_product_page(url=url, source_product_id="laptop-1")
+
+    assert replayed == live_page
+    with pytest.raises(RuntimeError, match="No archived body"):
+        replay._fetch_text("https://example.com/product/missing")
+
+
+def test_streamed_sitemaps_are_archived_only_when_fully_read(tmp_path: Path) -> None:
+    store = RawPageStore(tmp_path / "raw")
+    xml = (
+        "<urlset>"
+        "<url><loc>https://example.com/product/a</loc></url>"
+        "<url><loc>https://example.com/product/b</loc></url>"
+        "</urlset>"
+    )
+    live = DummyTechLiveAdapter(max_fetch_retries=0, raw_store=store)
+    live.client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text=xml)))
+
+    partial = live._iter_sitemap("https://example.com/partial.xml")
+    next(partial)
+    partial.close()
+    entries = list(live._iter_sitemap("https://example.com/sitemap.xml"))
+
+    assert len(entries) == 2
+    assert store.latest("https://example.com/partial.xml") is None
+    assert store.latest("https://example.com/sitemap.xml") == xml
+    assert not list((tmp_path / "raw" / "objects").rglob("*.tmp"))
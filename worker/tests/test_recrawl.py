@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from worker.adapters.live_base import LiveRetailerAdapter, ParsedProductPage
+from worker.adapters.pb_tech import PBTechFixtureAdapter
+from worker.models import LatestPrice, Price, Product, Retailer, RetailerProduct
+from worker.pipeline import IngestionPipeline
+from worker.recrawl import recrawl_queue
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "pb-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+
+
+def parsed_page(source_product_id: str) -> ParsedProductPage:
+    return ParsedProductPage(
+        source_product_id=source_product_id,
+        url=f"https://example.com/product/{source_product_id}",
+        title=f"Acer Laptop {source_product_id}",
+        image_url=None,
+        brand="Acer",
+        category="laptops",
+        availability="in_stock",
+        gtin=None,
+        mpn=None,
+        model_number=None,
+        attributes={},
+        price_nzd=999.0,
+        promo_price_nzd=None,
+        promo_text=None,
+        discount_pct=None,
+    )
+
+
+def seed_listing(
+    session,
+    sid: str,
+    last_seen: timedelta,
+    intervals: int = 1,
+    observations: int = 1,
+    promo: bool = False,
+    views: int = 0,
+    now: datetime = NOW,
+) -> None:
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == "pb-tech"))
+    product = Product(canonical_name=f"acer laptop {sid}", brand="Acer", category="laptops", view_count=views)
+    session.add(product)
+    session.flush()
+    listing = RetailerProduct(
+        retailer_id=retailer_id,
+        product_id=product.id,
+        source_product_id=sid,
+        title=f"Acer Laptop {sid}",
+        url=f"https://example.com/product/{sid}",
+    )
+    session.add(listing)
+    session.flush()
+    for index in range(intervals):
+        seen = observations - intervals + 1 if index == intervals - 1 else 1
+        session.add(
+            Price(
+                retailer_product_id=listing.id,
+                price_nzd=Decimal(999 - index),
+                captured_at=now - last_seen - timedelta(days=intervals - index),
+                last_seen_at=now - last_seen,
+                observed_count=seen,
+            )
+        )
+    session.add(
+        LatestPrice(
+            retailer_product_id=listing.id,
+            price_nzd=Decimal("999.00"),
+            promo_price_nzd=Decimal("899.00") if promo else None,
+            captured_at=now - last_seen,
+        )
+    )
+    session.commit()
+
+
+def test_queue_ranks_stale_volatile_promoted_and_viewed_listings_first(session) -> None:
+    seed_listing(session, "fresh", timedelta(hours=1))
+    seed_listing(session, "stale", timedelta(days=10))
+    seed_listing(session, "volatile", timedelta(hours=1), intervals=4, observations=5)
+    seed_listing(session, "promo", timedelta(hours=1), promo=True)
+    seed_listing(session, "viewed", timedelta(hours=1), views=200)
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == "pb-tech"))
+
+    queue = recrawl_queue(session, retailer_id, now=NOW)
+    top = recrawl_queue(session, retailer_id, limit=2, now=NOW)
+
+    assert [candidate.source_product_id for candidate in queue] == ["viewed", "volatile", "promo", "stale", "fresh"]
+    assert [candidate.source_product_id for candidate in top] == ["viewed", "volatile"]
+    assert queue[1].change_rate == pytest.approx(0.6)
+    assert queue[2].on_promo and queue[0].view_count == 200
+
+
+def test_queue_ranks_volatile_listings_above_long_ignored_ones(session) -> None:
+    seed_listing(session, "ignored", timedelta(days=60))
+    seed_listing(session, "week-old", timedelta(days=7))
+    seed_listing(session, "half-volatile", timedelta(hours=1), intervals=3, observations=4)
+    seed_listing(session, "steady", timedelta(hours=1), observations=20)
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == "pb-tech"))
+
+    queue = recrawl_queue(session, retailer_id, now=NOW)
+
+    assert [candidate.source_product_id for candidate in queue] == ["half-volatile", "ignored", "week-old", "steady"]
+    assert queue[1].stale_days == 14.0
+
+
+def test_change_rate_ignores_repeat_rows_when_prices_are_not_collapsed(session) -> None:
+    for _ in range(3):
+        run = IngestionPipeline(session, PBTechFixtureAdapter(), collapse_unchanged_prices=False).run()
+        assert run.status == "completed"
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == "pb-tech"))
+    listings = session.scalar(select(func.count(RetailerProduct.id)).where(RetailerProduct.retailer_id == retailer_id))
+
+    queue = recrawl_queue(session, retailer_id)
+
+    assert session.scalar(select(func.count(Price.id))) == 3 * listings
+    assert len(queue) == listings
+    assert [candidate.change_rate for candidate in queue] == [0.0] * listings
+
+
+def test_recrawl_run_fetches_known_urls_without_discovery(session, monkeypatch: pytest.MonkeyPatch) -> None:
+    now = datetime.now(timezone.utc)
+    seed_listing(session, "a", timedelta(hours=2), now=now)
+    seed_listing(session, "b", timedelta(days=3), now=now)
+    seed_listing(session, "c", timedelta(days=5), now=now)
+    adapter = DummyTechLiveAdapter(max_products=2, max_fetch_retries=0, use_fixture_fallback=False)
+    parsed: list[str] = []
+
+    def parse(url: str, source_product_id: str) -> ParsedProductPage:
+        parsed.append(source_product_id)
+        return parsed_page(source_product_id)
+
+    monkeypatch.setattr(adapter, "_discover_product_urls", lambda: pytest.fail("recrawl must not discover URLs"))
+    monkeypatch.setattr(adapter, "_probe_live_urls", lambda _urls: pytest.fail("recrawl must not probe"))
+    monkeypatch.setattr(adapter, "_parse_product_page", parse)
+    try:
+        run = IngestionPipeline(session, adapter, recrawl=True).run()
+    finally:
+        adapter.close()
+
+    assert run.status == "completed"
+    assert (run.items_total, run.items_new, run.items_updated) == (2, 0, 2)
+    assert parsed == ["c", "b"]
@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy import select
+from sqlalchemy.orm import sessionmaker
+
+from worker.adapters.base import RawDetail, RawListing, SourceAdapter
+from worker.main import RunSummary
+from worker.models import IngestionRun, Price, Retailer, RetailerProduct
+from worker.scheduler import CadencePolicy, RecrawlScheduler, WarmAdapters, retailer_volatility
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+POLICY = CadencePolicy(min_interval=timedelta(hours=1), max_interval=timedelta(hours=16), window=timedelta(days=7))
+
+
+class CountingAdapter(SourceAdapter):
+    retailer_slug = "pb-tech"
+
+    def __init__(self) -> None:
+        self.runs = 0
+        self.closed = False
+
+    def list_pages(self):
+        return []
+
+    def parse_listing(self, page):
+        return []
+
+    def fetch_detail(self, listing: RawListing) -> RawDetail:
+        raise NotImplementedError
+
+    def normalize(self, listing, detail):
+        raise NotImplementedError
+
+    def begin_run(self) -> None:
+        self.runs += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def summary(status: str = "completed") -> RunSummary:
+    return RunSummary(
+        run_id="run",
+        status=status,
+        items_total=1,
+        items_new=0,
+        items_updated=1,
+        items_failed=0,
+        fixture_fallback=False,
+    )
+
+
+def seed_history(session, slug: str, intervals: list[int], finished_at: datetime | None = None) -> None:
+    """One product per entry; each entry is how many crawls saw its current price unchanged."""
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == slug))
+    for index, observed in enumerate(intervals):
+        listing = RetailerProduct(
+            retailer_id=retailer_id, source_product_id=f"{slug}-{index}", title="Item", url="https://example.com"
+        )
+        session.add(listing)
+        session.flush()
+        session.add(
+            Price(
+                retailer_product_id=listing.id,
+                price_nzd=Decimal("10.00"),
+                captured_at=NOW - timedelta(days=2),
+                last_seen_at=NOW - timedelta(hours=2),
+                observed_count=observed,
+            )
+        )
+    if finished_at is not None:
+        session.add(IngestionRun(retailer_id=retailer_id, status="completed", finished_at=finished_at))
+    session.commit()
+
+
+def test_cadence_shortens_as_prices_move_more_often() -> None:
+    intervals = [POLICY.interval(rate) for rate in (0.0, 0.05, 0.1, 0.2, 0.25, 0.9)]
+
+    assert intervals[0] == timedelta(hours=16)
+    assert intervals[-2] == intervals[-1] == timedelta(hours=1)
+    assert intervals == sorted(intervals, reverse=True)
+    assert POLICY.interval(None) == timedelta(hours=1)
+
+
+def test_plan_spaces_retailers_by_price_volatility(session) -> None:
+    seed_history(session, "pb-tech", [1, 1, 2, 1], finished_at=NOW - timedelta(hours=3))
+    seed_history(session, "apple", [40, 40], finished_at=NOW - timedelta(hours=3))
+    session.add(
+        Price(
+            retailer_product_id=session.scalar(select(RetailerProduct.id).where(RetailerProduct.source_product_id == "apple-0")),
+            price_nzd=Decimal("9.00"),
+            captured_at=NOW - timedelta(days=30),
+            last_seen_at=NOW - timedelta(days=20),
+        )
+    )
+    session.commit()
+
+    volatility = retailer_volatility(session, NOW - POLICY.window)
+    scheduler = RecrawlScheduler(
+        ["apple", "pb-tech", "jb-hi-fi"], summary, sessionmaker(bind=session.get_bind()), POLICY, clock=lambda: NOW
+    )
+    scheduler.plan()
+    due = {retailer: due_at for due_at, retailer in scheduler.upcoming()}
+
+    assert (volatility["pb-tech"].changes, volatility["pb-tech"].observations) == (4, 5)
+    assert (volatility["apple"].changes, volatility["apple"].observations) == (2, 80)
+    assert due["pb-tech"] == NOW - timedelta(hours=2)
+    assert due["jb-hi-fi"] == NOW
+    assert NOW + timedelta(hours=3) < due["apple"] < NOW + timedelta(hours=13)
+
+
+def test_volatility_prorates_observations_of_intervals_opened_before_the_window(session) -> None:
+    seed_history(session, "pb-tech", [2])
+    listing_id = session.scalar(select(RetailerProduct.id).where(RetailerProduct.source_product_id == "pb-tech-0"))
+    session.add(
+        Price(
+            retailer_product_id=listing_id,
+            price_nzd=Decimal("12.00"),
+            captured_at=NOW - timedelta(days=27),
+            last_seen_at=NOW - timedelta(days=3),
+            observed_count=360,
+        )
+    )
+    session.commit()
+
+    volatility = retailer_volatility(session, NOW - POLICY.window)
+
+    # 4 of the old interval's 24 days fall inside the 7-day window.
+    assert (volatility["pb-tech"].changes, volatility["pb-tech"].observations) == (1, 62)
+
+
+def test_volatility_compares_rows_when_unchanged_prices_are_not_collapsed(session) -> None:
+    retailer_id = session.scalar(select(Retailer.id).where(Retailer.slug == "pb-tech"))
+    listing = RetailerProduct(retailer_id=retailer_id, source_product_id="flat", title="Item", url="https://example.com")
+    session.add(listing)
+    session.flush()
+    # One row per crawl, as WORTHIT_COLLAPSE_UNCHANGED_PRICES=false writes them; the price moves once.
+    for day, price in enumerate(["10.00", "10.00", "10.00", "12.00", "12.00", "12.00"]):
+        seen = NOW - timedelta(days=6 - day)
+        session.add(
+            Price(
+                retailer_product_id=listing.id,
+                price_nzd=Decimal(price),
+                captured_at=seen,
+                last_seen_at=seen,
+                observed_count=1,
+            )
+        )
+    session.commit()
+
+    volatility = retailer_volatility(session, NOW - POLICY.window)
+
+    assert (volatility["pb-tech"].changes, volatility["pb-tech"].observations) == (2, 6)
+
+
+def test_failed_runs_retry_at_the_minimum_interval_and_rebuild_the_adapter(session) -> None:
+    built: list[CountingAdapter] = []
+    adapters = WarmAdapters(lambda retailer: built.append(CountingAdapter()) or built[-1])
+    outcomes = iter([summary(), RuntimeError("blocked"), summary()])
+
+    def run(retailer: str) -> RunSummary:
+        adapter = adapters.get(retailer)
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            adapters.discard(retailer)
+            raise outcome
+        return outcome
+
+    clock = [NOW]
+    scheduler = RecrawlScheduler(["pb-tech"], run, sessionmaker(bind=session.get_bind()), POLICY, clock=lambda: clock[0])
+    scheduler.plan()
+    first = scheduler.run_next()
+    clock[0] = first.next_run_at
+    second = scheduler.run_next()
+    clock[0] = second.next_run_at
+    third = scheduler.run_next()
+
+    assert (first.status, first.next_run_at) == ("completed", NOW + timedelta(hours=1))
+    assert (second.status, second.error) == ("error", "RuntimeError: blocked")
+    assert second.next_run_at == first.next_run_at + timedelta(hours=1)
+    assert third.status == "completed"
+    assert [adapter.runs for adapter in built] == [2, 1]
+    assert built[0].closed and not built[1].closed
+    adapters.close()
+    assert built[1].closed and len(adapters) == 0
@@ -0,0 +1,119 @@
+import gzip
+
+import httpx
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.fetchers.sitemap import SitemapEntry, iter_sitemap_entries
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "dummy-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+    exclude_url_patterns = ["/blog", "?", "#"]
+
+
+def _urlset(count: int) -> bytes:
+    rows = "".join(
+        f"<url><loc>https://example.com/product/{idx}</loc><lastmod>2026-10-0{idx % 9 + 1}</lastmod></url>"
+        for idx in range(count)
+    )
+    return (
+        '\n  <?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"{rows}</urlset>"
+    ).encode("utf-8")
+
+
+def _chunks(payload: bytes, size: int) -> list[bytes]:
+    return [payload[idx : idx + size] for idx in range(0, len(payload), size)]
+
+
+def test_stream_parser_inflates_gzip_incrementally() -> None:
+    payload = gzip.compress(_urlset(3))
+
+    entries = list(iter_sitemap_entries(_chunks(payload, 7)))
+
+    assert entries == [
+        SitemapEntry(kind="url", loc="https://example.com/product/0", lastmod="2026-10-01"),
+        SitemapEntry(kind="url", loc="https://example.com/product/1", lastmod="2026-10-02"),
+        SitemapEntry(kind="url", loc="https://example.com/product/2", lastmod="2026-10-03"),
+    ]
+
+
+def test_stream_parser_ignores_nested_extension_locs() -> None:
+    xml = b"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
+      xmlns:image="http://www.google.com/schemas/sitemap-image/1.1">
+      <sitemap><loc>https://example.com/a.xml</loc></sitemap>
+      <sitemap><image:image><image:loc>https://example.com/x.jpg</image:loc></image:image>
+        <loc>https://example.com/b.xml</loc></sitemap>
+    </sitemapindex>"""
+
+    entries = list(iter_sitemap_entries([xml]))
+
+    assert [entry.loc for entry in entries] == ["https://example.com/a.xml", "https://example.com/b.xml"]
+    assert {entry.kind for entry in entries} == {"sitemap"}
+
+
+def test_discovery_stops_reading_sitemap_once_enough_candidates_found() -> None:
+    chunks = _chunks(_urlset(2000), 512)
+    served = {"chunks": 0}
+
+    def body():
+        for chunk in chunks:
+            served["chunks"] += 1
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(200, content=body())
+        return httpx.Response(404)
+
+    adapter = DummyTechLiveAdapter(max_products=2, max_fetch_retries=0)
+    adapter.client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    urls = adapter._discover_product_urls()
+
+    assert urls == [f"https://example.com/product/{idx}" for idx in range(8)]
+    assert served["chunks"] < len(chunks) // 10
+
+
+class StaleFrontier:
+    def __init__(self) -> None:
+        self.recorded: list[str] = []
+
+    def is_fresh(self, url, lastmod=None) -> bool:
+        return False
+
+    def record_discovered(self, urls, lastmods=None) -> None:
+        self.recorded.extend(urls)
+
+    def prioritize(self, urls):
+        return list(urls)
+
+
+def test_discovery_caps_urls_read_when_frontier_has_seen_them() -> None:
+    chunks = _chunks(_urlset(2000), 512)
+    served = {"chunks": 0}
+
+    def body():
+        for chunk in chunks:
+            served["chunks"] += 1
+            yield chunk
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(200, content=body())
+        return httpx.Response(404)
+
+    adapter = DummyTechLiveAdapter(max_products=2, max_fetch_retries=0)
+    adapter.client = httpx.Client(transport=httpx.MockTransport(handler))
+    adapter.frontier = StaleFrontier()
+
+    adapter._discover_product_urls()
+
+    # Two products need eight candidates, and at most ten times that many URLs are read.
+    assert len(adapter.frontier.recorded) == 80
+    assert served["chunks"] < len(chunks) // 2
@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from worker.stages import Stage, StagedPipeline, StageError
+
+
+def test_stages_keep_order_and_fan_out_results() -> None:
+    pipeline = StagedPipeline(
+        lambda: iter(range(5)),
+        [Stage("double", lambda item: [item, item]), Stage("square", lambda item: [item * item])],
+        queue_size=1,
+    )
+
+    assert list(pipeline) == [0, 0, 1, 1, 4, 4, 9, 9, 16, 16]
+
+
+def test_failed_items_pass_through_and_source_errors_reach_the_consumer() -> None:
+    def source():
+        yield from (1, 2, 3)
+        raise RuntimeError("sitemap went away")
+
+    def parse(item: int) -> list[int]:
+        if item == 2:
+            raise ValueError("bad page")
+        return [item]
+
+    seen: list[object] = []
+    with pytest.raises(RuntimeError, match="sitemap went away"):
+        for result in StagedPipeline(source, [Stage("parse", parse), Stage("noop", lambda item: [item])]):
+            seen.append(result)
+
+    assert seen[0] == 1 and seen[2] == 3
+    assert isinstance(seen[1], StageError)
+    assert (seen[1].stage, seen[1].item, str(seen[1].error)) == ("parse", 2, "bad page")
+
+
+def test_bounded_queues_hold_back_the_source() -> None:
+    produced = 0
+
+    def source():
+        nonlocal produced
+        for item in range(1000):
+            produced += 1
+            yield item
+
+    results = iter(StagedPipeline(source, [Stage("noop", lambda item: [item])], queue_size=4))
+    assert next(results) == 0
+    time.sleep(0.3)
+
+    # Two queues of four, one item in the stage and one waiting in the source.
+    assert produced <= 11
+    results.close()
+
+
+def test_workers_share_a_stage_and_stop_when_the_consumer_leaves() -> None:
+    threads: set[str] = set()
+    gate = threading.Barrier(3, timeout=5)
+
+    def slow(item: int) -> list[int]:
+        threads.add(threading.current_thread().name + str(threading.get_ident()))
+        if item < 3:
+            gate.wait()
+        return [item]
+
+    pipeline = StagedPipeline(lambda: iter(range(200)), [Stage("slow", slow, workers=3)], queue_size=2)
+    results = iter(pipeline)
+    first = [next(results) for _ in range(3)]
+    results.close()
+
+    # Items 0-2 only get past the barrier when three workers hold them at once.
+    assert not any(isinstance(result, StageError) for result in first)
+    assert len(threads) == 3
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("ingest-")]
@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.fetchers.validators import ValidatorCache
+
+
+class DummyTechLiveAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "dummy-tech"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+    exclude_url_patterns = ["/blog", "?", "#"]
+
+
+def _response(url: str, status_code: int = 200, text: str = "", headers: dict[str, str] | None = None) -> httpx.Response:
+    return httpx.Response(status_code, request=httpx.Request("GET", url), content=text.encode("utf-8"), headers=headers)
+
+PRODUCT_HTML = """
+<html><head>
+<title>Cached Laptop</title>
+<meta property="og:price:amount" content="1299.00" />
+</head><body><h1>Cached Laptop</h1></body></html>
+"""
+
+SITEMAP_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/product/laptop-1</loc></url>
+  <url><loc>https://example.com/product/laptop-2</loc></url>
+</urlset>
+"""
+
+
+def test_validator_cache_round_trip(tmp_path: Path) -> None:
+    cache = ValidatorCache(tmp_path / "validators.sqlite3")
+    cache.put("product:x:tech", "https://example.com/a", '"abc"', None, {"title": "A"})
+    cache.put("product:x:tech", "https://example.com/b", None, None, {"title": "B"})
+    cache.close()
+
+    reopened = ValidatorCache(tmp_path / "validators.sqlite3")
+    entry = reopened.get("product:x:tech", "https://example.com/a")
+
+    assert entry is not None
+    assert entry.payload == {"title": "A"}
+    assert entry.conditional_headers() == {"If-None-Match": '"abc"'}
+    assert reopened.get("product:x:tech", "https://example.com/b") is None
+    assert reopened.get("product:y:tech", "https://example.com/a") is None
+
+
+def test_product_page_reused_on_not_modified(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    adapter = DummyTechLiveAdapter(max_fetch_retries=0, http_cache_path=str(tmp_path / "http.sqlite3"))
+    url = "https://example.com/product/laptop-1"
+    sent_headers: list[dict[str, str] | None] = []
+
+    def fake_get(target_url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        sent_headers.append(headers)
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _response(target_url, status_code=304, headers={"ETag": '"v1"'})
+        return _response(target_url, text=PRODUCT_HTML, headers={"ETag": '"v1"'})
+
+    monkeypatch.setattr(adapter.client, "get", fake_get)
+    first = adapter._parse_product_page(url=url, source_product_id="laptop-1")
+    monkeypatch.setattr(adapter, "_parse_product_html", lambda *_args: pytest.fail("unchanged page was re-parsed"))
+    second = adapter._parse_product_page(url=url, source_product_id="laptop-1")
+    adapter.close()
+
+    assert sent_headers == [None, {"If-None-Match": '"v1"'}]
+    assert second == first
+    assert second.price_nzd == pytest.approx(1299.0)
+
+
+def test_parser_version_change_refetches_unconditionally(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    cache = ValidatorCache(tmp_path / "http.sqlite3")
+    url = "https://example.com/product/laptop-1"
+    sent_headers: list[dict[str, str] | None] = []
+
+    def fake_get(target_url: str, headers: dict[str, str] | None = None) -> httpx.Response:
+        sent_headers.append(headers)
+        return _response(target_url, text=PRODUCT_HTML, headers={"ETag": '"v1"'})
+
+    for version in (1, 1, 2):
+        monkeypatch.setattr("worker.adapters.live_base.PARSER_VERSION", version)
+        adapter = DummyTechLiveAdapter(max_fetch_retries=0, validator_cache=cache)
+        monkeypatch.setattr(adapter.client, "get", fake_get)
+        adapter._parse_product_page(url=url, source_product_id="laptop-1")
+        adapter.close()
+
+    assert sent_headers == [None, {"If-None-Match": '"v1"'}, None]
+
+
+def test_sitemap_urls_reused_on_not_modified(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    cache = ValidatorCache(tmp_path / "http.sqlite3")
+    modified = "Wed, 01 Oct 2026 00:00:00 GMT"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/robots.txt":
+            return httpx.Response(404)
+        if request.headers.get("if-modified-since") == modified:
+            return httpx.Response(304)
+        return httpx.Response(200, text=SITEMAP_XML, headers={"Last-Modified": modified})
+
+    first_run = DummyTechLiveAdapter(max_fetch_retries=0, validator_cache=cache)
+    first_run.client = httpx.Client(transport=httpx.MockTransport(handler))
+    first_urls = first_run._discover_product_urls()
+
+    second_run = DummyTechLiveAdapter(max_fetch_retries=0, validator_cache=cache)
+    second_run.client = httpx.Client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(
+        "worker.adapters.live_base.SitemapStreamParser",
+        lambda **_kwargs: pytest.fail("unchanged sitemap was re-parsed"),
+    )
+    second_urls = second_run._discover_product_urls()
+
+    assert first_urls == ["https://example.com/product/laptop-1", "https://example.com/product/laptop-2"]
+    assert second_urls == first_urls
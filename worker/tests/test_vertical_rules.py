@@ -0,0 +1,131 @@
+import json
+import pickle
+import re
+from pathlib import Path
+
+import pytest
+
+from worker.matching.vertical_rules import (
+    DEFAULT_VERTICALS_ROOT,
+    RULES_FILENAME,
+    VERTICAL_DIRECTORIES,
+    VerticalRulesError,
+    load_vertical_rules,
+    parse_rule_file,
+)
+
+
+def write_rules(root: Path, directory: str, payload: object) -> Path:
+    path = root / directory / RULES_FILENAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload))
+    return path
+
+
+def write_required_rules(root: Path) -> None:
+    write_rules(root, "tech", {"fallback": "electronics", "categories": []})
+    write_rules(root, "pharmaceuticals", {"fallback": "other-pharma", "categories": []})
+
+
+def test_shared_rule_files_cover_taxonomy() -> None:
+    rules = load_vertical_rules()
+
+    assert rules.priority == ("home-appliances", "beauty", "pet-goods", "pharma", "tech")
+    for rule_set in rules.rule_sets:
+        directory = VERTICAL_DIRECTORIES.get(rule_set.vertical, rule_set.vertical)
+        taxonomy = (DEFAULT_VERTICALS_ROOT / directory / "taxonomy.ts").read_text()
+        declared = set(re.findall(r'"([a-z-]+)"', re.search(r"categories:\s*\[([^\]]*)\]", taxonomy).group(1)))
+
+        assert declared <= {category for category, _ in rule_set.categories} | {rule_set.fallback}
+
+
+def test_rule_files_define_verticals_without_code_changes(tmp_path: Path) -> None:
+    write_rules(
+        tmp_path,
+        "tech",
+        {
+            "priority": 20,
+            "fallback": "electronics",
+            "signals": ["laptop", "tablet computer"],
+            "categories": [
+                {"category": "tablets", "keywords": ["iPad", "tablet computer"]},
+                {"category": "laptops", "keywords": ["laptop"]},
+            ],
+        },
+    )
+    write_rules(
+        tmp_path,
+        "pharmaceuticals",
+        {"priority": 10, "fallback": "other-pharma", "categories": [{"category": "otc", "keywords": ["pain"]}]},
+    )
+    write_rules(tmp_path, "garden", {"fallback": "garden", "signals": ["lawnmower", "laptop"], "categories": []})
+
+    rules = load_vertical_rules(tmp_path)
+
+    assert rules.categorize("tech", "apple ipad air") == "tablets"
+    assert rules.categorize("tech", "27in monitor") == "electronics"
+    # The Rx exclusion rule is pinned ahead of whatever the file declares.
+    assert rules.categorize("pharma", "prescription pain relief") == "excluded-rx"
+    assert rules.categorize("pharma", "vitamin c") == "other-pharma"
+    assert rules.fallbacks == {"pharma": "other-pharma", "tech": "electronics", "garden": "garden"}
+    assert rules.priority == ("pharma", "tech", "garden")
+    assert rules.infer_vertical("lawnmower") == "garden"
+    # Equal signal counts go to the vertical with the lower priority.
+    assert rules.infer_vertical("laptop") == "tech"
+
+
+def test_missing_or_invalid_rules_fail_loudly(tmp_path: Path) -> None:
+    with pytest.raises(VerticalRulesError, match="does not exist"):
+        load_vertical_rules(tmp_path / "missing")
+
+    write_rules(tmp_path, "tech", {"fallback": "electronics", "categories": []})
+    with pytest.raises(VerticalRulesError, match="pharma"):
+        load_vertical_rules(tmp_path)
+
+    write_rules(tmp_path, "pharmaceuticals", {"fallback": "other-pharma", "categories": []})
+    write_rules(tmp_path, "pet-goods", {"fallback": "pet-supplies", "categories": [{"category": "toys", "keywords": []}]})
+    with pytest.raises(VerticalRulesError, match=r"categories\[0\]\.keywords"):
+        load_vertical_rules(tmp_path)
+
+    with pytest.raises(ValueError, match="priority"):
+        parse_rule_file("tech", {"priority": "1", "fallback": "electronics", "categories": []})
+
+
+def test_compiled_rules_cached_on_disk_by_file_hash(tmp_path: Path) -> None:
+    root = tmp_path / "verticals"
+    cache_dir = tmp_path / "cache"
+    write_required_rules(root)
+    rules_path = write_rules(
+        root, "tech", {"fallback": "electronics", "categories": [{"category": "laptops", "keywords": ["laptop"]}]}
+    )
+
+    first = load_vertical_rules(root, cache_dir)
+    cached = list(cache_dir.glob("*.pickle"))
+    again = load_vertical_rules(root, cache_dir)
+
+    assert len(cached) == 1
+    assert again.categorize("tech", "gaming laptop") == first.categorize("tech", "gaming laptop") == "laptops"
+
+    rules_path.write_text(
+        json.dumps({"fallback": "electronics", "categories": [{"category": "notebooks", "keywords": ["laptop"]}]})
+    )
+    changed = load_vertical_rules(root, cache_dir)
+
+    assert changed.categorize("tech", "gaming laptop") == "notebooks"
+    assert len(list(cache_dir.glob("*.pickle"))) == 2
+
+
+def test_cache_ignored_unless_directory_is_private(tmp_path: Path) -> None:
+    root = tmp_path / "verticals"
+    cache_dir = tmp_path / "cache"
+    write_required_rules(root)
+    write_rules(root, "tech", {"fallback": "electronics", "categories": [{"category": "laptops", "keywords": ["laptop"]}]})
+    load_vertical_rules(root, cache_dir)
+    (cached,) = cache_dir.glob("*.pickle")
+
+    planted_root = tmp_path / "planted"
+    write_required_rules(planted_root)
+    cached.write_bytes(pickle.dumps(load_vertical_rules(planted_root)))
+    cache_dir.chmod(0o777)
+
+    assert load_vertical_rules(root, cache_dir).categorize("tech", "gaming laptop") == "laptops"
@@ -5,6 +5,7 @@ from bs4 import BeautifulSoup
 
 from worker.adapters.fixture_adapter import FixtureAdapter
 from worker.adapters.live_base import LiveRetailerAdapter
+from worker.html_parsing import PageIndex
 
 
 class AppleFixtureAdapter(FixtureAdapter):
@@ -86,14 +87,17 @@ class AppleLiveAdapter(LiveRetailerAdapter):
             return True
         return bool(re.fullmatch(r"[a-z0-9-]{6,}", model_leaf))
 
-    def _is_non_product_page(self, url: str, title: str, soup: BeautifulSoup, product_obj: dict[str, object]) -> bool:
-        if super()._is_non_product_page(url=url, title=title, soup=soup, product_obj=product_obj):
+    def _is_non_product_page(
+        self, url: str, title: str, soup: BeautifulSoup | PageIndex, product_obj: dict[str, object]
+    ) -> bool:
+        page = PageIndex.of(soup)
+        if super()._is_non_product_page(url=url, title=title, soup=page, product_obj=product_obj):
             return True
 
         parsed = urlparse(url)
         path = parsed.path.lower().rstrip("/")
         lowered_title = title.lower()
-        title_text = f"{title} {soup.get_text(' ', strip=True)[:160]}".lower()
+        title_text = f"{title} {page.text[:160]}".lower()
 
         if re.search(r"/shop/buy-(iphone|ipad|mac|watch|airpods|vision)(?:/)?$", path):
             return True
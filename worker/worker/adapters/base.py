@@ -1,8 +1,13 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Collection, Iterable
 from dataclasses import dataclass
 from datetime import datetime
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from worker.frontier import CrawlFrontier
 
 
 @dataclass
@@ -58,13 +63,14 @@ class NormalizedRetailerProduct:
 class SourceAdapter(ABC):
     vertical: str = "tech"
     retailer_slug: str
+    frontier: CrawlFrontier | None = None
 
     @abstractmethod
-    def list_pages(self) -> list[dict[str, object]]:
+    def list_pages(self) -> Iterable[dict[str, object]]:
         raise NotImplementedError
 
     @abstractmethod
-    def parse_listing(self, page: dict[str, object]) -> list[RawListing]:
+    def parse_listing(self, page: dict[str, object]) -> Iterable[RawListing]:
         raise NotImplementedError
 
     @abstractmethod
@@ -74,3 +80,16 @@ class SourceAdapter(ABC):
     @abstractmethod
     def normalize(self, listing: RawListing, detail: RawDetail) -> NormalizedRetailerProduct:
         raise NotImplementedError
+
+    def plan_recrawl(self, pages: list[dict[str, object]]) -> bool:
+        """Make the next ``list_pages`` yield these known product pages in order; False if unsupported."""
+        return False
+
+    def skip_products(self, source_product_ids: Collection[str]) -> None:
+        """Leave these already-written products out of the next ``list_pages`` before any page is fetched."""
+
+    def begin_run(self) -> None:
+        """Reset per-run state before an adapter kept open is crawled again."""
+
+    def close(self) -> None:
+        """Release network clients, browsers and other per-run resources."""
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -16,26 +17,21 @@ class FixtureAdapter(SourceAdapter):
         root = Path(__file__).resolve().parents[1]
         self.fixture_path = root / "fixtures" / self.fixture_name
 
-    def list_pages(self) -> list[dict[str, object]]:
-        payload = json.loads(self.fixture_path.read_text())
-        return [payload]
+    def list_pages(self) -> Iterator[dict[str, object]]:
+        yield json.loads(self.fixture_path.read_text())
 
-    def parse_listing(self, page: dict[str, object]) -> list[RawListing]:
-        listings: list[RawListing] = []
+    def parse_listing(self, page: dict[str, object]) -> Iterator[RawListing]:
         for item in page.get("items", []):
-            listings.append(
-                RawListing(
-                    source_product_id=str(item["source_product_id"]),
-                    title=str(item["title"]),
-                    url=str(item["url"]),
-                    image_url=item.get("image_url"),
-                    category=str(item["category"]),
-                    brand=str(item["brand"]),
-                    availability=item.get("availability"),
-                    category_source="fixture",
-                )
+            yield RawListing(
+                source_product_id=str(item["source_product_id"]),
+                title=str(item["title"]),
+                url=str(item["url"]),
+                image_url=item.get("image_url"),
+                category=str(item["category"]),
+                brand=str(item["brand"]),
+                availability=item.get("availability"),
+                category_source="fixture",
             )
-        return listings
 
     def fetch_detail(self, listing: RawListing) -> RawDetail:
         payload = json.loads(self.fixture_path.read_text())
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-import gzip
 import hashlib
-import json
 import logging
 import re
+import threading
 import time
-from dataclasses import dataclass
+from collections.abc import Collection, Iterator
+from concurrent.futures import Future
+from contextlib import closing
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime, timezone
 from typing import Any
 from urllib.parse import urljoin, urlparse
@@ -17,230 +19,32 @@ from bs4 import BeautifulSoup
 
 from worker.adapters.base import NormalizedRetailerProduct, RawDetail, RawListing, SourceAdapter
 from worker.adapters.fixture_adapter import FixtureAdapter
-from worker.fetchers.browser import fetch_page_html
+from worker.config import get_settings
+from worker.fetchers.async_http import RETRYABLE_HTTP_STATUSES, AsyncFetchEngine, FetchOutcome
+from worker.fetchers.browser import BrowserPool
+from worker.fetchers.rate_limit import HostRateLimiter, RateLimit, get_rate_limiter
+from worker.fetchers.raw_store import RawBodyWriter, RawPageStore
+from worker.fetchers.sitemap import SitemapEntry, SitemapStreamParser, iter_sitemap_entries
+from worker.fetchers.validators import CachedResponse, ValidatorCache
+from worker.frontier import parse_lastmod
+from worker.html_parsing import PageIndex, make_soup, resolve_html_parser
+from worker.matching.keywords import KeywordMatcher
 from worker.matching.normalization import normalize_identifier
+from worker.matching.vertical_rules import RX_EXCLUSION_TOKENS, get_vertical_rules
+from worker.page_cache import DEFAULT_PAGE_CACHE_BYTES, DEFAULT_PAGE_CACHE_ENTRIES, PageCache, PageCacheStats
+from worker.parse_pool import ProductParsePool
 
 
+# Bump when extraction changes so a 304 never replays output from an older parser.
+PARSER_VERSION = 1
 PRICE_RE = re.compile(r"(?:NZD|NZ\$|\$)\s*([0-9][0-9,]*(?:\.[0-9]{1,2})?)", re.I)
 PRICE_CONTEXT_RE = re.compile(
     r"(?:was|now|price|sale|special|our\s+price|from|only)\s*[:\-]?\s*\$?\s*([0-9][0-9,]*(?:\.[0-9]{1,2})?)",
     re.I,
 )
 SCRIPT_IMAGE_RE = re.compile(r'https?://[^"\']+\.(?:jpg|jpeg|png|webp)(?:\?[^"\']*)?', re.I)
-RETRYABLE_HTTP_STATUSES = {403, 408, 425, 429, 500, 502, 503, 504}
-RX_EXCLUSION_TOKENS = {
-    "prescription",
-    "pharmacist only",
-    "pharmacy only medicine",
-    "schedule 4",
-    "s4",
-    "rx",
-}
 PHARMA_ALLOWED_CATEGORIES = {"otc", "supplements"}
-VERTICAL_FALLBACK_CATEGORIES = {
-    "beauty": "beauty",
-    "pharma": "other-pharma",
-    "pharmaceuticals": "other-pharma",
-    "tech": "electronics",
-    "home-appliances": "appliances",
-    "pet-goods": "pet-supplies",
-}
-VERTICAL_SIGNAL_TOKENS: dict[str, tuple[str, ...]] = {
-    "home-appliances": (
-        "whiteware",
-        "appliance",
-        "fridge",
-        "refrigerator",
-        "freezer",
-        "dishwasher",
-        "washing machine",
-        "washer",
-        "dryer",
-        "laundry",
-        "microwave",
-        "vacuum",
-        "air fryer",
-        "coffee machine",
-        "air conditioner",
-        "dehumidifier",
-    ),
-    "beauty": (
-        "beauty",
-        "skincare",
-        "skin care",
-        "makeup",
-        "cosmetic",
-        "fragrance",
-        "perfume",
-        "parfum",
-        "lipstick",
-        "mascara",
-        "serum",
-        "cleanser",
-        "moisturizer",
-        "moisturiser",
-        "sunscreen",
-        "spf",
-        "shampoo",
-    ),
-    "pet-goods": (
-        "pet",
-        "kitten",
-        "puppy",
-        "pet food",
-        "dog food",
-        "cat food",
-        "kibble",
-        "litter",
-        "flea",
-        "tick",
-        "worming",
-        "grooming",
-        "pet shampoo",
-        "pet treats",
-        "dog treats",
-        "cat treats",
-        "pet toy",
-        "dog toy",
-        "cat toy",
-        "pet bed",
-    ),
-    "pharma": (
-        "pharma",
-        "pharmacy",
-        "medicine",
-        "medication",
-        "tablet",
-        "caplet",
-        "capsule",
-        "otc",
-        "supplement",
-        "vitamin",
-        "probiotic",
-        "pain relief",
-        "ibuprofen",
-        "paracetamol",
-    ),
-    "tech": (
-        "electronics",
-        "electronic",
-        "laptop",
-        "notebook",
-        "macbook",
-        "smartphone",
-        "iphone",
-        "android",
-        "monitor",
-        "gaming",
-        "camera",
-        "headphone",
-        "printer",
-        "router",
-        "ssd",
-        "gpu",
-    ),
-}
-VERTICAL_SIGNAL_PRIORITY = ("home-appliances", "beauty", "pet-goods", "pharma", "tech")
-BEAUTY_CATEGORY_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
-    (
-        "suncare",
-        (
-            "sunscreen",
-            "sun screen",
-            "sunblock",
-            "spf",
-            "uv",
-        ),
-    ),
-    (
-        "skincare",
-        (
-            "serum",
-            "cleanser",
-            "moisturiser",
-            "moisturizer",
-            "toner",
-            "essence",
-            "retinol",
-            "niacinamide",
-            "hyaluronic",
-            "exfoliant",
-            "mask",
-            "eye cream",
-            "face cream",
-        ),
-    ),
-    (
-        "makeup",
-        (
-            "foundation",
-            "concealer",
-            "powder",
-            "lipstick",
-            "lip gloss",
-            "lip balm",
-            "mascara",
-            "eyeliner",
-            "eyeshadow",
-            "blush",
-            "bronzer",
-            "highlighter",
-            "primer",
-            "brow",
-        ),
-    ),
-    (
-        "haircare",
-        (
-            "shampoo",
-            "conditioner",
-            "hair mask",
-            "hair oil",
-            "haircare",
-            "hair care",
-            "scalp",
-            "hairspray",
-            "hair spray",
-            "leave-in",
-        ),
-    ),
-    (
-        "fragrance",
-        (
-            "perfume",
-            "parfum",
-            "fragrance",
-            "eau de",
-            "cologne",
-            "aftershave",
-            "body mist",
-        ),
-    ),
-    (
-        "bodycare",
-        (
-            "body wash",
-            "body lotion",
-            "body cream",
-            "hand cream",
-            "deodorant",
-            "soap",
-            "bath",
-        ),
-    ),
-    (
-        "beauty-tools",
-        (
-            "brush",
-            "sponge",
-            "applicator",
-            "curler",
-            "tweezer",
-            "beauty tool",
-            "roller",
-        ),
-    ),
-)
+RX_EXCLUSION_MATCHER = KeywordMatcher(RX_EXCLUSION_TOKENS)
 BEAUTY_PRODUCT_TYPE_RULES: tuple[tuple[str, tuple[str, ...]], ...] = (
     ("serum", ("serum",)),
     ("cleanser", ("cleanser", "face wash")),
@@ -293,6 +97,17 @@ MISSING_PAGE_MARKERS = (
     "sorry, this page cannot be found",
 )
 
+DEFAULT_REQUEST_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+    "Accept-Language": "en-NZ,en-GB;q=0.9,en;q=0.8",
+    "Upgrade-Insecure-Requests": "1",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+}
+
 logger = logging.getLogger(__name__)
 
 
@@ -317,6 +132,11 @@ class ParsedProductPage:
     category_source: str = "fallback"
 
 
+def _estimated_page_bytes(page: ParsedProductPage) -> int:
+    text = sum(len(value) for value in vars(page).values() if isinstance(value, str))
+    return 256 + text + len(repr(page.attributes))
+
+
 @dataclass(frozen=True)
 class VerticalInference:
     vertical: str
@@ -324,6 +144,12 @@ class VerticalInference:
     confidence: float
 
 
+def _resolved(outcome: FetchOutcome) -> Future[FetchOutcome]:
+    future: Future[FetchOutcome] = Future()
+    future.set_result(outcome)
+    return future
+
+
 class NonProductPageError(ValueError):
     pass
 
@@ -337,6 +163,16 @@ class LiveRetailerAdapter(SourceAdapter):
     exclude_url_patterns: list[str] = ["/blog", "/news", "/support", "/stores", "?", "#"]
     require_file_suffix: str | None = None
     fallback_fixture_cls: type[FixtureAdapter] | None = None
+    # BeautifulSoup tree builder ("html.parser" or "lxml"); None uses WORTHIT_HTML_PARSER.
+    html_parser: str | None = None
+    # Per-host token bucket shared by every adapter (and, with the Redis backend,
+    # every process) hitting the same host. When unset the bucket is derived from
+    # request_delay_seconds.
+    rate_limit_per_second: float | None = None
+    rate_limit_burst: int = 1
+    # Discovery reads at most this many candidate URLs per fresh one it needs, so a
+    # frontier that has already seen most of the catalogue cannot stream every sitemap.
+    discovery_scan_factor: int = 10
 
     def __init__(
         self,
@@ -352,8 +188,25 @@ class LiveRetailerAdapter(SourceAdapter):
         browser_proxy_url: str | None = None,
         vertical: str | None = None,
         include_url_patterns: list[str] | None = None,
+        browser_pool_size: int = 1,
+        browser_max_navigations: int = 40,
+        fetch_concurrency: int = 1,
+        rate_limit_per_second: float | None = None,
+        rate_limit_burst: int | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+        http_cache_path: str | None = None,
+        validator_cache: ValidatorCache | None = None,
+        raw_store_path: str | None = None,
+        raw_store: RawPageStore | None = None,
+        raw_store_retention_days: int | None = None,
+        replay: bool = False,
+        html_parser: str | None = None,
+        parse_workers: int = 0,
+        page_cache_entries: int = DEFAULT_PAGE_CACHE_ENTRIES,
+        page_cache_bytes: int = DEFAULT_PAGE_CACHE_BYTES,
     ) -> None:
         self.max_products = max_products
+        self.timeout_seconds = timeout_seconds
         self.request_delay_seconds = request_delay_seconds
         self.max_fetch_retries = max(0, max_fetch_retries)
         self.retry_backoff_seconds = max(0.0, retry_backoff_seconds)
@@ -366,32 +219,67 @@ class LiveRetailerAdapter(SourceAdapter):
         else:
             self.browser_timeout_seconds = max(5.0, float(getattr(cls, "browser_timeout_seconds", 30.0)))
         self.browser_proxy_url = browser_proxy_url
+        self.browser_pool_size = max(1, browser_pool_size)
+        self.browser_max_navigations = max(1, browser_max_navigations)
+        self._browser_pool: BrowserPool | None = None
+        self._fetch_engine: AsyncFetchEngine | None = None
+        self._fetch_engine_lock = threading.Lock()
         if vertical:
             self.vertical = vertical
         if include_url_patterns:
             self.include_url_patterns = include_url_patterns
         self.used_fixture_fallback = False
         self.discovery_failure_reason: str | None = None
-        self._page_cache: dict[str, ParsedProductPage] = {}
-        self._last_request_at: float | None = None
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        # Parsed pages wait here between parse_listing and fetch_detail; pages handed to the
+        # detail stage are pinned, and the pipeline's stage queues bound how many are.
+        self._page_cache: PageCache[ParsedProductPage] = PageCache(
+            max_entries=page_cache_entries, max_bytes=page_cache_bytes, sizer=_estimated_page_bytes
+        )
+        # Pipeline stages call parse_listing and fetch_detail from worker threads. The lock
+        # guards the prefetch bookkeeping only; fetching and parsing happen outside it.
+        self._page_lock = threading.Lock()
+        # A planned page is claimed by inserting its future; the thread that claimed it fetches it.
+        self._prefetched: dict[str, Future[FetchOutcome]] = {}
+        self._planned_urls: list[str] = []
+        self._planned_positions: dict[str, int] = {}
+        self._recrawl_pages: list[dict[str, object]] | None = None
+        self._skipped_source_ids: frozenset[str] = frozenset()
+        # Listings parse_listing took from the fixture fallback; only these get fixture details.
+        self._fixture_source_ids: set[str] = set()
+        self.rate_limit = self._resolve_rate_limit(rate_limit_per_second, rate_limit_burst)
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self._owns_validator_cache = validator_cache is None and bool(http_cache_path)
+        self._parser_fingerprint: str | None = None
+        self.validator_cache = validator_cache or (ValidatorCache(http_cache_path) if http_cache_path else None)
+        self._owns_raw_store = raw_store is None and bool(raw_store_path)
+        self.raw_store = raw_store or (
+            RawPageStore(raw_store_path, retention_days=raw_store_retention_days) if raw_store_path else None
+        )
+        if replay and self.raw_store is None:
+            raise ValueError("Replay mode requires a raw page store")
+        self.replay = replay
+        self.html_parser = resolve_html_parser(html_parser or type(self).html_parser or get_settings().html_parser)
+        self.parse_workers = max(0, parse_workers)
+        self._parse_pool: ProductParsePool | None = None
+        self._parsing: dict[str, Future[ParsedProductPage]] = {}
         self.client = httpx.Client(
             timeout=timeout_seconds,
-            headers={
-                "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
-                "Accept-Language": "en-NZ,en-GB;q=0.9,en;q=0.8",
-                "Upgrade-Insecure-Requests": "1",
-                "Sec-Fetch-Dest": "document",
-                "Sec-Fetch-Mode": "navigate",
-                "Sec-Fetch-Site": "none",
-                "Sec-Fetch-User": "?1",
-            },
+            headers=DEFAULT_REQUEST_HEADERS,
             follow_redirects=True,
             proxy=proxy_url,
         )
         self._fixture_fallback = self.fallback_fixture_cls() if (use_fixture_fallback and self.fallback_fixture_cls) else None
 
-    def list_pages(self) -> list[dict[str, object]]:
+    def list_pages(self) -> Iterator[dict[str, object]]:
+        if self._recrawl_pages is not None:
+            # Known listings go straight to _parse_product_page: no sitemap walk or live probe.
+            pages, self._recrawl_pages = self._recrawl_pages[: self.max_products], None
+            pages = [page for page in pages if str(page["source_product_id"]) not in self._skipped_source_ids]
+            self._plan_prefetch([str(page["url"]) for page in pages])
+            yield from pages
+            return
+
         urls = self._discover_product_urls()
         if urls:
             live_ok, reason = self._probe_live_urls(urls)
@@ -399,14 +287,27 @@ class LiveRetailerAdapter(SourceAdapter):
                 self.discovery_failure_reason = reason
                 if self._fixture_fallback:
                     self.used_fixture_fallback = True
-                    return self._fixture_fallback.list_pages()
+                    yield from self._fixture_fallback.list_pages()
+                    return
                 detail = f": {reason}" if reason else ""
                 raise RuntimeError(f"Live probe failed for {self.retailer_slug}{detail}")
-            return [{"url": url, "source_product_id": self._source_id_from_url(url)} for url in urls[: self.max_products]]
+            selected = []
+            for url in urls[: self.max_products]:
+                if self._source_id_from_url(url) in self._skipped_source_ids:
+                    # The live probe may already hold its body.
+                    with self._page_lock:
+                        self._prefetched.pop(url, None)
+                else:
+                    selected.append(url)
+            self._plan_prefetch(selected)
+            for url in selected:
+                yield {"url": url, "source_product_id": self._source_id_from_url(url)}
+            return
 
         if self._fixture_fallback:
             self.used_fixture_fallback = True
-            return self._fixture_fallback.list_pages()
+            yield from self._fixture_fallback.list_pages()
+            return
 
         reason = f" ({self.discovery_failure_reason})" if self.discovery_failure_reason else ""
         raise RuntimeError(f"No product URLs discovered for {self.retailer_slug}{reason}")
@@ -423,38 +324,44 @@ class LiveRetailerAdapter(SourceAdapter):
         parse_failures = 0
         successful_urls: list[str] = []
 
-        for url in sample_urls:
-            try:
-                html = self._fetch_text(url)
-            except httpx.HTTPStatusError as exc:
-                status = exc.response.status_code if exc.response is not None else None
-                if status in WAF_BLOCKED_STATUSES:
-                    blocked += 1
-                continue
-            except RuntimeError as exc:
-                if "anti-bot challenge" in str(exc).lower():
-                    blocked += 1
-                continue
-            except Exception:
-                continue
+        for batch_start in range(0, len(sample_urls), self.fetch_concurrency):
+            batch = sample_urls[batch_start : batch_start + self.fetch_concurrency]
+            for url, result in zip(batch, self._fetch_texts(batch)):
+                if isinstance(result, httpx.HTTPStatusError):
+                    status = result.response.status_code if result.response is not None else None
+                    if status in WAF_BLOCKED_STATUSES:
+                        blocked += 1
+                    continue
+                if isinstance(result, RuntimeError):
+                    if "anti-bot challenge" in str(result).lower():
+                        blocked += 1
+                    continue
+                if isinstance(result, Exception):
+                    continue
 
-            if self._looks_like_bot_challenge(html):
-                blocked += 1
-                continue
+                html = result
+                if self._looks_like_bot_challenge(html):
+                    blocked += 1
+                    continue
 
-            soup = BeautifulSoup(html, "html.parser")
-            if self._looks_like_missing_page(soup):
-                parse_failures += 1
-                continue
+                page = self._index_page(html)
+                if self._looks_like_missing_page(page):
+                    parse_failures += 1
+                    continue
 
-            ld_product = self._extract_json_ld_product(soup)
-            price_nzd, _ = self._extract_prices(ld_product, soup)
-            if price_nzd <= 0:
-                price_failures += 1
-                continue
+                ld_product = self._extract_json_ld_product(page)
+                price_nzd, _ = self._extract_prices(ld_product, page)
+                if price_nzd <= 0:
+                    price_failures += 1
+                    continue
 
-            success += 1
-            successful_urls.append(url)
+                success += 1
+                successful_urls.append(url)
+                # Keep the body so the product page is not downloaded twice.
+                with self._page_lock:
+                    self._prefetched[url] = _resolved(FetchOutcome(url=url, text=html))
+                if success >= 2:
+                    break
             if success >= 2:
                 break
 
@@ -485,7 +392,10 @@ class LiveRetailerAdapter(SourceAdapter):
 
     def parse_listing(self, page: dict[str, object]) -> list[RawListing]:
         if "items" in page and self._fixture_fallback:
-            return self._fixture_fallback.parse_listing(page)
+            listings = list(self._fixture_fallback.parse_listing(page))
+            with self._page_lock:
+                self._fixture_source_ids.update(listing.source_product_id for listing in listings)
+            return listings
 
         url = str(page["url"])
         source_product_id = str(page["source_product_id"])
@@ -493,11 +403,14 @@ class LiveRetailerAdapter(SourceAdapter):
             parsed = self._parse_product_page(url=url, source_product_id=source_product_id)
         except NonProductPageError:
             return []
-        self._page_cache[source_product_id] = parsed
+        finally:
+            if self.frontier is not None:
+                self.frontier.mark_fetched(url)
         parsed_category = parsed.normalized_category or self._normalize_category(parsed.category, parsed.title, self.vertical)
         if self._is_pharma_vertical() and parsed_category not in PHARMA_ALLOWED_CATEGORIES:
             return []
 
+        self._page_cache.put(source_product_id, parsed, pinned=True)
         return [
             RawListing(
                 source_product_id=parsed.source_product_id,
@@ -512,19 +425,18 @@ class LiveRetailerAdapter(SourceAdapter):
         ]
 
     def fetch_detail(self, listing: RawListing) -> RawDetail:
-        if listing.source_product_id in self._page_cache:
-            parsed = self._page_cache[listing.source_product_id]
-            return self._to_raw_detail(parsed)
+        with self._page_lock:
+            from_fixture = listing.source_product_id in self._fixture_source_ids
+        if from_fixture and self._fixture_fallback:
+            detail = self._fixture_fallback.fetch_detail(listing)
+            self.used_fixture_fallback = True
+            return detail
 
-        if self._fixture_fallback:
-            try:
-                self.used_fixture_fallback = True
-                return self._fixture_fallback.fetch_detail(listing)
-            except Exception:
-                pass
+        parsed = self._page_cache.take(listing.source_product_id)
+        if parsed is not None:
+            return self._to_raw_detail(parsed)
 
         parsed = self._parse_product_page(url=listing.url, source_product_id=listing.source_product_id)
-        self._page_cache[listing.source_product_id] = parsed
         return self._to_raw_detail(parsed)
 
     def normalize(self, listing: RawListing, detail: RawDetail) -> NormalizedRetailerProduct:
@@ -602,24 +514,7 @@ class LiveRetailerAdapter(SourceAdapter):
     def _infer_vertical_from_text(self, text: str) -> str | None:
         if not text:
             return None
-        lowered = text.lower()
-        scores = {vertical: 0 for vertical in VERTICAL_SIGNAL_TOKENS}
-        for vertical, tokens in VERTICAL_SIGNAL_TOKENS.items():
-            for token in tokens:
-                if token in lowered:
-                    scores[vertical] += 1
-
-        best_vertical = None
-        best_score = 0
-        for vertical in VERTICAL_SIGNAL_PRIORITY:
-            score = scores.get(vertical, 0)
-            if score > best_score:
-                best_vertical = vertical
-                best_score = score
-
-        if best_score <= 0:
-            return None
-        return best_vertical
+        return get_vertical_rules().infer_vertical(text.lower())
 
     def _attributes_to_text(self, attributes: dict[str, object]) -> str:
         chunks: list[str] = []
@@ -652,17 +547,39 @@ class LiveRetailerAdapter(SourceAdapter):
         queue.extend(self._discover_robots_sitemaps())
         seen_sitemaps: set[str] = set()
         found: list[str] = []
+        lastmods: dict[str, datetime | None] = {}
+        fresh_count = 0
         saw_429 = False
         saw_404 = False
 
-        while queue and len(found) < self.max_products * 4:
+        candidate_limit = self.max_products * 4
+        scan_limit = candidate_limit * self.discovery_scan_factor
+
+        # With a frontier only new or modified URLs count toward the limit, so
+        # unchanged URLs do not stop discovery before it reaches unseen ones.
+        while queue and fresh_count < candidate_limit and len(found) < scan_limit:
             sitemap_url = queue.pop(0)
             if sitemap_url in seen_sitemaps:
                 continue
             seen_sitemaps.add(sitemap_url)
 
             try:
-                xml_text = self._fetch_sitemap_text(sitemap_url)
+                # Entries stream in as the body downloads; leaving the loop early
+                # closes the response without reading the rest of the document.
+                with closing(self._iter_sitemap(sitemap_url)) as entries:
+                    for entry in entries:
+                        if entry.kind == "sitemap":
+                            if entry.loc not in seen_sitemaps:
+                                queue.append(entry.loc)
+                        elif self._is_candidate_product_url(entry.loc):
+                            found.append(entry.loc)
+                            lastmod = parse_lastmod(entry.lastmod)
+                            if lastmod is not None:
+                                lastmods[entry.loc] = lastmod
+                            if self.frontier is None or self.frontier.is_fresh(entry.loc, lastmod):
+                                fresh_count += 1
+                            if fresh_count >= candidate_limit or len(found) >= scan_limit:
+                                break
             except httpx.HTTPStatusError as exc:
                 status = exc.response.status_code if exc.response is not None else None
                 if status == 429:
@@ -675,30 +592,13 @@ class LiveRetailerAdapter(SourceAdapter):
                 logger.debug("Skipping sitemap %s for %s: %s", sitemap_url, self.retailer_slug, exc)
                 continue
 
-            child_sitemaps, urls = self._parse_sitemap(xml_text)
-            for child in child_sitemaps:
-                if child not in seen_sitemaps:
-                    queue.append(child)
-            for url in urls:
-                if self._is_candidate_product_url(url):
-                    found.append(url)
-
-        deduped: list[str] = []
-        seen_urls: set[str] = set()
-        discovery_pool_limit = max(self.max_products, 40)
-        for url in found:
-            if url in seen_urls:
-                continue
-            seen_urls.add(url)
-            deduped.append(url)
-            if len(deduped) >= discovery_pool_limit:
-                break
+        deduped = list(dict.fromkeys(found))
         if deduped:
-            return deduped
+            return self._rank_discovered_urls(deduped, lastmods)
 
         html_urls = self._discover_product_urls_from_html()
         if html_urls:
-            return html_urls
+            return self._rank_discovered_urls(html_urls, {})
 
         if saw_429:
             self.discovery_failure_reason = "source returned HTTP 429 anti-bot challenges"
@@ -708,6 +608,13 @@ class LiveRetailerAdapter(SourceAdapter):
             self.discovery_failure_reason = "no sitemap or homepage product links were discoverable"
         return []
 
+    def _rank_discovered_urls(self, urls: list[str], lastmods: dict[str, datetime | None]) -> list[str]:
+        discovery_pool_limit = max(self.max_products, 40)
+        if self.frontier is None:
+            return urls[:discovery_pool_limit]
+        self.frontier.record_discovered(urls, lastmods)
+        return self.frontier.prioritize(urls)[:discovery_pool_limit]
+
     def _discover_robots_sitemaps(self) -> list[str]:
         robots_url = urljoin(self.base_url, "/robots.txt")
         try:
@@ -727,29 +634,53 @@ class LiveRetailerAdapter(SourceAdapter):
                 discovered.append(sitemap_url)
         return discovered
 
-    def _parse_sitemap(self, xml_text: str) -> tuple[list[str], list[str]]:
+    def _iter_sitemap(self, url: str) -> Iterator[SitemapEntry]:
+        if self.replay:
+            yield from iter_sitemap_entries([self._replay_text(url).encode("utf-8")])
+            return
+
+        cached = self._cached_response("sitemap", url)
+        response = self._request_with_retries(url, cached.conditional_headers() if cached else None, stream=True)
         try:
-            root = ElementTree.fromstring(xml_text.lstrip())
-        except ElementTree.ParseError:
-            return [], []
-
-        def local_name(tag: str) -> str:
-            return tag.rsplit("}", 1)[-1]
-
-        child_sitemaps: list[str] = []
-        urls: list[str] = []
-        root_name = local_name(root.tag)
-        if root_name == "sitemapindex":
-            for sitemap in root.findall(".//{*}sitemap"):
-                loc = sitemap.find("{*}loc")
-                if loc is not None and loc.text:
-                    child_sitemaps.append(loc.text.strip())
-        elif root_name == "urlset":
-            for url in root.findall(".//{*}url"):
-                loc = url.find("{*}loc")
-                if loc is not None and loc.text:
-                    urls.append(loc.text.strip())
-        return child_sitemaps, urls
+            if response.status_code == 304 and cached is not None:
+                for loc in cached.payload["sitemaps"]:
+                    yield SitemapEntry(kind="sitemap", loc=loc)
+                lastmods = cached.payload.get("lastmods") or [None] * len(cached.payload["urls"])
+                for loc, lastmod in zip(cached.payload["urls"], lastmods):
+                    yield SitemapEntry(kind="url", loc=loc, lastmod=lastmod)
+                return
+
+            fetched = FetchOutcome.from_response(url, response)
+            # A 304 has to replay the entries, so they are kept only when the response can be revalidated.
+            remember = self.validator_cache is not None and bool(fetched.etag or fetched.last_modified)
+            child_sitemaps: list[str] = []
+            urls: list[str] = []
+            url_lastmods: list[str | None] = []
+            archive = self._open_archive(url, "sitemap")
+            parser = SitemapStreamParser(on_decoded=archive.write if archive is not None else None)
+            try:
+                for entry in self._stream_entries(parser, response):
+                    if remember:
+                        if entry.kind == "sitemap":
+                            child_sitemaps.append(entry.loc)
+                        else:
+                            urls.append(entry.loc)
+                            url_lastmods.append(entry.lastmod)
+                    yield entry
+            except ElementTree.ParseError as exc:
+                logger.debug("Stopped parsing malformed sitemap %s for %s: %s", url, self.retailer_slug, exc)
+                return
+            finally:
+                # Only a fully read document is archived or cached; an early stop leaves both untouched.
+                if archive is not None and not parser.closed:
+                    archive.discard()
+
+            if archive is not None:
+                self._commit_archive(archive)
+            if remember:
+                self._store_validators("sitemap", fetched, {"sitemaps": child_sitemaps, "urls": urls, "lastmods": url_lastmods})
+        finally:
+            response.close()
 
     def _discover_product_urls_from_html(self) -> list[str]:
         crawl_queue = [self.base_url]
@@ -770,7 +701,7 @@ class LiveRetailerAdapter(SourceAdapter):
             except Exception:
                 continue
 
-            soup = BeautifulSoup(html, "html.parser")
+            soup = self._make_soup(html)
             for anchor in soup.find_all("a", href=True):
                 href = anchor.get("href") or ""
                 absolute_raw = urljoin(self.base_url, href)
@@ -842,28 +773,47 @@ class LiveRetailerAdapter(SourceAdapter):
         return f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
 
     def _parse_product_page(self, url: str, source_product_id: str) -> ParsedProductPage:
-        html = self._fetch_text(url)
+        cached = self._cached_response("product", url)
+        fetched = self._take_prefetched_page(url, cached)
+        if fetched.not_modified:
+            if cached is not None:
+                payload = {**cached.payload, "source_product_id": source_product_id, "url": url}
+                return ParsedProductPage(**payload)
+            fetched = self._fetch_page(url)
+
+        with self._page_lock:
+            pending = self._parsing.pop(url, None)
+        if pending is not None:
+            parsed = pending.result()
+            if parsed.source_product_id != source_product_id:
+                parsed = replace(parsed, source_product_id=source_product_id)
+        else:
+            parsed = self._parse_product_html(url, source_product_id, fetched.text or "")
+        self._store_validators("product", fetched, asdict(parsed))
+        return parsed
+
+    def _parse_product_html(self, url: str, source_product_id: str, html: str) -> ParsedProductPage:
         if self._looks_like_bot_challenge(html):
             raise RuntimeError(f"Blocked by anti-bot challenge for {self.retailer_slug}: {url}")
-        soup = BeautifulSoup(html, "html.parser")
+        page = self._index_page(html)
 
-        ld_product = self._extract_json_ld_product(soup)
+        ld_product = self._extract_json_ld_product(page)
 
         title = (
             self._as_text(ld_product.get("name"))
-            or self._as_text(self._extract_meta_content(soup, "property", "og:title"))
-            or self._as_text(soup.title.string if soup.title else None)
+            or self._as_text(self._extract_meta_content(page, "property", "og:title"))
+            or self._as_text(page.title_string)
             or source_product_id
         )
-        image_url = self._extract_image_url(ld_product, soup, title=title)
+        image_url = self._extract_image_url(ld_product, page, title=title)
         brand = (
             self._extract_brand(ld_product)
-            or self._extract_meta_content(soup, "name", "brand")
+            or self._extract_meta_content(page, "name", "brand")
             or title.split(" ")[0]
         )
 
         ld_category = self._as_text(ld_product.get("category"))
-        breadcrumb_category = self._extract_breadcrumb_category(soup)
+        breadcrumb_category = self._extract_breadcrumb_category(page)
         if ld_category:
             raw_category = ld_category
             category_source = "json_ld"
@@ -875,24 +825,24 @@ class LiveRetailerAdapter(SourceAdapter):
             category_source = "fallback"
         if self._is_pharma_vertical() and self._contains_rx_exclusion(raw_category, title):
             raise ValueError(f"Excluded prescription-like listing for {self.retailer_slug}: {url}")
-        if self._is_non_product_page(url=url, title=title, soup=soup, product_obj=ld_product):
+        if self._is_non_product_page(url=url, title=title, soup=page, product_obj=ld_product):
             raise NonProductPageError(f"Non-product page for {self.retailer_slug}: {url}")
         category = self._normalize_category(raw_category, title, self.vertical)
 
         availability = self._extract_availability(ld_product)
-        price_nzd, promo_price_nzd = self._extract_prices(ld_product, soup, title=title)
+        price_nzd, promo_price_nzd = self._extract_prices(ld_product, page, title=title)
         if price_nzd <= 0:
             raise ValueError(f"Unable to parse positive price for {self.retailer_slug}: {url}")
         discount_pct = self._discount_pct(price_nzd, promo_price_nzd)
         promo_text = "Promo" if promo_price_nzd is not None else None
 
-        attributes = self._extract_attributes(ld_product, soup, title=title, raw_category=raw_category)
+        attributes = self._extract_attributes(ld_product, page, title=title, raw_category=raw_category)
 
         gtin = self._as_text(
             ld_product.get("gtin13")
             or ld_product.get("gtin14")
             or ld_product.get("gtin")
-            or self._extract_meta_content(soup, "name", "gtin")
+            or self._extract_meta_content(page, "name", "gtin")
         )
         mpn = self._as_text(ld_product.get("mpn") or ld_product.get("sku"))
         model_number = self._as_text(ld_product.get("model") or attributes.get("model") or attributes.get("model_number"))
@@ -917,15 +867,14 @@ class LiveRetailerAdapter(SourceAdapter):
             category_source=category_source,
         )
 
-    def _extract_json_ld_product(self, soup: BeautifulSoup) -> dict[str, Any]:
-        for script in soup.find_all("script", attrs={"type": re.compile("application/ld\\+json", re.I)}):
-            text = script.string or script.get_text("", strip=True)
-            if not text:
-                continue
-            try:
-                payload = json.loads(text)
-            except json.JSONDecodeError:
-                continue
+    def _make_soup(self, html: str) -> BeautifulSoup:
+        return make_soup(html, self.html_parser)
+
+    def _index_page(self, html: str) -> PageIndex:
+        return PageIndex(self._make_soup(html))
+
+    def _extract_json_ld_product(self, soup: BeautifulSoup | PageIndex) -> dict[str, Any]:
+        for payload in PageIndex.of(soup).ld_json_payloads:
             product = self._find_product_object(payload)
             if product:
                 return product
@@ -961,16 +910,16 @@ class LiveRetailerAdapter(SourceAdapter):
                 return found
         return None
 
-    def _extract_meta_content(self, soup: BeautifulSoup, attr: str, key: str) -> str | None:
-        node = soup.find("meta", attrs={attr: key})
-        if not node:
+    def _extract_meta_content(self, soup: BeautifulSoup | PageIndex, attr: str, key: str) -> str | None:
+        contents = PageIndex.of(soup).meta_contents(attr, key)
+        if not contents:
             return None
-        return self._as_text(node.get("content"))
+        return self._as_text(contents[0])
 
-    def _extract_meta_contents(self, soup: BeautifulSoup, attr: str, key: str) -> list[str]:
+    def _extract_meta_contents(self, soup: BeautifulSoup | PageIndex, attr: str, key: str) -> list[str]:
         values: list[str] = []
-        for node in soup.find_all("meta", attrs={attr: key}):
-            content = self._as_text(node.get("content"))
+        for raw in PageIndex.of(soup).meta_contents(attr, key):
+            content = self._as_text(raw)
             if content:
                 values.append(content)
         return values
@@ -986,15 +935,8 @@ class LiveRetailerAdapter(SourceAdapter):
             return self._as_text(item)
         return self._as_text(brand)
 
-    def _extract_breadcrumb_category(self, soup: BeautifulSoup) -> str | None:
-        for script in soup.find_all("script", attrs={"type": re.compile("application/ld\\+json", re.I)}):
-            text = script.string or script.get_text("", strip=True)
-            if not text:
-                continue
-            try:
-                payload = json.loads(text)
-            except json.JSONDecodeError:
-                continue
+    def _extract_breadcrumb_category(self, soup: BeautifulSoup | PageIndex) -> str | None:
+        for payload in PageIndex.of(soup).ld_json_payloads:
             breadcrumb = self._find_breadcrumb(payload)
             if breadcrumb:
                 return breadcrumb
@@ -1038,7 +980,10 @@ class LiveRetailerAdapter(SourceAdapter):
                 return found
         return None
 
-    def _extract_image_url(self, product_obj: dict[str, Any], soup: BeautifulSoup, title: str | None = None) -> str | None:
+    def _extract_image_url(
+        self, product_obj: dict[str, Any], soup: BeautifulSoup | PageIndex, title: str | None = None
+    ) -> str | None:
+        page = PageIndex.of(soup)
         image = product_obj.get("image")
         if isinstance(image, list) and image:
             if isinstance(image[0], dict):
@@ -1049,11 +994,11 @@ class LiveRetailerAdapter(SourceAdapter):
             image = image.get("url")
 
         meta_image_candidates = [
-            *self._extract_meta_contents(soup, "property", "og:image"),
-            *self._extract_meta_contents(soup, "name", "og:image"),
-            *self._extract_meta_contents(soup, "name", "twitter:image"),
-            *self._extract_meta_contents(soup, "name", "twitter:image:src"),
-            *self._extract_meta_contents(soup, "itemprop", "image"),
+            *self._extract_meta_contents(page, "property", "og:image"),
+            *self._extract_meta_contents(page, "name", "og:image"),
+            *self._extract_meta_contents(page, "name", "twitter:image"),
+            *self._extract_meta_contents(page, "name", "twitter:image:src"),
+            *self._extract_meta_contents(page, "itemprop", "image"),
         ]
 
         preferred_meta_image = next((value for value in meta_image_candidates if self._clean_image_url(value)), None)
@@ -1061,8 +1006,8 @@ class LiveRetailerAdapter(SourceAdapter):
         image_url = (
             self._as_text(image)
             or preferred_meta_image
-            or self._extract_image_from_img_tags(soup, title=title)
-            or self._extract_image_from_scripts(soup)
+            or self._extract_image_from_img_tags(page, title=title)
+            or self._extract_image_from_scripts(page)
         )
         if image_url:
             cleaned = self._clean_image_url(image_url)
@@ -1070,12 +1015,12 @@ class LiveRetailerAdapter(SourceAdapter):
                 return urljoin(self.base_url, cleaned)
         return None
 
-    def _extract_image_from_img_tags(self, soup: BeautifulSoup, title: str | None) -> str | None:
+    def _extract_image_from_img_tags(self, soup: BeautifulSoup | PageIndex, title: str | None) -> str | None:
         best_score = float("-inf")
         best_url: str | None = None
         title_tokens = {token for token in re.findall(r"[a-z0-9]+", (title or "").lower()) if len(token) >= 4}
 
-        for node in soup.find_all("img"):
+        for node in PageIndex.of(soup).images:
             src = self._extract_img_source(node)
             if not src:
                 continue
@@ -1111,8 +1056,8 @@ class LiveRetailerAdapter(SourceAdapter):
 
         return best_url if best_score > 0 else None
 
-    def _extract_image_from_scripts(self, soup: BeautifulSoup) -> str | None:
-        script_text = " ".join(node.get_text(" ", strip=True) for node in soup.find_all("script"))
+    def _extract_image_from_scripts(self, soup: BeautifulSoup | PageIndex) -> str | None:
+        script_text = PageIndex.of(soup).script_text
         if not script_text:
             return None
         normalized = script_text.replace("\\/", "/")
@@ -1166,8 +1111,9 @@ class LiveRetailerAdapter(SourceAdapter):
         return token
 
     def _extract_prices(
-        self, product_obj: dict[str, Any], soup: BeautifulSoup, title: str | None = None
+        self, product_obj: dict[str, Any], soup: BeautifulSoup | PageIndex, title: str | None = None
     ) -> tuple[float, float | None]:
+        page = PageIndex.of(soup)
         structured_candidates: list[float] = []
         script_candidates: list[float] = []
         text_candidates: list[float] = []
@@ -1187,23 +1133,23 @@ class LiveRetailerAdapter(SourceAdapter):
             elif isinstance(price_spec, dict):
                 self._append_price(structured_candidates, price_spec.get("price"))
 
-        self._append_price(structured_candidates, self._extract_meta_content(soup, "property", "product:price:amount"))
-        self._append_price(structured_candidates, self._extract_meta_content(soup, "name", "price"))
-        self._append_price(structured_candidates, self._extract_meta_content(soup, "property", "og:price:amount"))
+        self._append_price(structured_candidates, self._extract_meta_content(page, "property", "product:price:amount"))
+        self._append_price(structured_candidates, self._extract_meta_content(page, "name", "price"))
+        self._append_price(structured_candidates, self._extract_meta_content(page, "property", "og:price:amount"))
 
         # Schema.org HTML microdata and data-price attributes
-        for el in soup.find_all(attrs={"itemprop": "price"}):
+        for el in page.itemprop_prices:
             self._append_price(structured_candidates, el.get("content") or el.get_text(strip=True))
-        for el in soup.find_all(attrs={"data-price": True}):
+        for el in page.data_prices:
             self._append_price(structured_candidates, el.get("data-price"))
-        for el in soup.find_all(attrs={"data-product-price": True}):
+        for el in page.data_product_prices:
             self._append_price(structured_candidates, el.get("data-product-price"))
 
-        text_prices = self._extract_prices_from_text(soup.get_text(" ", strip=True))
+        text_prices = self._extract_prices_from_text(page.text)
         for value in text_prices[:12]:
             self._append_price(text_candidates, value)
 
-        script_prices = self._extract_prices_from_scripts(soup)
+        script_prices = self._extract_prices_from_scripts(page)
         for value in script_prices[:20]:
             self._append_price(script_candidates, value)
 
@@ -1226,8 +1172,8 @@ class LiveRetailerAdapter(SourceAdapter):
         promo_price = self._select_promo_price(price_nzd, promo_pool, title=title)
         return price_nzd, promo_price
 
-    def _extract_prices_from_scripts(self, soup: BeautifulSoup) -> list[float]:
-        script_text = " ".join(node.get_text(" ", strip=True) for node in soup.find_all("script"))
+    def _extract_prices_from_scripts(self, soup: BeautifulSoup | PageIndex) -> list[float]:
+        script_text = PageIndex.of(soup).script_text
         if not script_text:
             return []
 
@@ -1286,8 +1232,9 @@ class LiveRetailerAdapter(SourceAdapter):
         return value
 
     def _extract_attributes(
-        self, product_obj: dict[str, Any], soup: BeautifulSoup, title: str = "", raw_category: str = ""
+        self, product_obj: dict[str, Any], soup: BeautifulSoup | PageIndex, title: str = "", raw_category: str = ""
     ) -> dict[str, object]:
+        page = PageIndex.of(soup)
         attributes: dict[str, object] = {}
 
         additional = product_obj.get("additionalProperty")
@@ -1306,27 +1253,26 @@ class LiveRetailerAdapter(SourceAdapter):
             if value:
                 attributes.setdefault(key, value)
 
-        keywords = self._as_text(product_obj.get("keywords")) or self._extract_meta_content(soup, "name", "keywords")
+        keywords = self._as_text(product_obj.get("keywords")) or self._extract_meta_content(page, "name", "keywords")
         if keywords:
             attributes.setdefault("keywords", [item.strip() for item in keywords.split(",") if item.strip()][:16])
 
-        ingredients = self._extract_ingredients(product_obj, soup)
+        ingredients = self._extract_ingredients(product_obj, page)
         if ingredients:
             attributes.setdefault("ingredients", ingredients)
 
-        for key, value in self._extract_spec_attributes_from_html(soup).items():
+        for key, value in self._extract_spec_attributes_from_html(page).items():
             attributes.setdefault(key, value)
 
         description = attributes.get("description")
         if not description:
-            meta_description = self._extract_meta_content(soup, "name", "description")
+            meta_description = self._extract_meta_content(page, "name", "description")
             if meta_description:
                 attributes["description"] = meta_description
 
         if not attributes:
             # Fallback light parse for inline JSON specs
-            script_text = " ".join(node.get_text(" ", strip=True) for node in soup.find_all("script"))
-            model_match = re.search(r'"model"\s*:\s*"([^"]+)"', script_text)
+            model_match = re.search(r'"model"\s*:\s*"([^"]+)"', page.script_text)
             if model_match:
                 attributes["model"] = model_match.group(1)
 
@@ -1367,11 +1313,12 @@ class LiveRetailerAdapter(SourceAdapter):
                     pairs.append((key_text, raw_value))
         return pairs
 
-    def _extract_spec_attributes_from_html(self, soup: BeautifulSoup) -> dict[str, object]:
+    def _extract_spec_attributes_from_html(self, soup: BeautifulSoup | PageIndex) -> dict[str, object]:
+        page = PageIndex.of(soup)
         attributes: dict[str, object] = {}
 
         # Capture structured "specification" rows commonly used by ecommerce templates.
-        for row in soup.select("table tr")[:220]:
+        for row in page.table_rows[:220]:
             cells = row.find_all(["th", "td"])
             if len(cells) < 2:
                 continue
@@ -1388,7 +1335,7 @@ class LiveRetailerAdapter(SourceAdapter):
             if len(attributes) >= 60:
                 return attributes
 
-        for definition_list in soup.find_all("dl")[:16]:
+        for definition_list in page.definition_lists[:16]:
             for term in definition_list.find_all("dt")[:80]:
                 key = self._as_text(term.get_text(" ", strip=True))
                 value_node = term.find_next_sibling("dd")
@@ -1446,66 +1393,20 @@ class LiveRetailerAdapter(SourceAdapter):
 
     def _normalize_category(self, raw_category: str, title: str, vertical: str | None = None) -> str:
         target_vertical = vertical or self.vertical
-        text = f"{raw_category} {title}".lower()
+        rules = get_vertical_rules()
         if self._is_pharma_vertical_name(target_vertical):
-            if self._contains_rx_exclusion(raw_category, title):
-                return "excluded-rx"
-            if any(token in text for token in ["vitamin", "supplement", "omega", "probiotic", "collagen", "magnesium"]):
-                return "supplements"
-            if any(token in text for token in ["pain", "cold", "flu", "tablet", "capsule", "medicine", "paracetamol", "ibuprofen"]):
-                return "otc"
-            return "other-pharma"
-        if target_vertical == "beauty":
-            for category, tokens in BEAUTY_CATEGORY_RULES:
-                if any(token in text for token in tokens):
-                    return category
-            return "beauty"
-        if target_vertical == "home-appliances":
-            if any(token in text for token in ["fridge", "refrigerator", "freezer"]):
-                return "fridges"
-            if any(token in text for token in ["washing machine", "washer", "dryer", "laundry"]):
-                return "washing-machines"
-            if any(token in text for token in ["dishwasher"]):
-                return "dishwashers"
-            return "appliances"
-        if target_vertical == "pet-goods":
-            if any(
-                token in text
-                for token in [
-                    "dog food",
-                    "cat food",
-                    "pet food",
-                    "kibble",
-                    "dry food",
-                    "wet food",
-                    "puppy food",
-                    "kitten food",
-                ]
-            ):
-                return "pet-food"
-            if any(token in text for token in ["treat", "chew", "jerky", "biscuit"]):
-                return "treats"
-            if any(token in text for token in ["flea", "tick", "worm", "deworm", "parasite"]):
-                return "flea-tick"
-            if any(token in text for token in ["groom", "pet shampoo", "pet conditioner", "brush", "comb", "deodoriser"]):
-                return "grooming"
-            if any(token in text for token in ["pet toy", "dog toy", "cat toy", "teaser", "rope toy", "plush toy", "ball"]):
-                return "toys"
-            if any(token in text for token in ["pet bed", "bedding", "crate mat", "blanket"]):
-                return "bedding"
-            return "pet-supplies"
-
-        if any(token in text for token in ["laptop", "notebook", "macbook", "ultrabook"]):
-            return "laptops"
-        if any(token in text for token in ["phone", "smartphone", "iphone", "galaxy", "pixel"]):
-            return "phones"
-        if any(token in text for token in ["monitor", "display", "oled", "refresh"]):
-            return "monitors"
-        return "electronics"
+            rules_vertical = "pharma"
+        elif target_vertical in rules.categories:
+            rules_vertical = target_vertical
+        else:
+            rules_vertical = "tech"
+        return rules.categorize(rules_vertical, f"{raw_category} {title}".lower())
 
     def _default_category_for_vertical(self, vertical: str | None = None) -> str:
         target_vertical = vertical or self.vertical
-        return VERTICAL_FALLBACK_CATEGORIES.get(target_vertical, "other")
+        if self._is_pharma_vertical_name(target_vertical):
+            target_vertical = "pharma"
+        return get_vertical_rules().fallbacks.get(target_vertical, "other")
 
     def _derive_home_appliances_attributes(self, title: str, existing_attributes: dict[str, object]) -> dict[str, object]:
         text = title.lower()
@@ -1591,7 +1492,7 @@ class LiveRetailerAdapter(SourceAdapter):
 
         return attributes
 
-    def _extract_ingredients(self, product_obj: dict[str, Any], soup: BeautifulSoup) -> str | None:
+    def _extract_ingredients(self, product_obj: dict[str, Any], soup: BeautifulSoup | PageIndex) -> str | None:
         for key in ("ingredients", "ingredient", "activeIngredients", "activeIngredient"):
             value = product_obj.get(key)
             if isinstance(value, list):
@@ -1603,7 +1504,7 @@ class LiveRetailerAdapter(SourceAdapter):
             if text:
                 return text
 
-        script_text = " ".join(node.get_text(" ", strip=True) for node in soup.find_all("script"))
+        script_text = PageIndex.of(soup).script_text
         if script_text:
             for pattern in (
                 r'"ingredients"\s*:\s*"([^"]+)"',
@@ -1653,8 +1554,7 @@ class LiveRetailerAdapter(SourceAdapter):
         return attributes
 
     def _contains_rx_exclusion(self, *values: str) -> bool:
-        text = " ".join(values).lower()
-        return any(token in text for token in RX_EXCLUSION_TOKENS)
+        return bool(RX_EXCLUSION_MATCHER.find(" ".join(values).lower()))
 
     def _looks_like_bot_challenge(self, html: str) -> bool:
         lowered = html.lower()
@@ -1698,13 +1598,16 @@ class LiveRetailerAdapter(SourceAdapter):
 
         return False
 
-    def _looks_like_missing_page(self, soup: BeautifulSoup) -> bool:
-        title_text = self._as_text(soup.title.string if soup.title else None) or ""
-        heading_text = " ".join(node.get_text(" ", strip=True) for node in soup.find_all(["h1", "h2"], limit=3))
+    def _looks_like_missing_page(self, soup: BeautifulSoup | PageIndex) -> bool:
+        page = PageIndex.of(soup)
+        title_text = self._as_text(page.title_string) or ""
+        heading_text = " ".join(node.get_text(" ", strip=True) for node in page.headings)
         body_text = f"{title_text} {heading_text}".lower()
         return any(marker in body_text for marker in MISSING_PAGE_MARKERS)
 
-    def _is_non_product_page(self, url: str, title: str, soup: BeautifulSoup, product_obj: dict[str, Any]) -> bool:
+    def _is_non_product_page(
+        self, url: str, title: str, soup: BeautifulSoup | PageIndex, product_obj: dict[str, Any]
+    ) -> bool:
         _ = (url, title, product_obj)
         return self._looks_like_missing_page(soup)
 
@@ -1719,29 +1622,122 @@ class LiveRetailerAdapter(SourceAdapter):
         digest = hashlib.sha1(base.encode("utf-8")).hexdigest()[:16]
         return f"{self.retailer_slug}-{digest}"
 
+    def _resolve_rate_limit(self, rate_per_second: float | None, burst: int | None) -> RateLimit | None:
+        cls = type(self)
+        rate = rate_per_second if rate_per_second is not None else cls.rate_limit_per_second
+        if rate is None and self.request_delay_seconds > 0:
+            rate = 1.0 / self.request_delay_seconds
+        if not rate or rate <= 0:
+            return None
+        return RateLimit(rate_per_second=rate, burst=max(1, burst if burst is not None else cls.rate_limit_burst))
+
+    @property
+    def page_cache_stats(self) -> PageCacheStats:
+        return self._page_cache.stats
+
+    def plan_recrawl(self, pages: list[dict[str, object]]) -> bool:
+        self._recrawl_pages = list(pages)
+        return True
+
+    def skip_products(self, source_product_ids: Collection[str]) -> None:
+        self._skipped_source_ids = frozenset(source_product_ids)
+
+    def begin_run(self) -> None:
+        self._recrawl_pages = None
+        self.used_fixture_fallback = False
+        self.discovery_failure_reason = None
+        # Pages pinned by an aborted run would otherwise never be taken.
+        self._page_cache.clear()
+        with self._page_lock:
+            self._fixture_source_ids.clear()
+            self._prefetched.clear()
+            self._planned_urls = []
+            self._planned_positions = {}
+            for future in self._parsing.values():
+                future.cancel()
+            self._parsing.clear()
+
+    def close(self) -> None:
+        stats = self._page_cache.stats
+        logger.debug(
+            "%s page cache: hits=%s misses=%s evictions=%s consumed=%s",
+            self.retailer_slug,
+            stats.hits,
+            stats.misses,
+            stats.evictions,
+            stats.consumed,
+        )
+        if self._browser_pool is not None:
+            self._browser_pool.close()
+            self._browser_pool = None
+        if self._fetch_engine is not None:
+            self._fetch_engine.close()
+            self._fetch_engine = None
+        if self.validator_cache is not None and self._owns_validator_cache:
+            self.validator_cache.close()
+        if self.raw_store is not None and self._owns_raw_store:
+            self.raw_store.prune()
+            self.raw_store.close()
+        if self._parse_pool is not None:
+            self._parse_pool.close()
+            self._parse_pool = None
+            self._parsing.clear()
+        self.client.close()
+
+    def _get_browser_pool(self) -> BrowserPool:
+        if self._browser_pool is None:
+            self._browser_pool = BrowserPool(
+                size=self.browser_pool_size,
+                max_navigations=self.browser_max_navigations,
+                timeout_seconds=self.browser_timeout_seconds,
+                user_agent=None,
+                proxy_url=self.browser_proxy_url or self.proxy_url,
+            )
+        return self._browser_pool
+
+    def _get_fetch_engine(self) -> AsyncFetchEngine:
+        # Prefetch windows call this from several threads at once.
+        with self._fetch_engine_lock:
+            if self._fetch_engine is None:
+                self._fetch_engine = AsyncFetchEngine(
+                    headers=DEFAULT_REQUEST_HEADERS,
+                    timeout_seconds=self.timeout_seconds,
+                    proxy_url=self.proxy_url,
+                    max_fetch_retries=self.max_fetch_retries,
+                    retry_backoff_seconds=self.retry_backoff_seconds,
+                    rate_limiter=self.rate_limiter,
+                    rate_limit=self.rate_limit,
+                    per_host_concurrency=self.fetch_concurrency,
+                    challenge_detector=self._looks_like_bot_challenge,
+                    retailer_slug=self.retailer_slug,
+                )
+            return self._fetch_engine
+
     def _fetch_text_with_browser(self, url: str) -> str:
-        proxy_url = self.browser_proxy_url or self.proxy_url
         logger.info("Using browser fallback for %s URL: %s", self.retailer_slug, url)
-        return fetch_page_html(
-            url,
-            timeout_seconds=self.browser_timeout_seconds,
-            user_agent=None,
-            proxy_url=proxy_url,
-        )
+        return self._get_browser_pool().fetch(url)
 
     def _fetch_text(self, url: str) -> str:
+        return self._fetch_page(url).text or ""
+
+    def _fetch_page(self, url: str, headers: dict[str, str] | None = None) -> FetchOutcome:
+        if self.replay:
+            return FetchOutcome(url=url, text=self._replay_text(url))
         attempts = self.max_fetch_retries + 1
         http_exc: Exception | None = None
         for attempt in range(attempts):
             try:
-                response = self._request_with_retries(url)
+                response = self._request_with_retries(url, headers)
+                if response.status_code == 304:
+                    return FetchOutcome.from_response(url, response)
                 text = response.text
             except Exception as exc:
                 http_exc = exc
                 break
 
             if not self._looks_like_bot_challenge(text):
-                return text
+                self._archive(url, text, "page")
+                return FetchOutcome.from_response(url, response, text)
 
             http_exc = RuntimeError(f"Blocked by anti-bot challenge for {self.retailer_slug}: {url}")
             if attempt >= attempts - 1:
@@ -1751,45 +1747,213 @@ class LiveRetailerAdapter(SourceAdapter):
             if backoff > 0:
                 time.sleep(backoff)
 
-        if self.browser_fallback and http_exc is not None:
-            try:
-                html = self._fetch_text_with_browser(url)
-            except Exception:
-                raise http_exc
-            if self._looks_like_bot_challenge(html):
-                raise http_exc
-            return html
-
         if http_exc is not None:
-            raise http_exc
+            return FetchOutcome(url=url, text=self._fetch_text_after_http_failure(url, http_exc))
 
         raise RuntimeError(f"Unreachable fetch-text retry state for {url}")
 
-    def _fetch_sitemap_text(self, url: str) -> str:
-        response = self._request_with_retries(url)
-        content = response.content
-        lower_url = url.lower()
-        content_type = response.headers.get("content-type", "").lower()
+    def _fetch_text_after_http_failure(self, url: str, http_exc: Exception) -> str:
+        if not self.browser_fallback:
+            raise http_exc
+        try:
+            html = self._fetch_text_with_browser(url)
+        except Exception:
+            raise http_exc
+        if self._looks_like_bot_challenge(html):
+            raise http_exc
+        self._archive(url, html, "page")
+        return html
 
-        if lower_url.endswith(".gz") or "gzip" in content_type or "application/x-gzip" in content_type:
+    def _fetch_texts(self, urls: list[str]) -> list[str | Exception]:
+        if self.fetch_concurrency <= 1 or len(urls) <= 1:
+            results: list[str | Exception] = []
+            for url in urls:
+                try:
+                    results.append(self._fetch_text(url))
+                except Exception as exc:
+                    results.append(exc)
+            return results
+        return [result if isinstance(result, Exception) else result.text or "" for result in self._fetch_pages(urls)]
+
+    def _fetch_pages(
+        self, urls: list[str], request_headers: dict[str, dict[str, str]] | None = None
+    ) -> list[FetchOutcome | Exception]:
+        request_headers = request_headers or {}
+        if self.fetch_concurrency <= 1 or len(urls) <= 1 or self.replay:
+            results: list[FetchOutcome | Exception] = []
+            for url in urls:
+                try:
+                    results.append(self._fetch_page(url, request_headers.get(url)))
+                except Exception as exc:
+                    results.append(exc)
+            return results
+
+        results = []
+        for outcome in self._get_fetch_engine().fetch_all(urls, request_headers):
+            if outcome.error is None and (outcome.text is not None or outcome.not_modified):
+                if outcome.text is not None:
+                    self._archive(outcome.url, outcome.text, "page")
+                results.append(outcome)
+                continue
             try:
-                content = gzip.decompress(content)
-            except OSError:
-                logger.debug("Sitemap %s looked gzipped but could not be decompressed; using raw payload", url)
+                html = self._fetch_text_after_http_failure(outcome.url, outcome.error or RuntimeError(outcome.url))
+                results.append(FetchOutcome(url=outcome.url, text=html))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def _plan_prefetch(self, urls: list[str]) -> None:
+        with self._page_lock:
+            self._planned_urls = list(urls)
+            self._planned_positions = {url: idx for idx, url in enumerate(self._planned_urls)}
+
+    def _take_prefetched_page(self, url: str, cached: CachedResponse | None = None) -> FetchOutcome:
+        prefetching = self.fetch_concurrency > 1 or self.parse_workers > 0
+        with self._page_lock:
+            windows: list[dict[str, Future[FetchOutcome]]] = []
+            if url not in self._prefetched and prefetching and url in self._planned_positions:
+                windows.append(self._claim_window(self._planned_positions[url]))
+            if self.parse_workers > 0 and url in self._planned_positions:
+                # Stay one window ahead so parser processes work while this thread fetches and writes.
+                ahead = self._planned_positions[url] + self._prefetch_window_size()
+                if ahead < len(self._planned_urls) and self._planned_urls[ahead] not in self._prefetched:
+                    windows.append(self._claim_window(ahead))
+            prefetched = self._prefetched.pop(url, None)
+
+        for window in windows:
+            self._prefetch_window(window, cached_for={url: cached})
+        if prefetched is None:
+            if self.validator_cache is not None:
+                return self._fetch_page(url, cached.conditional_headers() if cached else None)
+            return FetchOutcome(url=url, text=self._fetch_text(url))
+        try:
+            # Waits when another thread claimed this page and is still fetching it.
+            return prefetched.result()
+        except Exception:
+            with self._page_lock:
+                self._parsing.pop(url, None)
+            raise
+
+    def _prefetch_window_size(self) -> int:
+        return max(self.fetch_concurrency, self.parse_workers) * 2
+
+    def _claim_window(self, start: int) -> dict[str, Future[FetchOutcome]]:
+        claimed = {
+            planned: Future()
+            for planned in self._planned_urls[start : start + self._prefetch_window_size()]
+            if planned not in self._prefetched
+        }
+        self._prefetched.update(claimed)
+        return claimed
+
+    def _prefetch_window(
+        self, claimed: dict[str, Future[FetchOutcome]], cached_for: dict[str, CachedResponse | None] | None = None
+    ) -> None:
+        # Fetch a claimed window of planned product pages concurrently; memory
+        # stays bounded by the window rather than by max_products.
+        window = list(claimed)
+        cached_for = cached_for or {}
+        try:
+            request_headers: dict[str, dict[str, str]] = {}
+            for planned in window:
+                planned_cached = cached_for[planned] if planned in cached_for else self._cached_response("product", planned)
+                if planned_cached is not None:
+                    request_headers[planned] = planned_cached.conditional_headers()
+            for planned, result in zip(window, self._fetch_pages(window, request_headers)):
+                if self.parse_workers > 0 and isinstance(result, FetchOutcome) and result.text is not None:
+                    parsing = self._get_parse_pool().submit(self, planned, self._source_id_from_url(planned), result.text)
+                    # Registered before the fetch resolves so the page's consumer always finds it.
+                    with self._page_lock:
+                        self._parsing[planned] = parsing
+                if isinstance(result, Exception):
+                    claimed[planned].set_exception(result)
+                else:
+                    claimed[planned].set_result(result)
+        finally:
+            # Other threads may be waiting on these pages.
+            for planned, future in claimed.items():
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Prefetch of {planned} did not complete"))
+
+    def _get_parse_pool(self) -> ProductParsePool:
+        if self._parse_pool is None:
+            self._parse_pool = ProductParsePool(self.parse_workers)
+        return self._parse_pool
+
+    def parser_options(self) -> dict[str, Any]:
+        return {
+            "vertical": self.vertical,
+            "html_parser": self.html_parser,
+            "include_url_patterns": list(self.include_url_patterns),
+        }
+
+    def _validator_namespace(self, kind: str) -> str:
+        if self._parser_fingerprint is None:
+            options = {**self.parser_options(), "version": PARSER_VERSION, "rules": get_vertical_rules().digest}
+            self._parser_fingerprint = hashlib.sha1(repr(sorted(options.items())).encode("utf-8")).hexdigest()[:12]
+        return f"{kind}:{self.retailer_slug}:{self.vertical}:{self._parser_fingerprint}"
+
+    def _cached_response(self, kind: str, url: str) -> CachedResponse | None:
+        if self.validator_cache is None:
+            return None
+        return self.validator_cache.get(self._validator_namespace(kind), url)
+
+    def _store_validators(self, kind: str, fetched: FetchOutcome, payload: Any) -> None:
+        if self.validator_cache is None or not (fetched.etag or fetched.last_modified):
+            return
+        self.validator_cache.put(self._validator_namespace(kind), fetched.url, fetched.etag, fetched.last_modified, payload)
+
+    def _archive(self, url: str, body: str, kind: str) -> None:
+        if self.raw_store is None or self.replay:
+            return
+        try:
+            self.raw_store.put(url, body, kind=kind, source=self.retailer_slug)
+        except Exception as exc:
+            logger.warning("Failed to archive %s body for %s: %s", kind, url, exc)
 
-        return content.decode(response.encoding or "utf-8", errors="replace")
+    def _open_archive(self, url: str, kind: str) -> RawBodyWriter | None:
+        if self.raw_store is None or self.replay:
+            return None
+        try:
+            return self.raw_store.open_writer(url, kind=kind, source=self.retailer_slug)
+        except Exception as exc:
+            logger.warning("Failed to archive %s body for %s: %s", kind, url, exc)
+            return None
 
-    def _request_with_retries(self, url: str) -> httpx.Response:
+    def _commit_archive(self, archive: RawBodyWriter) -> None:
+        try:
+            archive.commit()
+        except Exception as exc:
+            archive.discard()
+            logger.warning("Failed to archive %s body for %s: %s", archive.kind, archive.url, exc)
+
+    @staticmethod
+    def _stream_entries(parser: SitemapStreamParser, response: httpx.Response) -> Iterator[SitemapEntry]:
+        for chunk in response.iter_bytes():
+            yield from parser.feed(chunk)
+        yield from parser.close()
+
+    def _replay_text(self, url: str) -> str:
+        body = self.raw_store.latest(url) if self.raw_store is not None else None
+        if body is None:
+            raise RuntimeError(f"No archived body for {self.retailer_slug}: {url}")
+        return body
+
+    def _request_with_retries(
+        self, url: str, headers: dict[str, str] | None = None, stream: bool = False
+    ) -> httpx.Response:
         attempts = self.max_fetch_retries + 1
         for attempt in range(attempts):
-            if self.request_delay_seconds > 0 and self._last_request_at is not None:
-                elapsed = time.time() - self._last_request_at
-                if elapsed < self.request_delay_seconds:
-                    time.sleep(self.request_delay_seconds - elapsed)
+            if self.rate_limit is not None:
+                self.rate_limiter.acquire(urlparse(url).netloc, self.rate_limit)
 
             try:
-                response = self.client.get(url)
-                self._last_request_at = time.time()
+                if stream:
+                    response = self.client.send(self.client.build_request("GET", url, headers=headers), stream=True)
+                else:
+                    response = self.client.get(url, headers=headers) if headers else self.client.get(url)
+                if headers and response.status_code == 304:
+                    return response
                 if response.status_code in RETRYABLE_HTTP_STATUSES:
                     raise httpx.HTTPStatusError(
                         f"Retryable status {response.status_code} for {url}",
@@ -1800,6 +1964,8 @@ class LiveRetailerAdapter(SourceAdapter):
                 return response
             except (httpx.TimeoutException, httpx.NetworkError, httpx.HTTPStatusError) as exc:
                 if isinstance(exc, httpx.HTTPStatusError):
+                    if stream:
+                        exc.response.close()
                     status = exc.response.status_code if exc.response is not None else None
                     if status not in RETRYABLE_HTTP_STATUSES:
                         raise
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass
+
+from worker.adapters.live_base import LiveRetailerAdapter
+from worker.fetchers.raw_store import RawPageStore
+from worker.html_parsing import HTML_PARSER_BACKENDS, make_soup
+
+
+class BenchmarkTechAdapter(LiveRetailerAdapter):
+    vertical = "tech"
+    retailer_slug = "benchmark"
+    base_url = "https://example.com"
+    sitemap_seeds = ["/sitemap.xml"]
+    include_url_patterns = ["/product/"]
+
+
+@dataclass
+class BackendResult:
+    backend: str
+    pages: int
+    seconds: float
+    tree_seconds: float
+    mismatches: int
+
+    @property
+    def ms_per_page(self) -> float:
+        return (self.seconds / self.pages) * 1000 if self.pages else 0.0
+
+    @property
+    def tree_ms_per_page(self) -> float:
+        return (self.tree_seconds / self.pages) * 1000 if self.pages else 0.0
+
+
+def synthetic_product_page(index: int) -> str:
+    nav = "".join(f'<li><a href="/category/{idx}">Category {idx}</a></li>' for idx in range(120))
+    specs = "".join(f"<tr><th>Spec {idx}</th><td>Value {index}-{idx}</td></tr>" for idx in range(40))
+    ld_json = json.dumps(
+        {
+            "@context": "https://schema.org",
+            "@graph": [
+                {
+                    "@type": "BreadcrumbList",
+                    "itemListElement": [
+                        {"@type": "ListItem", "position": 1, "name": "Computers"},
+                        {"@type": "ListItem", "position": 2, "name": "Laptops"},
+                    ],
+                },
+                {
+                    "@type": "Product",
+                    "name": f"Contoso Laptop {index} 16GB 512GB",
+                    "brand": {"@type": "Brand", "name": "Contoso"},
+                    "sku": f"CT-{index:05d}",
+                    "image": f"https://cdn.example.com/laptop-{index}.jpg",
+                    "offers": {"@type": "Offer", "price": f"{999 + index}.00", "availability": "InStock"},
+                },
+            ],
+        }
+    )
+    return f"""<!doctype html>
+<html><head>
+<title>Contoso Laptop {index} | Example</title>
+<meta property="og:title" content="Contoso Laptop {index} 16GB 512GB" />
+<meta property="og:image" content="https://cdn.example.com/laptop-{index}.jpg" />
+<meta property="product:price:amount" content="{999 + index}.00" />
+<script type="application/ld+json">{ld_json}</script>
+<script>window.__STATE__ = {{"price": {999 + index}, "images": ["https://cdn.example.com/laptop-{index}-2.jpg"]}}</script>
+</head><body>
+<header><nav><ul>{nav}</ul></nav></header>
+<main>
+<nav class="breadcrumb"><a href="/">Home</a> / <a href="/computers">Computers</a> / <span>Laptops</span></nav>
+<h1>Contoso Laptop {index} 16GB 512GB</h1>
+<div class="price"><span class="was">Was $1,499.00</span> <span class="now">Now ${999 + index}.00</span></div>
+<img src="https://cdn.example.com/laptop-{index}.jpg" alt="Contoso Laptop {index}" />
+<table class="specifications">{specs}</table>
+<p>{"Lorem ipsum dolor sit amet. " * 80}</p>
+</main>
+<footer>{nav}</footer>
+</body></html>"""
+
+
+def load_pages(raw_store: str | None, retailer: str | None, limit: int) -> list[tuple[str, str]]:
+    if raw_store:
+        store = RawPageStore(raw_store)
+        try:
+            pages = []
+            for url, body in store.iter_latest(source=retailer, kind="page"):
+                pages.append((url, body))
+                if len(pages) >= limit:
+                    break
+            return pages
+        finally:
+            store.close()
+    return [(f"https://example.com/product/laptop-{idx}", synthetic_product_page(idx)) for idx in range(limit)]
+
+
+def _parse(adapter: LiveRetailerAdapter, url: str, html: str) -> dict[str, object] | str:
+    try:
+        return asdict(adapter._parse_product_html(url, adapter._source_id_from_url(url), html))
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+
+
+def run_benchmark(
+    pages: list[tuple[str, str]],
+    adapter_cls: type[LiveRetailerAdapter] = BenchmarkTechAdapter,
+    backends: tuple[str, ...] = HTML_PARSER_BACKENDS,
+    repeat: int = 3,
+) -> list[BackendResult]:
+    baseline: list[dict[str, object] | str] | None = None
+    results: list[BackendResult] = []
+    for backend in backends:
+        adapter = adapter_cls(html_parser=backend, use_fixture_fallback=False)
+        try:
+            outputs = [_parse(adapter, url, html) for url, html in pages]
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for url, html in pages:
+                    _parse(adapter, url, html)
+            elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for _url, html in pages:
+                    make_soup(html, adapter.html_parser)
+            tree_elapsed = time.perf_counter() - started
+        finally:
+            adapter.close()
+        if baseline is None:
+            baseline = outputs
+        mismatches = sum(1 for expected, actual in zip(baseline, outputs) if expected != actual)
+        results.append(
+            BackendResult(
+                backend=backend,
+                pages=len(pages) * repeat,
+                seconds=elapsed,
+                tree_seconds=tree_elapsed,
+                mismatches=mismatches,
+            )
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare HTML parser backends on product-page extraction")
+    parser.add_argument("--raw-store", default=None, help="Replay pages archived with --raw-store instead of synthetic pages")
+    parser.add_argument("--retailer", default=None, help="Retailer slug to replay (also selects its adapter class)")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    adapter_cls: type[LiveRetailerAdapter] = BenchmarkTechAdapter
+    if args.retailer:
+        from worker.main import ADAPTERS
+
+        adapter_cls = ADAPTERS[args.retailer].live
+
+    pages = load_pages(args.raw_store, args.retailer, max(1, args.pages))
+    if not pages:
+        raise SystemExit("No archived pages found")
+
+    results = run_benchmark(pages, adapter_cls=adapter_cls, repeat=max(1, args.repeat))
+    baseline = results[0]
+    for result in results:
+        speedup = baseline.ms_per_page / result.ms_per_page if result.ms_per_page else 0.0
+        tree_speedup = baseline.tree_ms_per_page / result.tree_ms_per_page if result.tree_ms_per_page else 0.0
+        print(
+            f"backend={result.backend} pages={result.pages} "
+            f"tree_ms_per_page={result.tree_ms_per_page:.2f} tree_speedup={tree_speedup:.2f}x "
+            f"extract_ms_per_page={result.ms_per_page:.2f} extract_speedup={speedup:.2f}x "
+            f"mismatches={result.mismatches}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,27 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class WorkerSettings(BaseSettings):
     database_url: str = "sqlite:///./worthit.db"
+    redis_url: str = "redis://localhost:6379/0"
+    rate_limit_backend: str = "memory"
+    http_cache_path: str | None = None
+    raw_store_path: str | None = None
+    raw_store_retention_days: int | None = None
+    html_parser: str = "html.parser"
+    parse_workers: int = 0
+    page_cache_entries: int = 512
+    page_cache_bytes: int = 64 * 1024 * 1024
+    write_batch_size: int = 50
+    commit_every: int = 200
+    collapse_unchanged_prices: bool = True
+    listing_workers: int = 1
+    detail_workers: int = 1
+    stage_queue_size: int = 64
+    match_workers: int = 1
+    scheduler_min_interval_minutes: float = 60.0
+    scheduler_max_interval_minutes: float = 24 * 60.0
+    scheduler_volatility_window_days: float = 14.0
+    vertical_rules_path: str | None = None
+    vertical_rules_cache_dir: str | None = None
 
     model_config = SettingsConfigDict(env_file=".env", env_prefix="WORTHIT_")
 
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from worker.db import SessionLocal
+from worker.matching.blocking import ProductBlockingIndex
+from worker.matching.identity import PHARMA_VERTICALS, variant_signature, variants_compatible
+from worker.matching.normalization import normalize_text
+from worker.models import Product, ProductOverride, RetailerProduct
+
+# Permutation hashes are computed modulo a Mersenne prime so a*x+b fits in int64.
+HASH_PRIME = (1 << 31) - 1
+DEFAULT_NUM_PERM = 128
+DEFAULT_BANDS = 32
+DEFAULT_THRESHOLD = 0.7
+# Buckets this crowded come from shingles nearly every product shares; they are skipped to stay sub-quadratic.
+MAX_BUCKET_SIZE = 200
+
+
+def shingles(
+    normalized_name: str,
+    attributes: dict[str, object] | None,
+    identifiers: tuple[str | None, ...] = (),
+) -> set[str]:
+    """Name tokens, scalar attribute values and identifier keys; brand and category are deliberately left out."""
+    features = {f"n:{token}" for token in normalized_name.split()}
+    for key, value in (attributes or {}).items():
+        if isinstance(value, (str, int, float)) and not isinstance(value, bool) and str(value).strip():
+            features.add(f"a:{key}={str(value).strip().lower()}")
+    features.update(f"i:{identifier}" for identifier in identifiers if identifier)
+    return features
+
+
+def _stable_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big") & HASH_PRIME
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1) -> None:
+        rng = numpy.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, HASH_PRIME, num_perm, dtype=numpy.int64)
+        self._b = rng.integers(0, HASH_PRIME, num_perm, dtype=numpy.int64)
+
+    def signature(self, features: set[str]) -> numpy.ndarray:
+        hashes = numpy.fromiter((_stable_hash(feature) for feature in features), dtype=numpy.int64, count=len(features))
+        return ((numpy.outer(hashes, self._a) + self._b) % HASH_PRIME).min(axis=0)
+
+
+def lsh_pairs(signatures: dict[str, numpy.ndarray], bands: int) -> set[tuple[str, str]]:
+    """Pairs of ids whose signatures agree on every row of at least one band."""
+    buckets: dict[tuple[int, bytes], list[str]] = defaultdict(list)
+    for product_id, signature in signatures.items():
+        rows = len(signature) // bands
+        for band in range(bands):
+            buckets[(band, signature[band * rows : (band + 1) * rows].tobytes())].append(product_id)
+    pairs: set[tuple[str, str]] = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > MAX_BUCKET_SIZE:
+            continue
+        members = sorted(members)
+        for position, first in enumerate(members):
+            pairs.update((first, second) for second in members[position + 1 :])
+    return pairs
+
+
+@dataclass(frozen=True)
+class CatalogueProduct:
+    id: str
+    vertical: str
+    canonical_name: str
+    identifiers: tuple[str | None, ...]
+    variants: dict[str, str]
+    features: frozenset[str]
+    listings: int
+    created_at: datetime | None
+
+    def has_identifiers(self) -> bool:
+        return any(self.identifiers)
+
+
+@dataclass(frozen=True)
+class MergeProposal:
+    product_id: str
+    target_product_id: str
+    similarity: float
+    retailer_product_ids: tuple[str, ...]
+
+
+def load_catalogue(db: Session, vertical: str | None = None) -> dict[str, CatalogueProduct]:
+    """Products that have at least one listing, keyed by id."""
+    listings = (
+        select(RetailerProduct.product_id, func.count(RetailerProduct.id).label("listings"))
+        .group_by(RetailerProduct.product_id)
+        .subquery()
+    )
+    stmt = select(
+        Product.id,
+        Product.vertical,
+        Product.canonical_name,
+        Product.normalized_name,
+        Product.gtin_key,
+        Product.mpn_key,
+        Product.model_key,
+        Product.attributes,
+        Product.created_at,
+        listings.c.listings,
+    ).join(listings, listings.c.product_id == Product.id)
+    if vertical:
+        stmt = stmt.where(Product.vertical == vertical)
+
+    catalogue = {}
+    for row in db.execute(stmt):
+        identifiers = (row.gtin_key, row.mpn_key, row.model_key)
+        features = shingles(row.normalized_name or normalize_text(row.canonical_name), row.attributes, identifiers)
+        if not features:
+            continue
+        catalogue[row.id] = CatalogueProduct(
+            id=row.id,
+            vertical=row.vertical,
+            canonical_name=row.canonical_name,
+            identifiers=identifiers,
+            variants=variant_signature(row.attributes) if row.vertical in PHARMA_VERTICALS else {},
+            features=frozenset(features),
+            listings=row.listings,
+            created_at=row.created_at,
+        )
+    return catalogue
+
+
+def _jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    return len(a & b) / len(a | b)
+
+
+def _mergeable(a: CatalogueProduct, b: CatalogueProduct) -> bool:
+    if a.vertical != b.vertical:
+        return False
+    if not (variants_compatible(a.variants, b.variants) and variants_compatible(b.variants, a.variants)):
+        return False
+    # Two products with identifiers would each keep claiming their listings in the exact tiers.
+    return not (a.has_identifiers() and b.has_identifiers())
+
+
+def _target_rank(product: CatalogueProduct) -> tuple:
+    # Listings are matched by identifiers before overrides, so only a product without them can be merged away.
+    return (not product.has_identifiers(), -product.listings, product.created_at is None, product.created_at, product.id)
+
+
+class _DisjointSet:
+    def __init__(self) -> None:
+        self._parent: dict[str, str] = {}
+
+    def find(self, item: str) -> str:
+        root = self._parent.setdefault(item, item)
+        while root != self._parent[root]:
+            root = self._parent[root]
+        while item != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        self._parent[self.find(a)] = self.find(b)
+
+    def groups(self) -> list[list[str]]:
+        groups: dict[str, list[str]] = defaultdict(list)
+        for item in self._parent:
+            groups[self.find(item)].append(item)
+        return list(groups.values())
+
+
+def find_duplicates(
+    db: Session,
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+    vertical: str | None = None,
+) -> list[MergeProposal]:
+    """Proposes merging near-duplicate products across brands and categories, most similar first.
+
+    MinHash signatures are banded into LSH buckets, so only products sharing a
+    bucket are compared; candidate pairs are confirmed with their exact Jaccard
+    similarity. Confirmed pairs are clustered and every cluster merges into its
+    best-listed product, preferring one with identifiers.
+    """
+    catalogue = load_catalogue(db, vertical)
+    # Signatures are cut into whole bands, so the permutation count is rounded to a multiple of ``bands``.
+    hasher = MinHasher(max(1, num_perm // bands) * bands)
+    signatures = {product_id: hasher.signature(set(product.features)) for product_id, product in catalogue.items()}
+
+    clusters = _DisjointSet()
+    for first, second in lsh_pairs(signatures, bands):
+        a, b = catalogue[first], catalogue[second]
+        if _jaccard(a.features, b.features) >= threshold and _mergeable(a, b):
+            clusters.union(first, second)
+
+    merged_into: dict[str, tuple[str, float]] = {}
+    for group in clusters.groups():
+        members = sorted((catalogue[product_id] for product_id in group), key=_target_rank)
+        target = members[0]
+        for member in members[1:]:
+            similarity = _jaccard(member.features, target.features)
+            # Clusters can chain; each duplicate must be close to the target itself.
+            if similarity >= threshold and _mergeable(member, target):
+                merged_into[member.id] = (target.id, similarity)
+
+    if not merged_into:
+        return []
+    listing_ids: dict[str, list[str]] = defaultdict(list)
+    for retailer_product_id, product_id in db.execute(
+        select(RetailerProduct.id, RetailerProduct.product_id)
+        .where(RetailerProduct.product_id.in_(list(merged_into)))
+        .order_by(RetailerProduct.id)
+    ):
+        listing_ids[product_id].append(retailer_product_id)
+    return sorted(
+        (
+            MergeProposal(duplicate_id, target_id, similarity, tuple(listing_ids[duplicate_id]))
+            for duplicate_id, (target_id, similarity) in merged_into.items()
+        ),
+        key=lambda proposal: (-proposal.similarity, proposal.product_id),
+    )
+
+
+def apply_proposals(db: Session, proposals: list[MergeProposal]) -> int:
+    """Moves each duplicate's listings onto its target through ``ProductOverride`` rows; returns the rows written.
+
+    A duplicate left without listings is deleted along with its blocking keys,
+    so matching can no longer pick it as a candidate; its views go to the target.
+    """
+    blocking = ProductBlockingIndex(db)
+    written = 0
+    for proposal in proposals:
+        reason = f"dedup: minhash {proposal.similarity:.2f} from {proposal.product_id}"
+        existing = {
+            override.retailer_product_id: override
+            for override in db.execute(
+                select(ProductOverride).where(ProductOverride.retailer_product_id.in_(proposal.retailer_product_ids))
+            ).scalars()
+        }
+        for retailer_product_id in proposal.retailer_product_ids:
+            retailer_product = db.get(RetailerProduct, retailer_product_id)
+            if retailer_product is None:
+                continue
+            retailer_product.product_id = proposal.target_product_id
+            override = existing.get(retailer_product_id)
+            if override is None:
+                db.add(
+                    ProductOverride(
+                        retailer_product_id=retailer_product_id, product_id=proposal.target_product_id, reason=reason
+                    )
+                )
+            else:
+                override.product_id = proposal.target_product_id
+                override.reason = reason
+            written += 1
+        db.flush()
+        duplicate = db.get(Product, proposal.product_id)
+        target = db.get(Product, proposal.target_product_id)
+        if duplicate is None or target is None:
+            continue
+        if db.scalar(select(RetailerProduct.id).where(RetailerProduct.product_id == duplicate.id).limit(1)) is None:
+            target.view_count = (target.view_count or 0) + (duplicate.view_count or 0)
+            blocking.remove(duplicate.id)
+            db.delete(duplicate)
+    db.commit()
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Propose merges of near-duplicate products across the catalogue")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Minimum Jaccard similarity to propose a merge"
+    )
+    parser.add_argument("--num-perm", type=int, default=DEFAULT_NUM_PERM, help="MinHash permutations per signature")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS, help="LSH bands (more bands find less similar pairs)")
+    parser.add_argument("--vertical", default=None, help="Only compare products of this vertical")
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Write product overrides moving each duplicate's listings onto its target, then delete the duplicate",
+    )
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        proposals = find_duplicates(
+            db,
+            threshold=min(1.0, max(0.0, args.threshold)),
+            num_perm=max(1, args.num_perm),
+            bands=max(1, args.bands),
+            vertical=args.vertical,
+        )
+        for proposal in proposals:
+            print(
+                f"duplicate={proposal.product_id} target={proposal.target_product_id} "
+                f"similarity={proposal.similarity:.3f} listings={len(proposal.retailer_product_ids)}"
+            )
+        print(f"proposals={len(proposals)}")
+        if args.apply and proposals:
+            print(f"overrides={apply_proposals(db, proposals)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from urllib.parse import urlparse
+
+import httpx
+
+from worker.fetchers.rate_limit import HostRateLimiter, RateLimit
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_HTTP_STATUSES = {403, 408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class FetchOutcome:
+    url: str
+    text: str | None = None
+    error: Exception | None = None
+    not_modified: bool = False
+    etag: str | None = None
+    last_modified: str | None = None
+
+    @classmethod
+    def from_response(cls, url: str, response: httpx.Response, text: str | None = None) -> FetchOutcome:
+        return cls(
+            url=url,
+            text=text,
+            not_modified=response.status_code == 304,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+        )
+
+
+class AsyncFetchEngine:
+    """Fetch many URLs concurrently on ``httpx.AsyncClient``.
+
+    Mirrors ``LiveRetailerAdapter._fetch_text``: retryable statuses and network
+    errors are retried with exponential backoff, anti-bot challenge bodies are
+    retried and finally reported as ``RuntimeError``. At most
+    ``per_host_concurrency`` requests are in flight per host, and each request
+    start draws from the shared per-host rate limiter when a limit is given.
+
+    One event loop thread and one ``AsyncClient`` serve every ``fetch_all`` call
+    until ``close``, so connections are reused across batches and calls from
+    several threads share the per-host limit.
+    """
+
+    def __init__(
+        self,
+        headers: dict[str, str],
+        timeout_seconds: float = 15.0,
+        proxy_url: str | None = None,
+        max_fetch_retries: int = 2,
+        retry_backoff_seconds: float = 0.6,
+        rate_limiter: HostRateLimiter | None = None,
+        rate_limit: RateLimit | None = None,
+        per_host_concurrency: int = 4,
+        challenge_detector: Callable[[str], bool] | None = None,
+        retailer_slug: str = "",
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.headers = headers
+        self.timeout_seconds = timeout_seconds
+        self.proxy_url = proxy_url
+        self.max_fetch_retries = max(0, max_fetch_retries)
+        self.retry_backoff_seconds = max(0.0, retry_backoff_seconds)
+        self.rate_limiter = rate_limiter
+        self.rate_limit = rate_limit
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.challenge_detector = challenge_detector or (lambda _text: False)
+        self.retailer_slug = retailer_slug
+        self.transport = transport
+        # Semaphores bind to the loop that created them; only the engine's loop touches these.
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: httpx.AsyncClient | None = None
+
+    def fetch_all(self, urls: list[str], request_headers: dict[str, dict[str, str]] | None = None) -> list[FetchOutcome]:
+        if not urls:
+            return []
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(urls, request_headers or {}), self._running_loop())
+        return future.result()
+
+    def close(self) -> None:
+        with self._lock:
+            loop, thread, self._loop, self._thread = self._loop, self._thread, None, None
+        if loop is None or thread is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._close_client(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def _running_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name=f"fetch-{self.retailer_slug or 'engine'}", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _fetch_all(self, urls: list[str], request_headers: dict[str, dict[str, str]]) -> list[FetchOutcome]:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_seconds,
+                headers=self.headers,
+                follow_redirects=True,
+                proxy=self.proxy_url,
+                transport=self.transport,
+            )
+        client = self._client
+        return list(await asyncio.gather(*(self._fetch_outcome(client, url, request_headers.get(url)) for url in urls)))
+
+    async def _close_client(self) -> None:
+        client, self._client = self._client, None
+        self._host_semaphores = {}
+        if client is not None:
+            await client.aclose()
+
+    async def _fetch_outcome(
+        self, client: httpx.AsyncClient, url: str, headers: dict[str, str] | None = None
+    ) -> FetchOutcome:
+        try:
+            return await self.fetch_page(client, url, headers)
+        except Exception as exc:
+            return FetchOutcome(url=url, error=exc)
+
+    async def fetch_text(self, client: httpx.AsyncClient, url: str) -> str:
+        return (await self.fetch_page(client, url)).text or ""
+
+    async def fetch_page(
+        self, client: httpx.AsyncClient, url: str, headers: dict[str, str] | None = None
+    ) -> FetchOutcome:
+        attempts = self.max_fetch_retries + 1
+        for attempt in range(attempts):
+            response = await self._request_with_retries(client, url, headers)
+            if response.status_code == 304:
+                return FetchOutcome.from_response(url, response)
+            text = response.text
+            if not self.challenge_detector(text):
+                return FetchOutcome.from_response(url, response, text)
+            if attempt >= attempts - 1:
+                break
+            backoff = self.retry_backoff_seconds * (2**attempt)
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+        raise RuntimeError(f"Blocked by anti-bot challenge for {self.retailer_slug}: {url}")
+
+    async def _request_with_retries(
+        self, client: httpx.AsyncClient, url: str, headers: dict[str, str] | None = None
+    ) -> httpx.Response:
+        attempts = self.max_fetch_retries + 1
+        host = urlparse(url).netloc.lower()
+        semaphore = self._host_semaphore(host)
+        for attempt in range(attempts):
+            try:
+                async with semaphore:
+                    if self.rate_limiter is not None and self.rate_limit is not None:
+                        await self.rate_limiter.acquire_async(host, self.rate_limit)
+                    response = await client.get(url, headers=headers) if headers else await client.get(url)
+                if headers and response.status_code == 304:
+                    return response
+                if response.status_code in RETRYABLE_HTTP_STATUSES:
+                    raise httpx.HTTPStatusError(
+                        f"Retryable status {response.status_code} for {url}",
+                        request=response.request,
+                        response=response,
+                    )
+                response.raise_for_status()
+                return response
+            except (httpx.TimeoutException, httpx.NetworkError, httpx.HTTPStatusError) as exc:
+                if isinstance(exc, httpx.HTTPStatusError):
+                    status = exc.response.status_code if exc.response is not None else None
+                    if status not in RETRYABLE_HTTP_STATUSES:
+                        raise
+
+                if attempt >= attempts - 1:
+                    raise
+
+                backoff = self.retry_backoff_seconds * (2**attempt)
+                if backoff > 0:
+                    await asyncio.sleep(backoff)
+                logger.debug(
+                    "Retrying %s for %s after error (%s), attempt %s/%s",
+                    url,
+                    self.retailer_slug,
+                    exc,
+                    attempt + 1,
+                    attempts,
+                )
+        raise RuntimeError(f"Unreachable retry state for {url}")
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
@@ -1,7 +1,17 @@
 from __future__ import annotations
 
+import logging
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
 from urllib.parse import urlparse
 
+logger = logging.getLogger(__name__)
+
 
 def _playwright_proxy(proxy_url: str) -> dict[str, str]:
     parsed = urlparse(proxy_url)
@@ -20,53 +30,195 @@ def _playwright_proxy(proxy_url: str) -> dict[str, str]:
     return proxy
 
 
-def fetch_page_html(
-    url: str,
-    timeout_seconds: float = 30.0,
-    user_agent: str | None = None,
-    proxy_url: str | None = None,
-) -> str:
+def _load_page_content(page: Any, url: str, timeout_ms: int, timeout_error: type[BaseException]) -> str:
+    last_timeout: BaseException | None = None
+    navigated = False
+    for wait_until in ("domcontentloaded", "load", "commit"):
+        try:
+            page.goto(url, wait_until=wait_until, timeout=timeout_ms)
+            navigated = True
+            break
+        except timeout_error as exc:
+            last_timeout = exc
+            continue
+    if not navigated:
+        if last_timeout:
+            raise last_timeout
+        raise RuntimeError(f"Unable to navigate browser to {url}")
+    try:
+        page.wait_for_load_state("networkidle", timeout=min(timeout_ms, 8000))
+    except Exception:
+        # Some sites keep long-polling; domcontentloaded is enough for parsing.
+        pass
+    return page.content()
+
+
+def _import_playwright() -> tuple[Callable[[], Any], type[BaseException]]:
     try:
         from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
         from playwright.sync_api import sync_playwright
     except Exception as exc:  # pragma: no cover - import path tested via integration
         raise RuntimeError("Playwright is unavailable in this runtime") from exc
+    return sync_playwright, PlaywrightTimeoutError
+
+
+@dataclass
+class BrowserPoolStats:
+    launches: int = 0
+    navigations: int = 0
+    recycles: int = 0
+    crashes: int = 0
+
+
+class _BrowserSlot:
+    """One warm browser/context pinned to its own thread.
+
+    Playwright's sync API must be driven from the thread that started it, so each
+    slot owns a single-thread executor and every browser call is routed through it.
+    """
+
+    def __init__(self, pool: BrowserPool, index: int) -> None:
+        self.pool = pool
+        self.navigations = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"browser-slot-{index}")
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._context: Any = None
+
+    def fetch(self, url: str) -> str:
+        return self._executor.submit(self._fetch, url).result()
+
+    def close(self) -> None:
+        try:
+            self._executor.submit(self._shutdown).result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _fetch(self, url: str) -> str:
+        pool = self.pool
+        if self._context is not None and self.navigations >= pool.max_navigations:
+            self._shutdown()
+            pool._count("recycles")
+        if self._context is None:
+            self._launch()
 
-    timeout_ms = int(max(1.0, timeout_seconds) * 1000)
-    with sync_playwright() as playwright:
+        page = None
+        try:
+            page = self._context.new_page()
+            html = _load_page_content(page, url, pool.timeout_ms, pool.timeout_error)
+        except pool.timeout_error:
+            self._close_page(page)
+            raise
+        except Exception:
+            # Anything other than a navigation timeout usually means the browser or
+            # context died; relaunch on the next checkout instead of reusing it.
+            pool._count("crashes")
+            self._shutdown()
+            raise
+        finally:
+            self.navigations += 1
+            pool._count("navigations")
+        self._close_page(page)
+        return html
+
+    def _launch(self) -> None:
+        pool = self.pool
         launch_kwargs: dict[str, object] = {"headless": True}
-        if proxy_url:
-            launch_kwargs["proxy"] = _playwright_proxy(proxy_url)
+        if pool.proxy_url:
+            launch_kwargs["proxy"] = _playwright_proxy(pool.proxy_url)
+        context_kwargs: dict[str, object] = {}
+        if pool.user_agent:
+            context_kwargs["user_agent"] = pool.user_agent
+
+        self._playwright = pool.playwright_factory().start()
+        try:
+            self._browser = self._playwright.chromium.launch(**launch_kwargs)
+            self._context = self._browser.new_context(**context_kwargs)
+        except Exception:
+            self._shutdown()
+            raise
+        self.navigations = 0
+        pool._count("launches")
 
-        browser = playwright.chromium.launch(**launch_kwargs)
+    def _close_page(self, page: Any) -> None:
+        if page is None:
+            return
         try:
-            context_kwargs: dict[str, object] = {}
-            if user_agent:
-                context_kwargs["user_agent"] = user_agent
-            context = browser.new_context(**context_kwargs)
+            page.close()
+        except Exception:
+            pass
+
+    def _shutdown(self) -> None:
+        for resource, method in ((self._context, "close"), (self._browser, "close"), (self._playwright, "stop")):
+            if resource is None:
+                continue
             try:
-                page = context.new_page()
-                last_timeout: Exception | None = None
-                navigated = False
-                for wait_until in ("domcontentloaded", "load", "commit"):
-                    try:
-                        page.goto(url, wait_until=wait_until, timeout=timeout_ms)
-                        navigated = True
-                        break
-                    except PlaywrightTimeoutError as exc:
-                        last_timeout = exc
-                        continue
-                if not navigated:
-                    if last_timeout:
-                        raise last_timeout
-                    raise RuntimeError(f"Unable to navigate browser to {url}")
-                try:
-                    page.wait_for_load_state("networkidle", timeout=min(timeout_ms, 8000))
-                except Exception:
-                    # Some sites keep long-polling; domcontentloaded is enough for parsing.
-                    pass
-                return page.content()
-            finally:
-                context.close()
+                getattr(resource, method)()
+            except Exception:
+                logger.debug("Ignoring error while closing browser resource", exc_info=True)
+        self._playwright = None
+        self._browser = None
+        self._context = None
+
+
+class BrowserPool:
+    """Long-lived pool of headless browsers reused across page fetches.
+
+    Browsers are launched lazily on first checkout, recycled after
+    ``max_navigations`` page loads, and relaunched after a crash.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_navigations: int = 40,
+        timeout_seconds: float = 30.0,
+        user_agent: str | None = None,
+        proxy_url: str | None = None,
+        playwright_factory: Callable[[], Any] | None = None,
+        timeout_error: type[BaseException] | None = None,
+    ) -> None:
+        self.size = max(1, size)
+        self.max_navigations = max(1, max_navigations)
+        self.timeout_ms = int(max(1.0, timeout_seconds) * 1000)
+        self.user_agent = user_agent
+        self.proxy_url = proxy_url
+        if playwright_factory is None:
+            playwright_factory, default_timeout_error = _import_playwright()
+            timeout_error = timeout_error or default_timeout_error
+        self.playwright_factory = playwright_factory
+        self.timeout_error = timeout_error or TimeoutError
+        self.stats = BrowserPoolStats()
+        self._slots: queue.LifoQueue[_BrowserSlot] = queue.LifoQueue()
+        self._all_slots = [_BrowserSlot(self, index) for index in range(self.size)]
+        for slot in self._all_slots:
+            self._slots.put(slot)
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def checkout(self) -> Iterator[_BrowserSlot]:
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+        slot = self._slots.get()
+        try:
+            yield slot
         finally:
-            browser.close()
+            self._slots.put(slot)
+
+    def fetch(self, url: str) -> str:
+        with self.checkout() as slot:
+            return slot.fetch(url)
+
+    def _count(self, stat: str) -> None:
+        """Increments a ``stats`` counter; slots call this from their own threads."""
+        with self._lock:
+            setattr(self.stats, stat, getattr(self.stats, stat) + 1)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for slot in self._all_slots:
+            slot.close()
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Protocol
+
+from worker.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate_per_second: float
+    burst: int = 1
+
+
+class RateLimitBackend(Protocol):
+    def reserve(self, key: str, limit: RateLimit, now: float) -> float: ...
+
+
+def _reserve_token(tokens: float | None, updated_at: float | None, limit: RateLimit, now: float) -> tuple[float, float]:
+    # Reservation-style bucket: the balance may go negative, and the debt tells the
+    # caller how long to wait before its request is within budget.
+    burst = max(1, limit.burst)
+    if tokens is None or updated_at is None:
+        tokens = float(burst)
+    else:
+        tokens = min(float(burst), tokens + max(0.0, now - updated_at) * limit.rate_per_second)
+    tokens -= 1.0
+    wait = 0.0 if tokens >= 0 else -tokens / limit.rate_per_second
+    return tokens, wait
+
+
+class InProcessRateLimitBackend:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+
+    def reserve(self, key: str, limit: RateLimit, now: float) -> float:
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (None, None))
+            tokens, wait = _reserve_token(tokens, updated_at, limit, now)
+            self._buckets[key] = (tokens, now)
+            return wait
+
+
+# Same arithmetic as _reserve_token, run atomically inside Redis so concurrent
+# reservations never conflict or need retrying.
+RESERVE_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1])
+local updated_at = tonumber(state[2])
+if tokens == nil or updated_at == nil then
+    tokens = burst
+else
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+end
+tokens = tokens - 1
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', ARGV[3])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets stored in Redis hashes so separate worker processes share a budget.
+
+    Each reservation is a single Lua script call; if Redis is unreachable the
+    backend degrades to an in-process bucket instead of failing the crawl.
+    """
+
+    def __init__(self, client: Any, prefix: str = "worthit:ratelimit:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(RESERVE_SCRIPT)
+        self._fallback = InProcessRateLimitBackend()
+
+    @classmethod
+    def from_url(cls, redis_url: str) -> RedisRateLimitBackend:
+        try:
+            from redis import Redis
+        except Exception as exc:  # pragma: no cover - depends on installed extras
+            raise RuntimeError("redis is unavailable in this runtime") from exc
+        return cls(Redis.from_url(redis_url, decode_responses=True))
+
+    def reserve(self, key: str, limit: RateLimit, now: float) -> float:
+        from redis.exceptions import RedisError
+
+        burst = max(1, limit.burst)
+        # Idle buckets refill completely after burst / rate seconds; keep them a little longer.
+        ttl_seconds = max(1, int(burst / limit.rate_per_second) + 60)
+        try:
+            wait = self._script(
+                keys=[f"{self.prefix}{key}"],
+                args=[burst, repr(float(limit.rate_per_second)), repr(now), ttl_seconds],
+            )
+        except RedisError as exc:
+            logger.warning("Redis rate limiter unavailable for %s, using in-process bucket: %s", key, exc)
+            return self._fallback.reserve(key, limit, now)
+        return float(wait)
+
+
+class HostRateLimiter:
+    def __init__(self, backend: RateLimitBackend) -> None:
+        self.backend = backend
+
+    def reserve(self, host: str, limit: RateLimit) -> float:
+        if limit.rate_per_second <= 0:
+            return 0.0
+        return self.backend.reserve(host.lower(), limit, time.time())
+
+    def acquire(self, host: str, limit: RateLimit) -> None:
+        wait = self.reserve(host, limit)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, host: str, limit: RateLimit) -> None:
+        # A shared backend does network I/O; keep it off the event loop.
+        wait = await asyncio.to_thread(self.reserve, host, limit)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+@lru_cache
+def get_rate_limiter() -> HostRateLimiter:
+    settings = get_settings()
+    if settings.rate_limit_backend == "redis":
+        return HostRateLimiter(RedisRateLimitBackend.from_url(settings.redis_url))
+    return HostRateLimiter(InProcessRateLimitBackend())
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz"}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except Exception:
+        return None
+    return zstandard
+
+
+def _resolve_codec(compression: str) -> str:
+    if compression == "auto":
+        return "zstd" if _zstandard() is not None else "gzip"
+    if compression not in CODEC_EXTENSIONS:
+        raise ValueError(f"Unsupported raw store compression: {compression}")
+    if compression == "zstd" and _zstandard() is None:
+        raise RuntimeError("zstandard is unavailable in this runtime")
+    return compression
+
+
+class RawPageStore:
+    """Content-addressed archive of fetched HTML/XML bodies.
+
+    Bodies are stored once per SHA-256 under ``objects/`` (zstd when available,
+    gzip otherwise). ``index.sqlite3`` records every fetch as URL -> hash so a run
+    can be replayed offline and identical bodies are deduplicated across runs.
+    """
+
+    def __init__(self, root: str | Path, compression: str = "auto", retention_days: int | None = None) -> None:
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.codec = _resolve_codec(compression)
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS fetches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                sha256 TEXT NOT NULL REFERENCES blobs (sha256),
+                kind TEXT NOT NULL,
+                source TEXT NOT NULL,
+                fetched_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ix_fetches_url ON fetches (url, id);
+            CREATE INDEX IF NOT EXISTS ix_fetches_fetched_at ON fetches (fetched_at);
+            """
+        )
+        self._conn.commit()
+
+    def put(self, url: str, body: str, kind: str = "page", source: str = "") -> str:
+        writer = self.open_writer(url, kind=kind, source=source)
+        try:
+            writer.write(body.encode("utf-8"))
+            return writer.commit()
+        except BaseException:
+            writer.discard()
+            raise
+
+    def open_writer(self, url: str, kind: str = "page", source: str = "") -> RawBodyWriter:
+        """Archives a body written in chunks; nothing is recorded unless ``commit`` is called."""
+        return RawBodyWriter(self, url, kind, source)
+
+    def get(self, digest: str) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT codec FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return self._read_object(digest, row[0]).decode("utf-8")
+
+    def latest_hash(self, url: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM fetches WHERE url = ? ORDER BY id DESC LIMIT 1",
+                (url,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def latest(self, url: str) -> str | None:
+        digest = self.latest_hash(url)
+        return self.get(digest) if digest else None
+
+    def iter_latest(self, source: str | None = None, kind: str | None = None) -> Iterator[tuple[str, str]]:
+        clauses = []
+        params: list[str] = []
+        if source is not None:
+            clauses.append("source = ?")
+            params.append(source)
+        if kind is not None:
+            clauses.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT url, sha256 FROM fetches
+                WHERE id IN (SELECT MAX(id) FROM fetches {where} GROUP BY url)
+                ORDER BY id
+                """,
+                params,
+            ).fetchall()
+        for url, digest in rows:
+            yield url, self.get(digest)
+
+    def prune(self, retention_days: int | None = None) -> int:
+        days = retention_days if retention_days is not None else self.retention_days
+        if days is None:
+            return 0
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+        with self._lock:
+            # Keep the newest fetch of every URL so replay always has a body.
+            self._conn.execute(
+                """
+                DELETE FROM fetches
+                WHERE fetched_at < ? AND id NOT IN (SELECT MAX(id) FROM fetches GROUP BY url)
+                """,
+                (cutoff,),
+            )
+            orphans = self._conn.execute(
+                "SELECT sha256, codec FROM blobs WHERE sha256 NOT IN (SELECT DISTINCT sha256 FROM fetches)"
+            ).fetchall()
+            for digest, codec in orphans:
+                self._object_path(digest, codec).unlink(missing_ok=True)
+            self._conn.executemany("DELETE FROM blobs WHERE sha256 = ?", [(digest,) for digest, _ in orphans])
+            self._conn.commit()
+        return len(orphans)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _object_path(self, digest: str, codec: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}{CODEC_EXTENSIONS[codec]}"
+
+    def _record(self, writer: RawBodyWriter, digest: str, tmp_path: Path) -> None:
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            row = self._conn.execute("SELECT codec FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+            if row is None or not self._object_path(digest, row[0]).exists():
+                path = self._object_path(digest, self.codec)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, path)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs (sha256, codec, size, stored_size, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (digest, self.codec, writer.size, path.stat().st_size, now),
+                )
+            else:
+                tmp_path.unlink(missing_ok=True)
+            self._conn.execute(
+                "INSERT INTO fetches (url, sha256, kind, source, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (writer.url, digest, writer.kind, writer.source, now),
+            )
+            self._conn.commit()
+
+    def _read_object(self, digest: str, codec: str) -> bytes:
+        data = self._object_path(digest, codec).read_bytes()
+        if codec == "zstd":
+            zstandard = _zstandard()
+            if zstandard is None:
+                raise RuntimeError("zstandard is unavailable in this runtime")
+            # Streamed frames do not record their content size, which one-shot decompress needs.
+            return zstandard.ZstdDecompressor().decompressobj().decompress(data)
+        return gzip.decompress(data)
+
+
+class RawBodyWriter:
+    """Hashes and compresses a body chunk by chunk into a temporary object file."""
+
+    def __init__(self, store: RawPageStore, url: str, kind: str, source: str) -> None:
+        self.store = store
+        self.url = url
+        self.kind = kind
+        self.source = source
+        self.size = 0
+        self._hash = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=store.objects_dir, suffix=".tmp")
+        self._tmp_path = Path(tmp_name)
+        self._handle = os.fdopen(fd, "wb")
+        if store.codec == "zstd":
+            self._stream = _zstandard().ZstdCompressor(level=10).stream_writer(self._handle, closefd=False)
+        else:
+            self._stream = gzip.GzipFile(fileobj=self._handle, mode="wb", compresslevel=6)
+        self._open = True
+
+    def write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self.size += len(data)
+        self._stream.write(data)
+
+    def commit(self) -> str:
+        self._close()
+        digest = self._hash.hexdigest()
+        self.store._record(self, digest, self._tmp_path)
+        return digest
+
+    def discard(self) -> None:
+        if self._open:
+            self._close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _close(self) -> None:
+        self._open = False
+        try:
+            self._stream.close()
+        finally:
+            self._handle.close()
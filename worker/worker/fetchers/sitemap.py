@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import logging
+import zlib
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass(frozen=True)
+class SitemapEntry:
+    kind: str
+    loc: str
+    lastmod: str | None = None
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapStreamParser:
+    """Incremental sitemap/sitemap-index parser.
+
+    Feed raw bytes as they arrive (gzip members are detected from the magic
+    bytes and inflated on the fly); each ``feed`` returns the ``<sitemap>`` or
+    ``<url>`` entries completed so far. Finished elements are cleared so memory
+    stays flat regardless of document size. Malformed XML raises
+    ``ElementTree.ParseError``.
+    """
+
+    def __init__(self, on_decoded: Callable[[bytes], None] | None = None) -> None:
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._decompressor: Any = None
+        self._sniffed = False
+        self._pending = b""
+        self._started = False
+        self._root: ElementTree.Element | None = None
+        self._root_name: str | None = None
+        self._depth = 0
+        self._loc: str | None = None
+        self._lastmod: str | None = None
+        # Receives the decompressed document chunk by chunk, e.g. to archive it.
+        self.on_decoded = on_decoded
+        self.closed = False
+
+    def feed(self, chunk: bytes) -> list[SitemapEntry]:
+        if not self._sniffed:
+            self._pending += chunk
+            if len(self._pending) < len(GZIP_MAGIC):
+                return []
+            chunk, self._pending = self._pending, b""
+            self._sniffed = True
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        return self._feed_xml(self._inflate(chunk))
+
+    def close(self) -> list[SitemapEntry]:
+        tail = b""
+        if not self._sniffed:
+            tail, self._pending, self._sniffed = self._pending, b"", True
+        elif self._decompressor is not None:
+            tail = self._decompressor.flush()
+        entries = self._feed_xml(tail)
+        if self._started:
+            self._parser.close()
+            entries.extend(self._drain())
+        self.closed = True
+        return entries
+
+    def _inflate(self, chunk: bytes) -> bytes:
+        if self._decompressor is None:
+            return chunk
+        output = []
+        try:
+            while chunk:
+                output.append(self._decompressor.decompress(chunk))
+                # Concatenated gzip members: restart on whatever follows the first.
+                chunk = self._decompressor.unused_data
+                if chunk:
+                    self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        except zlib.error:
+            logger.debug("Sitemap looked gzipped but could not be decompressed; using raw payload")
+            self._decompressor = None
+            return b"".join(output) + chunk
+        return b"".join(output)
+
+    def _feed_xml(self, data: bytes) -> list[SitemapEntry]:
+        if not self._started:
+            data = data.lstrip()
+            if not data:
+                return []
+            self._started = True
+        if not data:
+            return []
+        if self.on_decoded is not None:
+            self.on_decoded(data)
+        self._parser.feed(data)
+        return self._drain()
+
+    def _drain(self) -> list[SitemapEntry]:
+        entries: list[SitemapEntry] = []
+        for event, element in self._parser.read_events():
+            name = _local_name(element.tag)
+            if event == "start":
+                self._depth += 1
+                if self._root is None:
+                    self._root = element
+                    self._root_name = name
+                continue
+            depth = self._depth
+            self._depth -= 1
+            # Only direct children of <url>/<sitemap>; image/video extensions nest their own <loc>.
+            if depth == 3 and name == "loc":
+                self._loc = (element.text or "").strip() or None
+            elif depth == 3 and name == "lastmod":
+                self._lastmod = (element.text or "").strip() or None
+            elif depth == 2 and name in {"sitemap", "url"}:
+                kind = {"sitemapindex": "sitemap", "urlset": "url"}.get(self._root_name or "")
+                if kind == name and self._loc:
+                    entries.append(SitemapEntry(kind=kind, loc=self._loc, lastmod=self._lastmod))
+                self._loc = None
+                self._lastmod = None
+                element.clear()
+                if self._root is not None:
+                    self._root.clear()
+        return entries
+
+
+def iter_sitemap_entries(chunks: Iterable[bytes]) -> Iterator[SitemapEntry]:
+    parser = SitemapStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
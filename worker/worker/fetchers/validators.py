@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class CachedResponse:
+    namespace: str
+    url: str
+    etag: str | None
+    last_modified: str | None
+    payload: Any
+    stored_at: datetime
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ValidatorCache:
+    """Persistent URL -> (ETag, Last-Modified, parsed payload) store.
+
+    Entries are namespaced (e.g. ``product:pb-tech:tech:<parser fingerprint>``) so
+    a 304 only reuses output parsed by the same adapter configuration and parser.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_validators (
+                namespace TEXT NOT NULL,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                payload TEXT NOT NULL,
+                stored_at TEXT NOT NULL,
+                PRIMARY KEY (namespace, url)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, namespace: str, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, payload, stored_at FROM http_validators WHERE namespace = ? AND url = ?",
+                (namespace, url),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, payload, stored_at = row
+        return CachedResponse(
+            namespace=namespace,
+            url=url,
+            etag=etag,
+            last_modified=last_modified,
+            payload=json.loads(payload),
+            stored_at=datetime.fromisoformat(stored_at),
+        )
+
+    def put(self, namespace: str, url: str, etag: str | None, last_modified: str | None, payload: Any) -> None:
+        if not etag and not last_modified:
+            return
+        encoded = json.dumps(payload, default=str)
+        stored_at = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO http_validators (namespace, url, etag, last_modified, payload, stored_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (namespace, url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    payload = excluded.payload,
+                    stored_at = excluded.stored_at
+                """,
+                (namespace, url, etag, last_modified, encoded, stored_at),
+            )
+            self._conn.commit()
+
+    def delete(self, namespace: str, url: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM http_validators WHERE namespace = ? AND url = ?", (namespace, url))
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
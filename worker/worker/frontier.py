@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from worker.models import UrlFrontier, utc_now
+
+
+def parse_lastmod(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+    return _as_utc(parsed)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class CrawlFrontier:
+    """Persisted per-retailer view of every discovered product URL.
+
+    Discovery records sitemap ``lastmod`` values here, the adapter stamps each
+    fetch, and the pipeline stamps price changes. URLs that were never fetched
+    come first, then URLs modified since their last fetch, then the rest by
+    oldest fetch, so a fixed ``max_products`` budget rotates through the whole
+    catalogue across runs.
+    """
+
+    def __init__(self, db: Session, retailer_id: int) -> None:
+        self.db = db
+        self.retailer_id = retailer_id
+        self._entries: dict[str, UrlFrontier] | None = None
+        # The session belongs to the creating thread; updates made from adapter
+        # threads are queued here until that thread calls ``sync``.
+        self._owner = threading.get_ident()
+        self._deferred: list[Callable[[], None]] = []
+        self._deferred_lock = threading.Lock()
+
+    def sync(self) -> None:
+        """Load entries and apply updates recorded on other threads. Call from the session's thread."""
+        self._load()
+        with self._deferred_lock:
+            deferred, self._deferred = self._deferred, []
+        for update in deferred:
+            update()
+
+    def is_fresh(self, url: str, lastmod: datetime | None = None) -> bool:
+        entry = self._load().get(url)
+        if entry is None or entry.last_fetched_at is None:
+            return True
+        return lastmod is not None and lastmod > _as_utc(entry.last_fetched_at)
+
+    def record_discovered(self, urls: list[str], lastmods: dict[str, datetime | None] | None = None) -> None:
+        now = utc_now()
+        urls, lastmods = list(urls), dict(lastmods or {})
+        self._on_owner(lambda: self._record_discovered(urls, lastmods, now))
+
+    def _record_discovered(self, urls: list[str], lastmods: dict[str, datetime | None], now: datetime) -> None:
+        entries = self._load()
+        for url in urls:
+            lastmod = lastmods.get(url)
+            entry = entries.get(url)
+            if entry is None:
+                entry = UrlFrontier(
+                    retailer_id=self.retailer_id,
+                    url=url,
+                    first_seen_at=now,
+                    last_seen_at=now,
+                    sitemap_lastmod=lastmod,
+                )
+                self.db.add(entry)
+                entries[url] = entry
+                continue
+            entry.last_seen_at = now
+            if lastmod is not None:
+                entry.sitemap_lastmod = lastmod
+
+    def prioritize(self, urls: list[str]) -> list[str]:
+        entries = self._load()
+
+        def priority(item: tuple[int, str]) -> tuple[int, float, int]:
+            position, url = item
+            entry = entries.get(url)
+            if entry is None or entry.last_fetched_at is None:
+                return 0, 0.0, position
+            fetched_at = _as_utc(entry.last_fetched_at)
+            if entry.sitemap_lastmod is not None and _as_utc(entry.sitemap_lastmod) > fetched_at:
+                return 1, 0.0, position
+            return 2, fetched_at.timestamp(), position
+
+        return [url for _, url in sorted(enumerate(urls), key=priority)]
+
+    def mark_fetched(self, url: str) -> None:
+        now = utc_now()
+        self._on_owner(lambda: self._stamp(url, "last_fetched_at", now))
+
+    def mark_changed(self, url: str) -> None:
+        now = utc_now()
+        self._on_owner(lambda: self._stamp(url, "last_changed_at", now))
+
+    def _stamp(self, url: str, column: str, value: datetime) -> None:
+        entry = self._load().get(url)
+        if entry is not None:
+            setattr(entry, column, value)
+
+    def _on_owner(self, update: Callable[[], None]) -> None:
+        if threading.get_ident() == self._owner:
+            update()
+            return
+        with self._deferred_lock:
+            self._deferred.append(update)
+
+    def _load(self) -> dict[str, UrlFrontier]:
+        if self._entries is None:
+            rows = self.db.execute(select(UrlFrontier).where(UrlFrontier.retailer_id == self.retailer_id)).scalars()
+            self._entries = {row.url: row for row in rows}
+        return self._entries
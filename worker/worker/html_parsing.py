@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+from functools import cached_property, lru_cache
+from typing import Any
+
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HTML_PARSER = "html.parser"
+HTML_PARSER_BACKENDS = ("html.parser", "lxml")
+
+
+@lru_cache
+def _lxml_available() -> bool:
+    try:
+        import lxml.etree  # noqa: F401
+    except Exception:
+        return False
+    return True
+
+
+def resolve_html_parser(name: str | None) -> str:
+    backend = (name or DEFAULT_HTML_PARSER).strip().lower()
+    if backend not in HTML_PARSER_BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend: {name}")
+    if backend == "lxml" and not _lxml_available():
+        logger.warning("lxml is unavailable in this runtime; falling back to %s", DEFAULT_HTML_PARSER)
+        return DEFAULT_HTML_PARSER
+    return backend
+
+
+def make_soup(html: str, backend: str = DEFAULT_HTML_PARSER) -> BeautifulSoup:
+    return BeautifulSoup(html, backend)
+
+
+LD_JSON_TYPE_RE = re.compile("application/ld\\+json", re.I)
+
+
+class PageIndex:
+    """Everything the product extractors read from a page, gathered in one DOM walk.
+
+    Matching mirrors the BeautifulSoup calls it replaces (``find_all("script")``,
+    ``find("meta", attrs=...)``, ``get_text(" ", strip=True)`` and friends), so
+    extractors produce the same values whether they get a soup or an index.
+    """
+
+    def __init__(self, soup: BeautifulSoup) -> None:
+        self.soup = soup
+        self.scripts: list[Tag] = []
+        self.ld_json_scripts: list[Tag] = []
+        self.meta: dict[tuple[str, str], list[str | None]] = {}
+        self.title_tag: Tag | None = None
+        self.headings: list[Tag] = []
+        self.images: list[Tag] = []
+        self.itemprop_prices: list[Tag] = []
+        self.data_prices: list[Tag] = []
+        self.data_product_prices: list[Tag] = []
+        self.table_rows: list[Tag] = []
+        self.definition_lists: list[Tag] = []
+        self._text_parts: list[str] = []
+        self._index(soup)
+
+    @classmethod
+    def of(cls, soup: BeautifulSoup | PageIndex) -> PageIndex:
+        return soup if isinstance(soup, PageIndex) else cls(soup)
+
+    def _index(self, soup: BeautifulSoup) -> None:
+        string_types = soup.interesting_string_types or (NavigableString, CData)
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                if type(node) in string_types:
+                    stripped = node.strip()
+                    if stripped:
+                        self._text_parts.append(stripped)
+                continue
+
+            name = node.name
+            attrs = node.attrs
+            if name == "script":
+                self.scripts.append(node)
+                script_type = attrs.get("type")
+                if isinstance(script_type, str) and LD_JSON_TYPE_RE.search(script_type):
+                    self.ld_json_scripts.append(node)
+            elif name == "meta":
+                content = attrs.get("content")
+                for attr, value in attrs.items():
+                    if isinstance(value, str):
+                        self.meta.setdefault((attr, value), []).append(content)
+            elif name == "title":
+                if self.title_tag is None:
+                    self.title_tag = node
+            elif name in {"h1", "h2"}:
+                if len(self.headings) < 3:
+                    self.headings.append(node)
+            elif name == "img":
+                self.images.append(node)
+            elif name == "tr":
+                if node.find_parent("table") is not None:
+                    self.table_rows.append(node)
+            elif name == "dl":
+                self.definition_lists.append(node)
+
+            if attrs:
+                if attrs.get("itemprop") == "price":
+                    self.itemprop_prices.append(node)
+                if attrs.get("data-price") is not None:
+                    self.data_prices.append(node)
+                if attrs.get("data-product-price") is not None:
+                    self.data_product_prices.append(node)
+
+    @cached_property
+    def text(self) -> str:
+        return " ".join(self._text_parts)
+
+    @cached_property
+    def script_text(self) -> str:
+        return " ".join(node.get_text(" ", strip=True) for node in self.scripts)
+
+    @cached_property
+    def ld_json_payloads(self) -> list[Any]:
+        payloads: list[Any] = []
+        for script in self.ld_json_scripts:
+            text = script.string or script.get_text("", strip=True)
+            if not text:
+                continue
+            try:
+                payloads.append(json.loads(text))
+            except json.JSONDecodeError:
+                continue
+        return payloads
+
+    @property
+    def title_string(self) -> str | None:
+        return self.title_tag.string if self.title_tag is not None else None
+
+    def meta_contents(self, attr: str, key: str) -> list[str | None]:
+        return self.meta.get((attr, key), [])
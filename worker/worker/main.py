@@ -1,7 +1,13 @@
 from __future__ import annotations
 
 import argparse
+import signal
+import threading
+import time
 from dataclasses import dataclass
+from datetime import timedelta
+
+from sqlalchemy import select
 
 from worker.adapters.apple import AppleFixtureAdapter, AppleLiveAdapter
 from worker.adapters.bargain_chemist import (
@@ -10,6 +16,7 @@ from worker.adapters.bargain_chemist import (
     BargainChemistSupplementsFixtureAdapter,
     BargainChemistSupplementsLiveAdapter,
 )
+from worker.adapters.base import SourceAdapter
 from worker.adapters.chemist_warehouse import (
     ChemistWarehouseFixtureAdapter,
     ChemistWarehouseLiveAdapter,
@@ -57,7 +64,10 @@ from worker.adapters.the_warehouse import (
     TheWarehouseHomeLiveAdapter,
     TheWarehouseLiveAdapter,
 )
+from worker.config import get_settings
 from worker.db import SessionLocal
+from worker.matching.vertical_rules import get_vertical_rules
+from worker.models import IngestionRun, Retailer
 from worker.pipeline import IngestionPipeline
 
 
@@ -67,6 +77,18 @@ class AdapterRegistry:
     live: type
 
 
+@dataclass(frozen=True)
+class RunSummary:
+    run_id: str
+    status: str
+    items_total: int
+    items_new: int
+    items_updated: int
+    items_failed: int
+    fixture_fallback: bool
+    error_summary: str | None = None
+
+
 ADAPTERS: dict[str, AdapterRegistry] = {
     "pb-tech": AdapterRegistry(fixture=PBTechFixtureAdapter, live=PBTechLiveAdapter),
     "jb-hi-fi": AdapterRegistry(fixture=JBHiFiFixtureAdapter, live=JBHiFiLiveAdapter),
@@ -97,7 +119,18 @@ ADAPTERS: dict[str, AdapterRegistry] = {
 }
 
 
-def run_once(
+PIPELINE_OPTIONS = (
+    "write_batch_size",
+    "listing_workers",
+    "detail_workers",
+    "stage_queue_size",
+    "recrawl",
+    "commit_every",
+    "match_workers",
+)
+
+
+def build_adapter(
     retailer_slug: str,
     mode: str,
     max_products: int,
@@ -110,41 +143,270 @@ def run_once(
     browser_timeout_seconds: float,
     browser_proxy_url: str | None,
     vertical: str | None = None,
-) -> None:
+    browser_pool_size: int = 1,
+    browser_max_navigations: int = 40,
+    fetch_concurrency: int = 1,
+    rate_limit_per_second: float | None = None,
+    rate_limit_burst: int | None = None,
+    http_cache_path: str | None = None,
+    raw_store_path: str | None = None,
+    raw_store_retention_days: int | None = None,
+    replay: bool = False,
+    parse_workers: int | None = None,
+) -> SourceAdapter:
     registry = ADAPTERS.get(retailer_slug)
     if not registry:
         raise ValueError(f"Unknown retailer slug: {retailer_slug}")
 
+    settings = get_settings()
     if mode == "fixture":
-        adapter = registry.fixture()
-    else:
-        adapter = registry.live(
-            max_products=max_products,
-            request_delay_seconds=request_delay_seconds,
-            max_fetch_retries=max_fetch_retries,
-            retry_backoff_seconds=retry_backoff_seconds,
-            use_fixture_fallback=use_fixture_fallback,
-            proxy_url=proxy_url,
-            browser_fallback=browser_fallback,
-            browser_timeout_seconds=browser_timeout_seconds,
-            browser_proxy_url=browser_proxy_url,
-            vertical=vertical,
-        )
+        return registry.fixture()
+    return registry.live(
+        max_products=max_products,
+        request_delay_seconds=request_delay_seconds,
+        max_fetch_retries=max_fetch_retries,
+        retry_backoff_seconds=retry_backoff_seconds,
+        use_fixture_fallback=use_fixture_fallback,
+        proxy_url=proxy_url,
+        browser_fallback=browser_fallback,
+        browser_timeout_seconds=browser_timeout_seconds,
+        browser_proxy_url=browser_proxy_url,
+        vertical=vertical,
+        browser_pool_size=browser_pool_size,
+        browser_max_navigations=browser_max_navigations,
+        fetch_concurrency=fetch_concurrency,
+        rate_limit_per_second=rate_limit_per_second,
+        rate_limit_burst=rate_limit_burst,
+        http_cache_path=http_cache_path or settings.http_cache_path,
+        raw_store_path=raw_store_path or settings.raw_store_path,
+        raw_store_retention_days=(
+            raw_store_retention_days if raw_store_retention_days is not None else settings.raw_store_retention_days
+        ),
+        replay=replay,
+        parse_workers=parse_workers if parse_workers is not None else settings.parse_workers,
+        page_cache_entries=settings.page_cache_entries,
+        page_cache_bytes=settings.page_cache_bytes,
+    )
+
 
+def ingest(
+    adapter: SourceAdapter,
+    write_batch_size: int | None = None,
+    listing_workers: int | None = None,
+    detail_workers: int | None = None,
+    stage_queue_size: int | None = None,
+    recrawl: bool = False,
+    commit_every: int | None = None,
+    resume_run_id: str | None = None,
+    match_workers: int | None = None,
+) -> RunSummary:
+    settings = get_settings()
     with SessionLocal() as db:
-        pipeline = IngestionPipeline(db, adapter)
+        pipeline = IngestionPipeline(
+            db,
+            adapter,
+            batch_size=write_batch_size if write_batch_size is not None else settings.write_batch_size,
+            collapse_unchanged_prices=settings.collapse_unchanged_prices,
+            listing_workers=listing_workers if listing_workers is not None else settings.listing_workers,
+            detail_workers=detail_workers if detail_workers is not None else settings.detail_workers,
+            queue_size=stage_queue_size if stage_queue_size is not None else settings.stage_queue_size,
+            recrawl=recrawl,
+            commit_every=commit_every if commit_every is not None else settings.commit_every,
+            resume_run_id=resume_run_id,
+            match_workers=match_workers if match_workers is not None else settings.match_workers,
+        )
         run = pipeline.run()
-        fallback_used = getattr(adapter, "used_fixture_fallback", False)
+        summary = RunSummary(
+            run_id=run.id,
+            status=run.status,
+            items_total=run.items_total,
+            items_new=run.items_new,
+            items_updated=run.items_updated,
+            items_failed=run.items_failed,
+            fixture_fallback=bool(getattr(adapter, "used_fixture_fallback", False)),
+            error_summary=run.error_summary,
+        )
+    print(
+        f"run={summary.run_id} status={summary.status} total={summary.items_total} "
+        f"new={summary.items_new} updated={summary.items_updated} failed={summary.items_failed} "
+        f"fixture_fallback={int(summary.fixture_fallback)}"
+    )
+    cache_stats = getattr(adapter, "page_cache_stats", None)
+    if cache_stats is not None:
         print(
-            f"run={run.id} status={run.status} total={run.items_total} "
-            f"new={run.items_new} updated={run.items_updated} failed={run.items_failed} "
-            f"fixture_fallback={int(bool(fallback_used))}"
+            f"page_cache hits={cache_stats.hits} misses={cache_stats.misses} "
+            f"evictions={cache_stats.evictions} entries={cache_stats.entries} bytes={cache_stats.bytes}"
         )
+    return summary
+
+
+def run_once(
+    retailer_slug: str,
+    mode: str,
+    max_products: int,
+    request_delay_seconds: float,
+    max_fetch_retries: int,
+    retry_backoff_seconds: float,
+    use_fixture_fallback: bool,
+    proxy_url: str | None,
+    browser_fallback: bool | None,
+    browser_timeout_seconds: float,
+    browser_proxy_url: str | None,
+    vertical: str | None = None,
+    browser_pool_size: int = 1,
+    browser_max_navigations: int = 40,
+    fetch_concurrency: int = 1,
+    rate_limit_per_second: float | None = None,
+    rate_limit_burst: int | None = None,
+    http_cache_path: str | None = None,
+    raw_store_path: str | None = None,
+    raw_store_retention_days: int | None = None,
+    replay: bool = False,
+    parse_workers: int | None = None,
+    write_batch_size: int | None = None,
+    listing_workers: int | None = None,
+    detail_workers: int | None = None,
+    stage_queue_size: int | None = None,
+    recrawl: bool = False,
+    commit_every: int | None = None,
+    resume_run_id: str | None = None,
+    match_workers: int | None = None,
+) -> RunSummary:
+    adapter = build_adapter(
+        retailer_slug,
+        mode,
+        max_products=max_products,
+        request_delay_seconds=request_delay_seconds,
+        max_fetch_retries=max_fetch_retries,
+        retry_backoff_seconds=retry_backoff_seconds,
+        use_fixture_fallback=use_fixture_fallback,
+        proxy_url=proxy_url,
+        browser_fallback=browser_fallback,
+        browser_timeout_seconds=browser_timeout_seconds,
+        browser_proxy_url=browser_proxy_url,
+        vertical=vertical,
+        browser_pool_size=browser_pool_size,
+        browser_max_navigations=browser_max_navigations,
+        fetch_concurrency=fetch_concurrency,
+        rate_limit_per_second=rate_limit_per_second,
+        rate_limit_burst=rate_limit_burst,
+        http_cache_path=http_cache_path,
+        raw_store_path=raw_store_path,
+        raw_store_retention_days=raw_store_retention_days,
+        replay=replay,
+        parse_workers=parse_workers,
+    )
+    try:
+        return ingest(
+            adapter,
+            write_batch_size=write_batch_size,
+            listing_workers=listing_workers,
+            detail_workers=detail_workers,
+            stage_queue_size=stage_queue_size,
+            recrawl=recrawl,
+            commit_every=commit_every,
+            resume_run_id=resume_run_id,
+            match_workers=match_workers,
+        )
+    finally:
+        adapter.close()
+
+
+def resumed_retailer(run_id: str) -> str:
+    with SessionLocal() as db:
+        slug = db.scalar(
+            select(Retailer.slug).join(IngestionRun, IngestionRun.retailer_id == Retailer.id).where(IngestionRun.id == run_id)
+        )
+    if slug is None:
+        raise SystemExit(f"Unknown ingestion run: {run_id}")
+    return slug
+
+
+def run_daemon(retailers: list[str], run_kwargs: dict[str, object], args: argparse.Namespace) -> None:
+    from worker.scheduler import CadencePolicy, RecrawlScheduler, WarmAdapters
+
+    settings = get_settings()
+    pipeline_options = {key: run_kwargs.pop(key) for key in PIPELINE_OPTIONS}
+    adapters = WarmAdapters(lambda retailer: build_adapter(retailer, **run_kwargs))
+
+    def run(retailer: str) -> RunSummary:
+        adapter = adapters.get(retailer)
+        try:
+            return ingest(adapter, **pipeline_options)
+        except Exception:
+            adapters.discard(retailer)
+            raise
+
+    def minutes(value: float | None, default: float) -> timedelta:
+        return timedelta(minutes=max(1.0, value if value is not None else default))
+
+    policy = CadencePolicy(
+        min_interval=minutes(args.min_interval_minutes, settings.scheduler_min_interval_minutes),
+        max_interval=minutes(args.max_interval_minutes, settings.scheduler_max_interval_minutes),
+        window=timedelta(days=max(1.0, args.volatility_window_days or settings.scheduler_volatility_window_days)),
+    )
+    scheduler = RecrawlScheduler(retailers, run, SessionLocal, policy=policy)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        # The run in progress finishes and is committed before the daemon exits.
+        signal.signal(signum, lambda *_: stop.set())
+    print(f"Scheduling {len(retailers)} retailers every {policy.min_interval} to {policy.max_interval}", flush=True)
+    try:
+        scheduler.run_forever(stop)
+    finally:
+        adapters.close()
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="WorthIt ingestion worker")
-    parser.add_argument("--retailer", required=True, choices=sorted(ADAPTERS.keys()))
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--retailer", choices=sorted(ADAPTERS.keys()))
+    target.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        default=None,
+        help="Continue an interrupted run of its retailer, skipping the products it already wrote",
+    )
+    target.add_argument(
+        "--all",
+        action="store_true",
+        help="Crawl every retailer, running different hosts in parallel and printing one summary",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and recrawl the selected retailers on a cadence that follows how often their prices change",
+    )
+    parser.add_argument(
+        "--min-interval-minutes",
+        type=float,
+        default=None,
+        help="With --daemon, shortest wait between runs of a retailer (used for volatile prices and retries)",
+    )
+    parser.add_argument(
+        "--max-interval-minutes",
+        type=float,
+        default=None,
+        help="With --daemon, longest wait between runs of a retailer whose prices do not move",
+    )
+    parser.add_argument(
+        "--volatility-window-days",
+        type=float,
+        default=None,
+        help="With --daemon, how far back price changes are counted when setting a retailer's cadence",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=4,
+        help="With --all, hosts crawled at the same time (retailers sharing a host always run in turn)",
+    )
+    parser.add_argument(
+        "--retailer-timeout-seconds",
+        type=float,
+        default=1800.0,
+        help="With --all, stop a retailer's crawl after this long and report it as timed out",
+    )
     parser.add_argument("--mode", default="live", choices=["live", "fixture"])
     parser.add_argument("--max-products", type=int, default=120)
     parser.add_argument("--request-delay-seconds", type=float, default=0.35)
@@ -163,11 +425,102 @@ def main() -> None:
     )
     parser.add_argument("--browser-timeout-seconds", type=float, default=35.0)
     parser.add_argument("--browser-proxy-url", default=None, help="Optional proxy URL specifically for browser fallback")
+    parser.add_argument("--browser-pool-size", type=int, default=1, help="Number of warm browsers kept for browser fallback")
+    parser.add_argument(
+        "--browser-max-navigations",
+        type=int,
+        default=40,
+        help="Recycle each pooled browser after this many page loads",
+    )
+    parser.add_argument(
+        "--fetch-concurrency",
+        type=int,
+        default=1,
+        help="Product pages fetched in flight per host (1 keeps fetching sequential)",
+    )
+    parser.add_argument(
+        "--rate-limit-per-second",
+        type=float,
+        default=None,
+        help="Sustained requests per second per host (defaults to the adapter setting or 1/--request-delay-seconds)",
+    )
+    parser.add_argument("--rate-limit-burst", type=int, default=None, help="Requests allowed in a burst per host")
+    parser.add_argument(
+        "--http-cache",
+        default=None,
+        help="SQLite file for ETag/Last-Modified validators; unchanged sitemaps and pages are reused on HTTP 304",
+    )
+    parser.add_argument(
+        "--raw-store",
+        default=None,
+        help="Directory for the content-addressed archive of fetched HTML/XML bodies",
+    )
+    parser.add_argument(
+        "--raw-store-retention-days",
+        type=int,
+        default=None,
+        help="Drop archived fetches older than this (the newest body per URL is always kept)",
+    )
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Serve every fetch from --raw-store instead of the network (re-parse a previous crawl offline)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes that parse product pages while the main process fetches and writes (0 parses inline)",
+    )
+    parser.add_argument(
+        "--write-batch-size",
+        type=int,
+        default=None,
+        help="Products written per database round trip (1 writes item by item)",
+    )
+    parser.add_argument(
+        "--commit-every",
+        type=int,
+        default=None,
+        help="Commit progress after this many products so an interrupted run can be resumed (0 commits only at the end)",
+    )
+    parser.add_argument(
+        "--listing-workers",
+        type=int,
+        default=None,
+        help="Threads fetching and parsing product pages ahead of the database writer",
+    )
+    parser.add_argument(
+        "--detail-workers",
+        type=int,
+        default=None,
+        help="Threads building normalised products from parsed listings",
+    )
+    parser.add_argument(
+        "--stage-queue-size",
+        type=int,
+        default=None,
+        help="Items allowed to wait between two ingestion stages before the earlier stage blocks",
+    )
+    parser.add_argument(
+        "--match-workers",
+        type=int,
+        default=None,
+        help="Threads scoring fuzzy match candidates for each write batch",
+    )
+    parser.add_argument(
+        "--recrawl",
+        action="store_true",
+        help="Revisit the known listings most likely to have changed (stale, volatile, on promo, viewed) instead of discovering URLs",
+    )
     parser.add_argument("--vertical", default=None, help="Force override of the vertical for this run")
 
     args = parser.parse_args()
-    run_once(
-        retailer_slug=args.retailer,
+    if args.all and args.vertical:
+        parser.error("--vertical cannot be combined with --all")
+    # Missing or invalid rule files stop the worker here rather than mid-crawl.
+    get_vertical_rules()
+    run_kwargs = dict(
         mode=args.mode,
         max_products=max(1, args.max_products),
         request_delay_seconds=max(0.0, args.request_delay_seconds),
@@ -179,7 +532,49 @@ def main() -> None:
         browser_timeout_seconds=max(5.0, args.browser_timeout_seconds),
         browser_proxy_url=args.browser_proxy_url,
         vertical=args.vertical,
+        browser_pool_size=max(1, args.browser_pool_size),
+        browser_max_navigations=max(1, args.browser_max_navigations),
+        fetch_concurrency=max(1, args.fetch_concurrency),
+        rate_limit_per_second=args.rate_limit_per_second,
+        rate_limit_burst=args.rate_limit_burst,
+        http_cache_path=args.http_cache,
+        raw_store_path=args.raw_store,
+        raw_store_retention_days=args.raw_store_retention_days,
+        replay=args.replay,
+        parse_workers=max(0, args.parse_workers) if args.parse_workers is not None else None,
+        write_batch_size=max(1, args.write_batch_size) if args.write_batch_size is not None else None,
+        listing_workers=max(1, args.listing_workers) if args.listing_workers is not None else None,
+        detail_workers=max(1, args.detail_workers) if args.detail_workers is not None else None,
+        stage_queue_size=max(1, args.stage_queue_size) if args.stage_queue_size is not None else None,
+        recrawl=args.recrawl,
+        commit_every=max(0, args.commit_every) if args.commit_every is not None else None,
+        match_workers=max(1, args.match_workers) if args.match_workers is not None else None,
+    )
+    if args.resume:
+        if args.daemon:
+            parser.error("--resume cannot be combined with --daemon")
+        run_once(retailer_slug=resumed_retailer(args.resume), resume_run_id=args.resume, **run_kwargs)
+        return
+    if args.daemon:
+        run_daemon([args.retailer] if args.retailer else list(ADAPTERS), run_kwargs, args)
+        return
+    if not args.all:
+        run_once(retailer_slug=args.retailer, **run_kwargs)
+        return
+
+    from worker.orchestrator import format_summary, run_all
+
+    retailers = list(ADAPTERS)
+    print(f"Starting full ingestion run — {len(retailers)} retailers, up to {max(1, args.max_parallel)} hosts at a time")
+    started = time.monotonic()
+    outcomes = run_all(
+        retailers,
+        run_kwargs,
+        max_parallel=max(1, args.max_parallel),
+        timeout_seconds=args.retailer_timeout_seconds if args.retailer_timeout_seconds > 0 else None,
     )
+    print()
+    print(format_summary(outcomes, elapsed_seconds=time.monotonic() - started))
 
 
 if __name__ == "__main__":
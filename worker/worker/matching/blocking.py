@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+
+from worker.matching.normalization import normalize_text
+from worker.models import Product, ProductBlockingKey
+
+CANDIDATE_LIMIT = 50
+BACKFILL_BATCH_SIZE = 1000
+KEY_LENGTH = 64
+
+
+def blocking_keys(name: str | None) -> set[str]:
+    """Token keys of the normalized name plus character trigrams of it with spaces removed.
+
+    Trigrams keep "S24 Ultra" and "S24Ultra" in the same block.
+    """
+    text = normalize_text(name)
+    keys = {f"t:{token}"[:KEY_LENGTH] for token in text.split()}
+    compact = text.replace(" ", "")
+    keys.update(f"g:{compact[start:start + 3]}" for start in range(len(compact) - 2))
+    return keys
+
+
+class ProductBlockingIndex:
+    """Persisted blocking keys that narrow fuzzy matching to a ranked candidate set.
+
+    Each product stores the keys of its canonical name under its vertical and
+    lower-cased brand and category. Candidates are the products in the item's
+    block that share the most keys with its name.
+    """
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+        self._backfilled = False
+
+    def backfill(self) -> int:
+        """Adds keys for products that have none (created before the index or by the API); runs once per instance."""
+        if self._backfilled:
+            return 0
+        self._backfilled = True
+        rows = self.db.execute(
+            select(Product.id, Product.vertical, Product.brand, Product.category, Product.canonical_name).where(
+                ~exists().where(ProductBlockingKey.product_id == Product.id)
+            )
+        ).all()
+        pending: list[dict[str, str]] = []
+        for product_id, vertical, brand, category, canonical_name in rows:
+            pending.extend(self._rows(product_id, vertical, brand, category, canonical_name))
+            if len(pending) >= BACKFILL_BATCH_SIZE:
+                self.db.execute(insert(ProductBlockingKey), pending)
+                pending = []
+        if pending:
+            self.db.execute(insert(ProductBlockingKey), pending)
+        return len(rows)
+
+    def add(self, product: Product) -> None:
+        """Replaces the stored keys of ``product`` with ones for its current name, brand and category."""
+        self.remove(product.id)
+        rows = self._rows(product.id, product.vertical, product.brand, product.category, product.canonical_name)
+        if rows:
+            self.db.execute(insert(ProductBlockingKey), rows)
+
+    def remove(self, product_id: str) -> None:
+        self.db.execute(delete(ProductBlockingKey).where(ProductBlockingKey.product_id == product_id))
+
+    def candidates(
+        self, vertical: str, brand: str | None, category: str | None, name: str | None, limit: int = CANDIDATE_LIMIT
+    ) -> list[str]:
+        keys = blocking_keys(name)
+        if not keys:
+            return []
+        shared = func.count().label("shared")
+        rows = self.db.execute(
+            select(ProductBlockingKey.product_id, shared)
+            .where(
+                ProductBlockingKey.vertical == vertical,
+                ProductBlockingKey.brand == (brand or "").lower(),
+                ProductBlockingKey.category == (category or "").lower(),
+                ProductBlockingKey.key.in_(keys),
+            )
+            .group_by(ProductBlockingKey.product_id)
+            .order_by(shared.desc(), ProductBlockingKey.product_id)
+            .limit(limit)
+        )
+        return [product_id for product_id, _ in rows]
+
+    @staticmethod
+    def _rows(
+        product_id: str, vertical: str, brand: str | None, category: str | None, name: str | None
+    ) -> list[dict[str, str]]:
+        block = {"vertical": vertical, "brand": (brand or "").lower(), "category": (category or "").lower()}
+        return [{"product_id": product_id, "key": key, **block} for key in sorted(blocking_keys(name))]
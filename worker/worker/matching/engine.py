@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 
-from rapidfuzz import fuzz
-from sqlalchemy import and_, func, or_, select
+import numpy
+from rapidfuzz import fuzz, process
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from worker.adapters.base import NormalizedRetailerProduct
+from worker.matching.blocking import ProductBlockingIndex, blocking_keys
+from worker.matching.identity import (
+    PHARMA_VERTICALS,
+    ProductIdentityIndex,
+    variant_signature,
+    variants_compatible,
+)
 from worker.matching.normalization import normalize_identifier, normalize_text
-from worker.models import Product, ProductOverride, RetailerProduct
+from worker.models import Product
 
 
 @dataclass
@@ -18,107 +27,213 @@ class MatchResult:
     score: float
 
 
+def attribute_values(attributes: dict[str, object] | None) -> dict[str, str]:
+    return {key: str(value).lower() for key, value in (attributes or {}).items()}
+
+
+@dataclass(frozen=True)
+class ProductProfile:
+    """The parts of a product fuzzy scoring compares, normalized once per product."""
+
+    name: str
+    tokens: frozenset[str]
+    attributes: dict[str, str]
+    variants: dict[str, str]
+
+    @classmethod
+    def of(
+        cls,
+        canonical_name: str | None,
+        attributes: dict[str, object] | None,
+        normalized_name: str | None = None,
+        tokens: str | None = None,
+    ) -> ProductProfile:
+        # Products written before the normalized columns were filled are normalized here instead.
+        name = normalized_name or normalize_text(canonical_name)
+        return cls(
+            name,
+            frozenset((tokens or name).split()),
+            attribute_values(attributes),
+            variant_signature(attributes),
+        )
+
+
 class MatchingEngine:
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: Session,
+        index: ProductIdentityIndex | None = None,
+        blocking: ProductBlockingIndex | None = None,
+        workers: int = 1,
+    ) -> None:
         self.db = db
+        self._index = index
+        self._blocking = blocking
+        # Threads rapidfuzz uses to score a block of items against its candidates.
+        self.workers = max(1, workers)
+        self.profiles: dict[str, ProductProfile] = {}
+
+    @property
+    def index(self) -> ProductIdentityIndex:
+        """GTIN, model and override lookups, loaded on first use and kept for the engine's lifetime."""
+        if self._index is None:
+            self._index = ProductIdentityIndex.load(self.db)
+        return self._index
+
+    @property
+    def blocking(self) -> ProductBlockingIndex:
+        """Fuzzy candidate blocks; products without keys are backfilled on first use."""
+        if self._blocking is None:
+            self._blocking = ProductBlockingIndex(self.db)
+            self._blocking.backfill()
+        return self._blocking
+
+    def register(self, product: Product, reblock: bool = True) -> None:
+        """Makes a created or updated product matchable by later items."""
+        self.index.add(product)
+        if reblock:
+            self.blocking.add(product)
+        self.profiles[product.id] = ProductProfile.of(
+            product.canonical_name, product.attributes, product.normalized_name, product.name_tokens
+        )
+
+    def forget(self, product_id: str) -> None:
+        self.index.remove(product_id)
+        self.blocking.remove(product_id)
+        self.profiles.pop(product_id, None)
 
     def match(self, item: NormalizedRetailerProduct, retailer_product_id: str | None = None) -> MatchResult:
+        return self.match_many([item], [retailer_product_id])[0]
+
+    def match_many(
+        self, items: Sequence[NormalizedRetailerProduct], retailer_product_ids: Sequence[str | None] | None = None
+    ) -> list[MatchResult]:
+        """Matches each item against the catalogue as it stands, in one pass.
+
+        Items that reach the fuzzy tier are grouped by block and every group is
+        scored against the union of its candidates with a single ``cdist`` call.
+        """
+        retailer_product_ids = retailer_product_ids or [None] * len(items)
+        exact = [self._exact_match(item, rp_id) for item, rp_id in zip(items, retailer_product_ids)]
+        pools = {
+            position: self.blocking.candidates(item.vertical, item.brand, item.category, item.canonical_name)
+            for position, item in enumerate(items)
+            if exact[position] is None
+        }
+        self._load_profiles({product_id for pool in pools.values() for product_id in pool})
+
+        blocks: dict[tuple[str, str, str], list[int]] = {}
+        for position in pools:
+            item = items[position]
+            blocks.setdefault((item.vertical, item.brand.lower(), item.category.lower()), []).append(position)
+        fuzzy: dict[int, MatchResult] = {}
+        for positions in blocks.values():
+            block_items = [items[position] for position in positions]
+            fuzzy.update(zip(positions, self._score_block(block_items, [pools[position] for position in positions])))
+        return [result or fuzzy[position] for position, result in enumerate(exact)]
+
+    def rescore(self, item: NormalizedRetailerProduct, match: MatchResult, product_ids: Sequence[str]) -> MatchResult:
+        """Updates a fuzzy or new ``match`` with products registered after it was made.
+
+        Only products that would have been blocking candidates for the item are scored.
+        """
+        keys = blocking_keys(item.canonical_name)
+        self._load_profiles(set(product_ids))
+        pool = [
+            product_id
+            for product_id in product_ids
+            if product_id in self.profiles and keys & blocking_keys(self.profiles[product_id].name)
+        ]
+        if not pool:
+            return match
+        best = self._score_block([item], [pool])[0]
+        if best.product_id and (match.product_id is None or best.score > match.score):
+            return best
+        return match
+
+    def _exact_match(self, item: NormalizedRetailerProduct, retailer_product_id: str | None) -> MatchResult | None:
+        variants = variant_signature(item.attributes) if item.vertical in PHARMA_VERTICALS else None
         gtin = normalize_identifier(item.gtin)
         if gtin:
-            candidate = self.db.execute(
-                select(Product).where(and_(Product.gtin == gtin, Product.vertical == item.vertical))
-            ).scalar_one_or_none()
-            if candidate and self._pharmaceuticals_variant_compatible(item, candidate):
-                return MatchResult(product_id=candidate.id, tier="gtin", score=1.0)
+            product_id = self.index.by_gtin(item.vertical, gtin, variants)
+            if product_id:
+                return MatchResult(product_id=product_id, tier="gtin", score=1.0)
 
         normalized_model = normalize_identifier(item.mpn) or normalize_identifier(item.model_number)
         if normalized_model:
-            candidate = self.db.execute(
-                select(Product).where(
-                    and_(
-                        Product.vertical == item.vertical,
-                        func.lower(Product.brand) == item.brand.lower(),
-                        or_(Product.mpn == normalized_model, Product.model_number == normalized_model),
-                    )
-                )
-            ).scalar_one_or_none()
-            if candidate and self._pharmaceuticals_variant_compatible(item, candidate):
-                return MatchResult(product_id=candidate.id, tier="model", score=0.98)
+            product_id = self.index.by_model(item.vertical, item.brand, normalized_model, variants)
+            if product_id:
+                return MatchResult(product_id=product_id, tier="model", score=0.98)
 
         if retailer_product_id:
-            override = self.db.execute(
-                select(ProductOverride).where(ProductOverride.retailer_product_id == retailer_product_id)
-            ).scalar_one_or_none()
-            if override:
-                return MatchResult(product_id=override.product_id, tier="manual_override", score=1.0)
-
-        return self._fuzzy_match(item)
-
-    def _fuzzy_match(self, item: NormalizedRetailerProduct) -> MatchResult:
-        candidates = self.db.execute(
-            select(Product).where(
-                and_(
-                    Product.vertical == item.vertical,
-                    func.lower(Product.brand) == item.brand.lower(),
-                    func.lower(Product.category) == item.category.lower(),
-                )
-            ).limit(200)
-        ).scalars()
+            product_id = self.index.override(retailer_product_id)
+            if product_id:
+                return MatchResult(product_id=product_id, tier="manual_override", score=1.0)
+
+        return None
+
+    def _load_profiles(self, product_ids: set[str]) -> None:
+        missing = product_ids - self.profiles.keys()
+        if not missing:
+            return
+        rows = self.db.execute(
+            select(
+                Product.id, Product.canonical_name, Product.attributes, Product.normalized_name, Product.name_tokens
+            ).where(Product.id.in_(missing))
+        )
+        for product_id, canonical_name, attributes, normalized_name, tokens in rows:
+            self.profiles[product_id] = ProductProfile.of(canonical_name, attributes, normalized_name, tokens)
+
+    def _score_block(self, items: list[NormalizedRetailerProduct], pools: list[list[str]]) -> list[MatchResult]:
+        queries = [normalize_text(item.canonical_name) for item in items]
+        profiles = [self.profiles[product_id] for pool in pools for product_id in pool if product_id in self.profiles]
+        names = list(dict.fromkeys(profile.name for profile in profiles))
+        if not names:
+            return [MatchResult(product_id=None, tier="new", score=0.0) for _ in items]
+        columns = {name: column for column, name in enumerate(names)}
+        similarities = process.cdist(
+            queries, names, scorer=fuzz.token_set_ratio, dtype=numpy.float64, workers=self.workers
+        )
+        return [
+            self._best_candidate(item, query, pool, similarities[row], columns)
+            for row, (item, query, pool) in enumerate(zip(items, queries, pools))
+        ]
+
+    def _best_candidate(
+        self,
+        item: NormalizedRetailerProduct,
+        query: str,
+        pool: list[str],
+        similarities: numpy.ndarray,
+        columns: dict[str, int],
+    ) -> MatchResult:
+        item_attributes = attribute_values(item.attributes)
+        variants = variant_signature(item.attributes) if item.vertical in PHARMA_VERTICALS else None
+        tokens = frozenset(query.split())
 
         best_id: str | None = None
         best_score = 0.0
-        for candidate in candidates:
-            if not self._pharmaceuticals_variant_compatible(item, candidate):
+        for product_id in pool:
+            candidate = self.profiles.get(product_id)
+            if candidate is None:
                 continue
-            attr_matches = self._attribute_overlap(item.attributes, candidate.attributes)
+            if variants is not None and not variants_compatible(variants, candidate.variants):
+                continue
+            attr_matches = sum(1 for key, value in item_attributes.items() if candidate.attributes.get(key) == value)
             if attr_matches < 2:
                 continue
 
-            name_similarity = fuzz.token_set_ratio(normalize_text(item.canonical_name), normalize_text(candidate.canonical_name)) / 100
-            token_jaccard = self._token_jaccard(item.canonical_name, candidate.canonical_name)
+            name_similarity = float(similarities[columns[candidate.name]]) / 100
+            token_jaccard = 0.0
+            if tokens and candidate.tokens:
+                token_jaccard = len(tokens & candidate.tokens) / len(tokens | candidate.tokens)
             attribute_overlap = min(attr_matches / max(len(item.attributes), 1), 1.0)
             score = 0.55 * name_similarity + 0.30 * attribute_overlap + 0.15 * token_jaccard
             if score > best_score:
-                best_id = candidate.id
+                best_id = product_id
                 best_score = score
 
         if best_id and best_score >= 0.75:
             return MatchResult(product_id=best_id, tier="fuzzy", score=best_score)
 
         return MatchResult(product_id=None, tier="new", score=best_score)
-
-    @staticmethod
-    def _normalized_variant_key(value: object) -> str | None:
-        if value is None:
-            return None
-        normalized = normalize_text(str(value)).replace(" ", "")
-        return normalized or None
-
-    def _pharmaceuticals_variant_compatible(self, item: NormalizedRetailerProduct, candidate: Product) -> bool:
-        if item.vertical not in {"pharma", "pharmaceuticals"}:
-            return True
-
-        for key in ("strength", "form", "pack_size"):
-            item_value = self._normalized_variant_key(item.attributes.get(key))
-            candidate_value = self._normalized_variant_key(candidate.attributes.get(key))
-            if item_value and candidate_value and item_value != candidate_value:
-                return False
-        return True
-
-    @staticmethod
-    def _attribute_overlap(a: dict[str, object], b: dict[str, object]) -> int:
-        if not a or not b:
-            return 0
-        overlap = 0
-        for key, value in a.items():
-            if key in b and str(b[key]).lower() == str(value).lower():
-                overlap += 1
-        return overlap
-
-    @staticmethod
-    def _token_jaccard(a: str, b: str) -> float:
-        a_tokens = set(normalize_text(a).split())
-        b_tokens = set(normalize_text(b).split())
-        if not a_tokens or not b_tokens:
-            return 0.0
-        return len(a_tokens & b_tokens) / len(a_tokens | b_tokens)
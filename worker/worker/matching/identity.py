@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from worker.matching.normalization import normalize_identifier, normalize_text
+from worker.models import Product, ProductOverride
+
+PHARMA_VERTICALS = frozenset({"pharma", "pharmaceuticals"})
+VARIANT_KEYS = ("strength", "form", "pack_size")
+
+
+def variant_key(value: object) -> str | None:
+    if value is None:
+        return None
+    normalized = normalize_text(str(value)).replace(" ", "")
+    return normalized or None
+
+
+def variant_signature(attributes: dict[str, object] | None) -> dict[str, str]:
+    """Pharma variant attributes that must agree for two listings to be the same product."""
+    signature = {}
+    for key in VARIANT_KEYS:
+        value = variant_key((attributes or {}).get(key))
+        if value:
+            signature[key] = value
+    return signature
+
+
+def variants_compatible(item: dict[str, str], candidate: dict[str, str]) -> bool:
+    return all(candidate.get(key) in (None, value) for key, value in item.items())
+
+
+def identifier_key(key: str | None, raw: str | None) -> str | None:
+    """The stored identifier key, or one derived from ``raw`` for rows written before keys were stored."""
+    return key or normalize_identifier(raw)
+
+
+@dataclass(frozen=True)
+class IdentityKeys:
+    vertical: str
+    brand: str
+    gtin: str | None
+    mpn: str | None
+    model_number: str | None
+    variants: dict[str, str] = field(default_factory=dict, compare=False)
+
+    @classmethod
+    def of(
+        cls,
+        vertical: str,
+        brand: str | None,
+        gtin: str | None,
+        mpn: str | None,
+        model_number: str | None,
+        attributes: dict[str, object] | None = None,
+    ) -> IdentityKeys:
+        variants = variant_signature(attributes) if vertical in PHARMA_VERTICALS else {}
+        return cls(vertical, (brand or "").lower(), gtin, mpn, model_number, variants)
+
+
+class ProductIdentityIndex:
+    """In-memory lookups for the exact matching tiers.
+
+    Keys are the products' stored identifier keys (GTIN per vertical; MPN or
+    model number per vertical and lower-cased brand) plus manual overrides per
+    retailer product. Products the pipeline creates or re-keys are registered
+    with ``add`` so later items in the run see them.
+    """
+
+    def __init__(self) -> None:
+        self._gtin: dict[tuple[str, str], list[str]] = {}
+        self._model: dict[tuple[str, str, str], list[str]] = {}
+        self._keys: dict[str, IdentityKeys] = {}
+        self._overrides: dict[str, str] = {}
+
+    @classmethod
+    def load(cls, db: Session) -> ProductIdentityIndex:
+        index = cls()
+        attributes = dict(
+            db.execute(select(Product.id, Product.attributes).where(Product.vertical.in_(PHARMA_VERTICALS))).all()
+        )
+        rows = db.execute(
+            select(
+                Product.id,
+                Product.vertical,
+                Product.brand,
+                Product.gtin_key,
+                Product.gtin,
+                Product.mpn_key,
+                Product.mpn,
+                Product.model_key,
+                Product.model_number,
+            ).order_by(Product.created_at, Product.id)
+        )
+        for product_id, vertical, brand, gtin_key, gtin, mpn_key, mpn, model_key, model_number in rows:
+            keys = IdentityKeys.of(
+                vertical,
+                brand,
+                identifier_key(gtin_key, gtin),
+                identifier_key(mpn_key, mpn),
+                identifier_key(model_key, model_number),
+                attributes.get(product_id),
+            )
+            index._register(product_id, keys)
+        index._overrides = dict(db.execute(select(ProductOverride.retailer_product_id, ProductOverride.product_id)).all())
+        return index
+
+    def add(self, product: Product) -> None:
+        """Registers ``product`` under its current keys, replacing any it was indexed under before."""
+        self.remove(product.id)
+        self._register(
+            product.id,
+            IdentityKeys.of(
+                product.vertical,
+                product.brand,
+                identifier_key(product.gtin_key, product.gtin),
+                identifier_key(product.mpn_key, product.mpn),
+                identifier_key(product.model_key, product.model_number),
+                product.attributes,
+            ),
+        )
+
+    def remove(self, product_id: str) -> None:
+        keys = self._keys.pop(product_id, None)
+        if keys is None:
+            return
+        for table, key in self._entries(keys):
+            ids = table.get(key)
+            if ids and product_id in ids:
+                ids.remove(product_id)
+                if not ids:
+                    del table[key]
+
+    def by_gtin(self, vertical: str, gtin: str, variants: dict[str, str] | None = None) -> str | None:
+        return self._first(self._gtin.get((vertical, gtin)), variants)
+
+    def by_model(self, vertical: str, brand: str, identifier: str, variants: dict[str, str] | None = None) -> str | None:
+        return self._first(self._model.get((vertical, brand.lower(), identifier)), variants)
+
+    def override(self, retailer_product_id: str) -> str | None:
+        return self._overrides.get(retailer_product_id)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _register(self, product_id: str, keys: IdentityKeys) -> None:
+        self._keys[product_id] = keys
+        for table, key in self._entries(keys):
+            ids = table.setdefault(key, [])
+            if product_id not in ids:
+                ids.append(product_id)
+
+    def _entries(self, keys: IdentityKeys) -> list[tuple[dict, tuple[str, ...]]]:
+        entries: list[tuple[dict, tuple[str, ...]]] = []
+        if keys.gtin:
+            entries.append((self._gtin, (keys.vertical, keys.gtin)))
+        for identifier in dict.fromkeys((keys.mpn, keys.model_number)):
+            if identifier:
+                entries.append((self._model, (keys.vertical, keys.brand, identifier)))
+        return entries
+
+    def _first(self, ids: list[str] | None, variants: dict[str, str] | None) -> str | None:
+        for product_id in ids or ():
+            if not variants or variants_compatible(variants, self._keys[product_id].variants):
+                return product_id
+        return None
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Sequence
+
+KEYWORD_MATCHER_BACKENDS = ("auto", "pyahocorasick", "python")
+
+
+def _ahocorasick():
+    try:
+        import ahocorasick
+    except Exception:
+        return None
+    return ahocorasick
+
+
+def available_keyword_backend() -> str:
+    return "pyahocorasick" if _ahocorasick() is not None else "python"
+
+
+class KeywordMatcher:
+    """Aho-Corasick matcher over a fixed keyword set.
+
+    ``find`` returns every keyword occurring anywhere in the text (plain
+    substring semantics, overlaps included) from a single pass. Uses
+    pyahocorasick when installed and an equivalent pure-Python automaton
+    otherwise.
+    """
+
+    def __init__(self, keywords: Iterable[str], backend: str = "auto") -> None:
+        if backend not in KEYWORD_MATCHER_BACKENDS:
+            raise ValueError(f"Unknown keyword matcher backend: {backend}")
+        self.keywords = frozenset(keyword for keyword in keywords if keyword)
+        module = _ahocorasick() if backend != "python" else None
+        if backend == "pyahocorasick" and module is None:
+            raise RuntimeError("pyahocorasick is unavailable in this runtime")
+        self.backend = "pyahocorasick" if module is not None else "python"
+        self._automaton = None
+        if module is not None and self.keywords:
+            self._automaton = module.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        elif module is None:
+            self._build(self.keywords)
+
+    def find(self, text: str) -> set[str]:
+        if not self.keywords or not text:
+            return set()
+        if self._automaton is not None:
+            return {keyword for _, keyword in self._automaton.iter(text)}
+
+        goto, fail, output = self._goto, self._fail, self._output
+        hits: set[str] = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+        return hits
+
+    def _build(self, keywords: Iterable[str]) -> None:
+        goto: list[dict[str, int]] = [{}]
+        output: list[set[str]] = [set()]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append(set())
+                state = next_state
+            output[state].add(keyword)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                output[next_state] |= output[fail[next_state]]
+
+        self._goto = goto
+        self._fail = fail
+        self._output = [frozenset(items) for items in output]
+
+
+class KeywordRules:
+    """Ordered ``(label, keywords)`` rules answered from one matcher pass."""
+
+    def __init__(self, rules: Iterable[tuple[str, Sequence[str]]], backend: str = "auto") -> None:
+        self.rules = tuple((label, frozenset(keywords)) for label, keywords in rules)
+        self.matcher = KeywordMatcher((keyword for _, keywords in self.rules for keyword in keywords), backend=backend)
+
+    def first(self, text: str) -> str | None:
+        hits = self.matcher.find(text)
+        if not hits:
+            return None
+        return next((label for label, keywords in self.rules if not hits.isdisjoint(keywords)), None)
+
+    def counts(self, text: str) -> dict[str, int]:
+        hits = self.matcher.find(text)
+        return {label: len(keywords & hits) for label, keywords in self.rules}
@@ -17,3 +17,8 @@ def normalize_text(value: str | None) -> str:
     clean = re.sub(r"[^A-Z0-9 ]", " ", clean)
     clean = re.sub(r"\s+", " ", clean)
     return clean
+
+
+def name_tokens(value: str | None) -> str:
+    """Sorted, de-duplicated tokens of ``normalize_text(value)``; word order and repeats do not change it."""
+    return " ".join(sorted(set(normalize_text(value).split())))
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+from worker.config import get_settings
+from worker.matching.keywords import KeywordRules, available_keyword_backend
+
+logger = logging.getLogger(__name__)
+
+RULES_FILENAME = "category_rules.json"
+# Bump when the compiled form changes shape so stale disk caches are ignored.
+COMPILED_FORMAT_VERSION = 2
+DEFAULT_VERTICALS_ROOT = Path(__file__).resolve().parents[3] / "shared" / "verticals"
+# Worker vertical -> directory under shared/verticals when the names differ.
+VERTICAL_DIRECTORIES = {"pharma": "pharmaceuticals"}
+
+RX_EXCLUSION_TOKENS = {
+    "prescription",
+    "pharmacist only",
+    "pharmacy only medicine",
+    "schedule 4",
+    "s4",
+    "rx",
+}
+# Pinned ahead of the file's own rules; a rules file can never route prescription products into a category.
+PINNED_CATEGORY_RULES: dict[str, tuple[tuple[str, tuple[str, ...]], ...]] = {
+    "pharma": (("excluded-rx", tuple(sorted(RX_EXCLUSION_TOKENS))),),
+}
+# live_base categorises unknown verticals as tech and every pharmacy vertical as pharma.
+REQUIRED_VERTICALS = ("pharma", "tech")
+
+
+class VerticalRulesError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class VerticalRuleSet:
+    vertical: str
+    fallback: str
+    categories: tuple[tuple[str, tuple[str, ...]], ...]
+    signals: tuple[str, ...] = ()
+    pinned: tuple[tuple[str, tuple[str, ...]], ...] = ()
+    # Breaks ties between verticals with equal signal counts; lower wins.
+    priority: int | None = None
+
+
+class CompiledVerticalRules:
+    """Vertical signals and per-vertical category rules compiled into keyword matchers.
+
+    Vertical inference counts signal hits per vertical and breaks ties by rule
+    set order; categorisation returns the first matching category rule, else the
+    vertical's fallback. Each answer is a single pass over the text.
+    """
+
+    def __init__(self, rule_sets: Sequence[VerticalRuleSet], digest: str = "") -> None:
+        self.rule_sets = tuple(rule_sets)
+        # Fingerprint of the inputs, so callers can key derived caches on the rules in force.
+        self.digest = digest
+        self.priority = tuple(rule_set.vertical for rule_set in self.rule_sets)
+        self.signals = KeywordRules((rule_set.vertical, rule_set.signals) for rule_set in self.rule_sets)
+        self.categories = {
+            rule_set.vertical: KeywordRules((*rule_set.pinned, *rule_set.categories)) for rule_set in self.rule_sets
+        }
+        self.fallbacks = {rule_set.vertical: rule_set.fallback for rule_set in self.rule_sets}
+
+    def infer_vertical(self, text: str) -> str | None:
+        scores = self.signals.counts(text)
+        best_vertical = None
+        best_score = 0
+        for vertical in self.priority:
+            score = scores.get(vertical, 0)
+            if score > best_score:
+                best_vertical = vertical
+                best_score = score
+        return best_vertical
+
+    def categorize(self, vertical: str, text: str) -> str:
+        return self.categories[vertical].first(text) or self.fallbacks[vertical]
+
+
+def load_vertical_rules(root: str | Path | None = None, cache_dir: str | Path | None = None) -> CompiledVerticalRules:
+    """Compile rules from ``<root>/<vertical>/category_rules.json``.
+
+    Raises ``VerticalRulesError`` when the directory is missing, a rules file is
+    invalid or a required vertical has no file. The compiled matchers are
+    pickled under ``cache_dir`` keyed by a hash of every input; the cache is
+    only used when that directory is private to the current user, since
+    loading a pickle runs code.
+    """
+
+    root_path = Path(root) if root else DEFAULT_VERTICALS_ROOT
+    sources = _rule_sources(root_path)
+    digest = _fingerprint(sources)
+    cache_path = None
+    if cache_dir and _private_directory(Path(cache_dir)):
+        cache_path = Path(cache_dir) / f"vertical-rules-{digest}.pickle"
+
+    if cache_path is not None and cache_path.exists():
+        try:
+            with cache_path.open("rb") as handle:
+                compiled = pickle.load(handle)
+            if isinstance(compiled, CompiledVerticalRules):
+                return compiled
+        except Exception:
+            logger.warning("Ignoring unreadable vertical rules cache %s", cache_path)
+
+    compiled = CompiledVerticalRules(_parse_rule_sets(sources), digest)
+    if cache_path is not None:
+        _write_cache(cache_path, compiled)
+    return compiled
+
+
+@lru_cache
+def get_vertical_rules() -> CompiledVerticalRules:
+    settings = get_settings()
+    cache_dir = settings.vertical_rules_cache_dir or (
+        Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "worthit" / "vertical-rules"
+    )
+    return load_vertical_rules(settings.vertical_rules_path, cache_dir)
+
+
+def parse_rule_file(vertical: str, payload: object) -> VerticalRuleSet:
+    if not isinstance(payload, dict):
+        raise ValueError("rules file must contain a JSON object")
+    fallback = payload.get("fallback")
+    if not isinstance(fallback, str) or not fallback.strip():
+        raise ValueError("'fallback' must be a non-empty string")
+    priority = payload.get("priority")
+    if priority is not None and (not isinstance(priority, int) or isinstance(priority, bool)):
+        raise ValueError("'priority' must be an integer")
+    signals = _keywords(payload.get("signals", []), "signals", allow_empty=True)
+    categories = payload.get("categories")
+    if not isinstance(categories, list):
+        raise ValueError("'categories' must be a list")
+    rules: list[tuple[str, tuple[str, ...]]] = []
+    for index, rule in enumerate(categories):
+        if not isinstance(rule, dict):
+            raise ValueError(f"categories[{index}] must be an object")
+        category = rule.get("category")
+        if not isinstance(category, str) or not category.strip():
+            raise ValueError(f"categories[{index}].category must be a non-empty string")
+        rules.append((category.strip(), _keywords(rule.get("keywords"), f"categories[{index}].keywords")))
+    return VerticalRuleSet(
+        vertical=vertical,
+        fallback=fallback.strip(),
+        categories=tuple(rules),
+        signals=signals,
+        pinned=PINNED_CATEGORY_RULES.get(vertical, ()),
+        priority=priority,
+    )
+
+
+def _keywords(value: object, field: str, allow_empty: bool = False) -> tuple[str, ...]:
+    if not isinstance(value, list) or not all(isinstance(item, str) and item.strip() for item in value):
+        raise ValueError(f"'{field}' must be a list of non-empty strings")
+    if not value and not allow_empty:
+        raise ValueError(f"'{field}' must not be empty")
+    # Matching runs on lowercased text.
+    return tuple(dict.fromkeys(item.strip().lower() for item in value))
+
+
+def _rule_sources(root: Path) -> dict[str, tuple[Path, bytes]]:
+    if not root.is_dir():
+        raise VerticalRulesError(f"Vertical rules directory {root} does not exist; set WORTHIT_VERTICAL_RULES_PATH")
+    directories = {directory: vertical for vertical, directory in VERTICAL_DIRECTORIES.items()}
+    sources: dict[str, tuple[Path, bytes]] = {}
+    for path in sorted(root.glob(f"*/{RULES_FILENAME}")):
+        vertical = directories.get(path.parent.name, path.parent.name)
+        sources[vertical] = (path, path.read_bytes())
+    missing = [vertical for vertical in REQUIRED_VERTICALS if vertical not in sources]
+    if missing:
+        raise VerticalRulesError(f"Vertical rules directory {root} has no rules for: {', '.join(missing)}")
+    return sources
+
+
+def _fingerprint(sources: dict[str, tuple[Path, bytes]]) -> str:
+    hasher = hashlib.sha256()
+    hasher.update(f"{COMPILED_FORMAT_VERSION}:{available_keyword_backend()}".encode())
+    hasher.update(repr(sorted(PINNED_CATEGORY_RULES.items())).encode())
+    for vertical, (_, content) in sorted(sources.items()):
+        hasher.update(vertical.encode())
+        hasher.update(hashlib.sha256(content).digest())
+    return hasher.hexdigest()[:32]
+
+
+def _parse_rule_sets(sources: dict[str, tuple[Path, bytes]]) -> list[VerticalRuleSet]:
+    rule_sets = []
+    for vertical, (path, content) in sources.items():
+        try:
+            rule_sets.append(parse_rule_file(vertical, json.loads(content)))
+        except ValueError as exc:
+            raise VerticalRulesError(f"Invalid vertical rules in {path}: {exc}") from exc
+    # Verticals without a priority rank after the others, by name.
+    return sorted(rule_sets, key=lambda rule_set: (rule_set.priority is None, rule_set.priority or 0, rule_set.vertical))
+
+
+def _private_directory(path: Path) -> bool:
+    try:
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        info = path.stat()
+    except OSError:
+        logger.warning("Could not create vertical rules cache directory %s", path)
+        return False
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        logger.warning("Ignoring vertical rules cache %s: it must be owned by this user with mode 0700", path)
+        return False
+    return True
+
+
+def _write_cache(path: Path, compiled: CompiledVerticalRules) -> None:
+    try:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump(compiled, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except OSError:
+        logger.warning("Could not write vertical rules cache %s", path)
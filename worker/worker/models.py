@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 from uuid import uuid4
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from sqlalchemy.types import JSON
 
@@ -45,10 +45,27 @@ class Product(Base):
     image_url: Mapped[str | None] = mapped_column(Text)
     attributes: Mapped[dict[str, object]] = mapped_column(JSON, default=dict)
     searchable_text: Mapped[str] = mapped_column(Text, default="")
+    normalized_name: Mapped[str] = mapped_column(String(512), default="")
+    name_tokens: Mapped[str] = mapped_column(String(512), default="")
+    gtin_key: Mapped[str | None] = mapped_column(String(64), index=True)
+    mpn_key: Mapped[str | None] = mapped_column(String(128), index=True)
+    model_key: Mapped[str | None] = mapped_column(String(128), index=True)
+    view_count: Mapped[int] = mapped_column(Integer, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now, onupdate=utc_now)
 
 
+class ProductBlockingKey(Base):
+    __tablename__ = "product_blocking_keys"
+    __table_args__ = (Index("ix_product_blocking_keys_block", "vertical", "brand", "category", "key"),)
+
+    product_id: Mapped[str] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    vertical: Mapped[str] = mapped_column(String(32))
+    brand: Mapped[str] = mapped_column(String(128))
+    category: Mapped[str] = mapped_column(String(128))
+
+
 class RetailerProduct(Base):
     __tablename__ = "retailer_products"
     __table_args__ = (UniqueConstraint("retailer_id", "source_product_id", name="uq_retailer_source_product"),)
@@ -76,12 +93,15 @@ class Price(Base):
     promo_text: Mapped[str | None] = mapped_column(Text)
     discount_pct: Mapped[Decimal | None] = mapped_column(Numeric(5, 2), nullable=True)
     captured_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+    last_seen_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    observed_count: Mapped[int] = mapped_column(Integer, default=1)
 
 
 class LatestPrice(Base):
     __tablename__ = "latest_prices"
 
     retailer_product_id: Mapped[str] = mapped_column(ForeignKey("retailer_products.id"), primary_key=True)
+    price_id: Mapped[str | None] = mapped_column(ForeignKey("prices.id"), nullable=True)
     price_nzd: Mapped[Decimal] = mapped_column(Numeric(10, 2))
     promo_price_nzd: Mapped[Decimal | None] = mapped_column(Numeric(10, 2), nullable=True)
     promo_text: Mapped[str | None] = mapped_column(Text)
@@ -104,6 +124,14 @@ class IngestionRun(Base):
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
 
+class IngestionRunItem(Base):
+    __tablename__ = "ingestion_run_items"
+
+    run_id: Mapped[str] = mapped_column(ForeignKey("ingestion_runs.id"), primary_key=True)
+    source_product_id: Mapped[str] = mapped_column(String(256), primary_key=True)
+    processed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+
+
 class ProductOverride(Base):
     __tablename__ = "product_overrides"
 
@@ -112,3 +140,17 @@ class ProductOverride(Base):
     product_id: Mapped[str] = mapped_column(ForeignKey("products.id"))
     reason: Mapped[str | None] = mapped_column(Text)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+
+
+class UrlFrontier(Base):
+    __tablename__ = "url_frontier"
+    __table_args__ = (UniqueConstraint("retailer_id", "url", name="uq_url_frontier_retailer_url"),)
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=new_id)
+    retailer_id: Mapped[int] = mapped_column(ForeignKey("retailers.id"), index=True)
+    url: Mapped[str] = mapped_column(Text)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+    sitemap_lastmod: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_fetched_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True, index=True)
+    last_changed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any
+from urllib.parse import urlparse
+
+from worker.main import ADAPTERS, RunSummary, run_once
+
+DEFAULT_MAX_PARALLEL = 4
+DEFAULT_RETAILER_TIMEOUT_SECONDS = 1800.0
+
+
+@dataclass(frozen=True)
+class RetailerOutcome:
+    retailer: str
+    status: str
+    seconds: float
+    summary: RunSummary | None = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "completed"
+
+
+def retailer_host(retailer_slug: str) -> str:
+    host = (urlparse(ADAPTERS[retailer_slug].live.base_url).hostname or retailer_slug).lower()
+    return host.removeprefix("www.")
+
+
+def host_groups(retailers: list[str]) -> list[list[str]]:
+    """Retailers sharing a host (``noel-leeming`` and ``noel-leeming-home``) run one after another."""
+    groups: dict[str, list[str]] = {}
+    for retailer in retailers:
+        groups.setdefault(retailer_host(retailer), []).append(retailer)
+    return list(groups.values())
+
+
+def _run_in_child(target: Callable[..., RunSummary | None], kwargs: dict[str, Any], conn: Connection) -> None:
+    try:
+        from worker.db import engine
+
+        # Connections inherited from the parent must not be shared with it.
+        engine.dispose(close=False)
+        conn.send(("ok", target(**kwargs)))
+    except BaseException as exc:
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+        raise
+    finally:
+        conn.close()
+
+
+def run_retailer(
+    retailer: str,
+    run_kwargs: dict[str, Any],
+    timeout_seconds: float | None = DEFAULT_RETAILER_TIMEOUT_SECONDS,
+    target: Callable[..., RunSummary | None] = run_once,
+) -> RetailerOutcome:
+    """Runs ``target`` (``run_once``) for one retailer in its own process so a hung crawl can be killed."""
+    context = multiprocessing.get_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_run_in_child,
+        args=(target, {**run_kwargs, "retailer_slug": retailer}, sender),
+        name=f"ingest-{retailer}",
+    )
+    started = time.monotonic()
+    process.start()
+    sender.close()
+    process.join(timeout_seconds)
+    if process.is_alive():
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        receiver.close()
+        return RetailerOutcome(retailer, "timeout", time.monotonic() - started, error=f"exceeded {timeout_seconds:g}s")
+
+    seconds = time.monotonic() - started
+    message = receiver.recv() if receiver.poll() else None
+    receiver.close()
+    if message is None:
+        return RetailerOutcome(retailer, "error", seconds, error=f"exit code {process.exitcode}")
+    kind, payload = message
+    if kind == "error":
+        return RetailerOutcome(retailer, "error", seconds, error=payload)
+    if payload is None:
+        return RetailerOutcome(retailer, "completed", seconds)
+    return RetailerOutcome(retailer, payload.status, seconds, summary=payload, error=payload.error_summary)
+
+
+def run_all(
+    retailers: list[str],
+    run_kwargs: dict[str, Any],
+    max_parallel: int = DEFAULT_MAX_PARALLEL,
+    timeout_seconds: float | None = DEFAULT_RETAILER_TIMEOUT_SECONDS,
+    target: Callable[..., RunSummary | None] = run_once,
+) -> list[RetailerOutcome]:
+    """Crawls ``retailers`` with up to ``max_parallel`` hosts in flight, one retailer per host at a time."""
+
+    def run_group(group: list[str]) -> list[RetailerOutcome]:
+        outcomes = []
+        for retailer in group:
+            outcome = run_retailer(retailer, run_kwargs, timeout_seconds=timeout_seconds, target=target)
+            print(f"[{retailer}] {outcome.status} in {outcome.seconds:.1f}s", flush=True)
+            outcomes.append(outcome)
+        return outcomes
+
+    groups = host_groups(retailers)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(groups) or 1))) as pool:
+        finished = {
+            outcome.retailer: outcome for group in pool.map(run_group, groups) for outcome in group
+        }
+    return [finished[retailer] for retailer in retailers]
+
+
+def format_summary(outcomes: list[RetailerOutcome], elapsed_seconds: float | None = None) -> str:
+    lines = []
+    for outcome in outcomes:
+        line = f"{outcome.retailer:<32} {outcome.status:<10} {outcome.seconds:7.1f}s"
+        if outcome.summary is not None:
+            summary = outcome.summary
+            line += (
+                f"  total={summary.items_total} new={summary.items_new} "
+                f"updated={summary.items_updated} failed={summary.items_failed}"
+            )
+        if outcome.error and not outcome.ok:
+            line += f"  error={outcome.error}"
+        lines.append(line)
+
+    passed = sum(outcome.ok for outcome in outcomes)
+    failed = [outcome.retailer for outcome in outcomes if not outcome.ok]
+    footer = f"=== Summary: {passed} passed, {len(failed)} failed"
+    if elapsed_seconds is not None:
+        footer += f" in {elapsed_seconds:.1f}s"
+    lines.append(footer + " ===")
+    if failed:
+        lines.append("Failed retailers: " + " ".join(failed))
+    return "\n".join(lines)
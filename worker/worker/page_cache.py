@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+V = TypeVar("V")
+
+DEFAULT_PAGE_CACHE_ENTRIES = 512
+DEFAULT_PAGE_CACHE_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class PageCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    consumed: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class PageCache(Generic[V]):
+    """Thread-safe LRU bounded by entry count and estimated size.
+
+    Parsed pages only need to live from ``parse_listing`` until ``fetch_detail``
+    takes them, so ``take`` removes the entry. Pinned entries count towards the
+    bounds but are never evicted, only taken or cleared; unpinned ones age out
+    once either bound is reached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_PAGE_CACHE_ENTRIES,
+        max_bytes: int = DEFAULT_PAGE_CACHE_BYTES,
+        sizer: Callable[[V], int] = lambda _value: 1,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self.sizer = sizer
+        self.stats = PageCacheStats()
+        self._entries: OrderedDict[str, tuple[V, int, bool]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: V, pinned: bool = False) -> None:
+        size = self.sizer(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.stats.bytes -= previous[1]
+            self._entries[key] = (value, size, pinned)
+            self.stats.bytes += size
+            while len(self._entries) > self.max_entries or (self.stats.bytes > self.max_bytes and len(self._entries) > 1):
+                victim = next((entry_key for entry_key, entry in self._entries.items() if not entry[2]), None)
+                if victim is None:
+                    break
+                self.stats.bytes -= self._entries.pop(victim)[1]
+                self.stats.evictions += 1
+            self.stats.entries = len(self._entries)
+
+    def get(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry[0]
+
+    def take(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self.stats.consumed += 1
+            self.stats.bytes -= entry[1]
+            self.stats.entries = len(self._entries)
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.stats.bytes = 0
+            self.stats.entries = 0
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __getitem__(self, key: str) -> V:
+        with self._lock:
+            return self._entries[key][0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
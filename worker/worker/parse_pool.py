@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from worker.fetchers.rate_limit import HostRateLimiter, InProcessRateLimitBackend
+
+if TYPE_CHECKING:
+    from worker.adapters.live_base import LiveRetailerAdapter, ParsedProductPage
+
+# One parser-only adapter per (class, options) in each worker process.
+_WORKER_ADAPTERS: dict[tuple[type, tuple[tuple[str, Any], ...]], LiveRetailerAdapter] = {}
+
+
+def _worker_adapter(adapter_cls: type[LiveRetailerAdapter], options: dict[str, Any]) -> LiveRetailerAdapter:
+    key = (adapter_cls, tuple(sorted((name, _freeze(value)) for name, value in options.items())))
+    adapter = _WORKER_ADAPTERS.get(key)
+    if adapter is None:
+        adapter = adapter_cls(
+            use_fixture_fallback=False,
+            rate_limiter=HostRateLimiter(InProcessRateLimitBackend()),
+            **options,
+        )
+        _WORKER_ADAPTERS[key] = adapter
+    return adapter
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def parse_product_html_job(
+    adapter_cls: type[LiveRetailerAdapter],
+    options: dict[str, Any],
+    url: str,
+    source_product_id: str,
+    html: str,
+) -> ParsedProductPage:
+    return _worker_adapter(adapter_cls, options)._parse_product_html(url, source_product_id, html)
+
+
+class ProductParsePool:
+    """Runs product-page extraction in worker processes.
+
+    Fetching and database writes stay on the calling thread; bodies are shipped
+    to the pool and come back as picklable ``ParsedProductPage`` objects (or the
+    exception the extractor raised).
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = max(1, workers)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(
+        self, adapter: LiveRetailerAdapter, url: str, source_product_id: str, html: str
+    ) -> Future[ParsedProductPage]:
+        return self._executor.submit(
+            parse_product_html_job,
+            type(adapter),
+            adapter.parser_options(),
+            url,
+            source_product_id,
+            html,
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
@@ -1,76 +1,450 @@
 from __future__ import annotations
 
+import logging
 import re
+from collections.abc import Iterator
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from decimal import Decimal
 
-from sqlalchemy import and_, select
+from sqlalchemy import and_, bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from worker.adapters.base import SourceAdapter
-from worker.matching.normalization import normalize_text
-from worker.matching.engine import MatchingEngine
-from worker.models import IngestionRun, LatestPrice, Price, Product, Retailer, RetailerProduct
+from worker.adapters.base import NormalizedRetailerProduct, RawListing, SourceAdapter
+from worker.frontier import CrawlFrontier
+from worker.matching.normalization import name_tokens, normalize_identifier, normalize_text
+from worker.matching.engine import MatchingEngine, MatchResult
+from worker.matching.identity import identifier_key
+from worker.models import IngestionRun, IngestionRunItem, LatestPrice, Price, Product, Retailer, RetailerProduct, new_id
+from worker.recrawl import recrawl_queue
+from worker.stages import DEFAULT_STAGE_QUEUE_SIZE, Stage, StagedPipeline, StageError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WRITE_BATCH_SIZE = 50
+DEFAULT_COMMIT_EVERY = 200
+LATEST_PRICE_COLUMNS = ("price_id", "price_nzd", "promo_price_nzd", "promo_text", "discount_pct", "captured_at")
+PRICE_KEY_COLUMNS = ("price_nzd", "promo_price_nzd", "promo_text", "discount_pct")
+PriceKey = tuple[Decimal | None, Decimal | None, str | None, Decimal | None]
+EXACT_TIERS = ("gtin", "model", "manual_override")
+
+
+@dataclass
+class CatalogueChanges:
+    """Products created or updated earlier in a batch, indexed by what they can change about a later match."""
+
+    product_ids: set[str] = field(default_factory=set)
+    blocks: dict[tuple[str, str, str], dict[str, None]] = field(default_factory=dict)
+    identifiers: set[tuple[str, str]] = field(default_factory=set)
+
+    def record(self, product: Product) -> None:
+        self.product_ids.add(product.id)
+        block = (product.vertical, (product.brand or "").lower(), (product.category or "").lower())
+        self.blocks.setdefault(block, {})[product.id] = None
+        for key, raw in (
+            (product.gtin_key, product.gtin),
+            (product.mpn_key, product.mpn),
+            (product.model_key, product.model_number),
+        ):
+            identifier = identifier_key(key, raw)
+            if identifier:
+                self.identifiers.add((product.vertical, identifier))
+
+    def invalidates(self, item: NormalizedRetailerProduct, match: MatchResult) -> bool:
+        """Whether the item must be matched from scratch: its match changed or an exact tier may now answer."""
+        if match.product_id in self.product_ids:
+            return True
+        return any(
+            (item.vertical, identifier) in self.identifiers
+            for identifier in (
+                normalize_identifier(item.gtin),
+                normalize_identifier(item.mpn),
+                normalize_identifier(item.model_number),
+            )
+            if identifier
+        )
+
+    def in_block(self, item: NormalizedRetailerProduct) -> list[str]:
+        return list(self.blocks.get((item.vertical, item.brand.lower(), item.category.lower()), ()))
+
+    def clear(self) -> None:
+        self.product_ids.clear()
+        self.blocks.clear()
+        self.identifiers.clear()
 
 
 class IngestionPipeline:
-    def __init__(self, db: Session, adapter: SourceAdapter) -> None:
+    def __init__(
+        self,
+        db: Session,
+        adapter: SourceAdapter,
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        collapse_unchanged_prices: bool = True,
+        listing_workers: int = 1,
+        detail_workers: int = 1,
+        queue_size: int = DEFAULT_STAGE_QUEUE_SIZE,
+        recrawl: bool = False,
+        commit_every: int = DEFAULT_COMMIT_EVERY,
+        resume_run_id: str | None = None,
+        match_workers: int = 1,
+    ) -> None:
         self.db = db
         self.adapter = adapter
-        self.matcher = MatchingEngine(db)
+        self.matcher = MatchingEngine(db, workers=match_workers)
+        self.batch_size = max(1, batch_size)
+        # When set, a run that sees the current price again extends that Price
+        # row's interval instead of appending a duplicate row.
+        self.collapse_unchanged_prices = collapse_unchanged_prices
+        self.listing_workers = max(1, listing_workers)
+        self.detail_workers = max(1, detail_workers)
+        self.queue_size = max(1, queue_size)
+        # Revisit the best-scoring known listings instead of discovering URLs.
+        self.recrawl = recrawl
+        # Progress is committed after this many written items (0 commits once, at the end).
+        self.commit_every = max(0, commit_every)
+        self.resume_run_id = resume_run_id
+        self._processed: set[str] = set()
+        self._resumed: frozenset[str] = frozenset()
+        self._uncommitted = 0
+        self._changes = CatalogueChanges()
 
     def run(self) -> IngestionRun:
         retailer = self.db.execute(select(Retailer).where(Retailer.slug == self.adapter.retailer_slug)).scalar_one_or_none()
         if not retailer:
             raise ValueError(f"Retailer {self.adapter.retailer_slug} not found")
 
-        run = IngestionRun(retailer_id=retailer.id, status="running", items_total=0, items_new=0, items_updated=0, items_failed=0)
-        self.db.add(run)
-        self.db.flush()
-
+        run = self._start_run(retailer.id)
+        frontier = CrawlFrontier(self.db, retailer.id)
+        pending: list[NormalizedRetailerProduct] = []
         try:
-            pages = self.adapter.list_pages()
-            for page in pages:
-                try:
-                    listings = self.adapter.parse_listing(page)
-                except Exception:
-                    run.items_failed += 1
-                    continue
-                for listing in listings:
-                    run.items_total += 1
-                    try:
-                        detail = self.adapter.fetch_detail(listing)
-                        normalized = self.adapter.normalize(listing, detail)
-                        is_new = self._upsert_item(retailer.id, normalized)
-                        if is_new:
-                            run.items_new += 1
-                        else:
-                            run.items_updated += 1
-                    except Exception:
+            # Inside the try so a failure here still finishes the committed run as failed.
+            frontier.sync()
+            self.adapter.frontier = frontier
+            self.adapter.skip_products(self._resumed)
+            if self.recrawl:
+                self._plan_recrawl(retailer.id)
+
+            # Adapter work (discovery, fetching, parsing, normalising) runs in stage
+            # threads; matching and writes stay on this thread, which owns the session.
+            stages = StagedPipeline(
+                self._unprocessed_pages if self._resumed else self.adapter.list_pages,
+                [
+                    Stage("listing", self.adapter.parse_listing, workers=self.listing_workers),
+                    Stage("detail", self._normalize_listing, workers=self.detail_workers),
+                ],
+                queue_size=self.queue_size,
+            )
+            try:
+                for result in stages:
+                    if isinstance(result, StageError):
+                        if result.stage == "detail":
+                            run.items_total += 1
                         run.items_failed += 1
+                        continue
+                    run.items_total += 1
+                    pending.append(result)
+                    if len(pending) >= self.batch_size:
+                        self._write_items(retailer.id, pending, run)
+                        pending = []
+                        self._checkpoint()
+            finally:
+                stages.close()
+                self._write_items(retailer.id, pending, run)
 
             run.status = "completed"
         except Exception as exc:
             run.status = "failed"
             run.error_summary = str(exc)
         finally:
+            frontier.sync()
             run.finished_at = datetime.now(timezone.utc)
             self.db.commit()
 
         return run
 
+    def _start_run(self, retailer_id: int) -> IngestionRun:
+        self._processed = set()
+        if self.resume_run_id is None:
+            run = IngestionRun(retailer_id=retailer_id, status="running", items_total=0, items_new=0, items_updated=0, items_failed=0)
+            self.db.add(run)
+        else:
+            run = self.db.get(IngestionRun, self.resume_run_id)
+            if run is None or run.retailer_id != retailer_id:
+                raise ValueError(f"Ingestion run {self.resume_run_id} not found for {self.adapter.retailer_slug}")
+            if run.status == "completed":
+                raise ValueError(f"Ingestion run {run.id} already completed")
+            run.status, run.error_summary, run.finished_at = "running", None, None
+            self._processed = set(
+                self.db.scalars(select(IngestionRunItem.source_product_id).where(IngestionRunItem.run_id == run.id))
+            )
+            logger.info("Resuming run %s; skipping %s processed items", run.id, len(self._processed))
+        self._resumed = frozenset(self._processed)
+        self._uncommitted = 0
+        # Backfilled outside the batch savepoints so a failed batch cannot roll the keys back.
+        self.matcher.blocking.backfill()
+        # Committed up front so a run that dies before its first checkpoint can still be resumed.
+        self.db.commit()
+        logger.info("Ingestion run %s for %s is running", run.id, self.adapter.retailer_slug)
+        return run
+
+    def _unprocessed_pages(self) -> Iterator[dict[str, object]]:
+        # Catches adapters that ignore skip_products.
+        for page in self.adapter.list_pages():
+            if page.get("source_product_id") not in self._resumed:
+                yield page
+
+    def _revised_match(self, item: NormalizedRetailerProduct, match: MatchResult) -> MatchResult | None:
+        """Brings a match made before the batch was written up to date with the products written since.
+
+        Only items whose match or identifiers were touched are matched again; a
+        fuzzy or new match is compared against the products changed in its block.
+        """
+        if self._changes.invalidates(item, match):
+            return None
+        if match.tier in EXACT_TIERS:
+            return match
+        changed = self._changes.in_block(item)
+        return self.matcher.rescore(item, match, changed) if changed else match
+
+    def _checkpoint(self) -> None:
+        if not self.commit_every or self._uncommitted < self.commit_every:
+            return
+        if self.adapter.frontier is not None:
+            self.adapter.frontier.sync()
+        self.db.commit()
+        self._uncommitted = 0
+
+    def _record_processed(self, run_id: str, source_ids: list[str]) -> None:
+        fresh = [source_id for source_id in dict.fromkeys(source_ids) if source_id not in self._processed]
+        if fresh:
+            self.db.execute(insert(IngestionRunItem), [{"run_id": run_id, "source_product_id": source_id} for source_id in fresh])
+            self._processed.update(fresh)
+
+    def _plan_recrawl(self, retailer_id: int) -> None:
+        queue = recrawl_queue(self.db, retailer_id, limit=getattr(self.adapter, "max_products", None))
+        if not queue:
+            logger.info("No known listings for %s; running discovery instead", self.adapter.retailer_slug)
+        elif not self.adapter.plan_recrawl([candidate.page() for candidate in queue]):
+            logger.info("%s cannot recrawl by URL; running discovery instead", self.adapter.retailer_slug)
+
+    def _normalize_listing(self, listing: RawListing) -> list[NormalizedRetailerProduct]:
+        if listing.source_product_id in self._resumed:
+            return []
+        return [self.adapter.normalize(listing, self.adapter.fetch_detail(listing))]
+
+    def _write_items(self, retailer_id: int, items: list[NormalizedRetailerProduct], run: IngestionRun) -> None:
+        if not items:
+            return
+        if self.adapter.frontier is not None:
+            self.adapter.frontier.sync()
+        outcomes: list[bool | None]
+        if len(items) == 1 or self.batch_size == 1:
+            outcomes = self._upsert_items_individually(retailer_id, items)
+        else:
+            try:
+                with self.db.begin_nested():
+                    outcomes = list(self._upsert_batch(retailer_id, items))
+            except Exception:
+                # Replay one item per savepoint so a bad row only fails itself.
+                logger.warning("Batched write of %s items failed; retrying item by item", len(items), exc_info=True)
+                # Profiles may hold attributes from the rolled-back writes.
+                self.matcher.profiles.clear()
+                outcomes = self._upsert_items_individually(retailer_id, items)
+
+        for is_new in outcomes:
+            if is_new is None:
+                run.items_failed += 1
+            elif is_new:
+                run.items_new += 1
+            else:
+                run.items_updated += 1
+        self._record_processed(
+            run.id, [item.source_product_id for item, is_new in zip(items, outcomes) if is_new is not None]
+        )
+        self._uncommitted += len(items)
+
+    def _upsert_items_individually(self, retailer_id: int, items: list[NormalizedRetailerProduct]) -> list[bool | None]:
+        outcomes: list[bool | None] = []
+        for normalized in items:
+            try:
+                with self.db.begin_nested():
+                    outcomes.append(self._upsert_item(retailer_id, normalized))
+            except Exception:
+                outcomes.append(None)
+        return outcomes
+
+    def _upsert_batch(self, retailer_id: int, items: list[NormalizedRetailerProduct]) -> list[bool]:
+        source_ids = {item.source_product_id for item in items}
+        retailer_products = {
+            retailer_product.source_product_id: retailer_product
+            for retailer_product in self.db.execute(
+                select(RetailerProduct).where(
+                    and_(RetailerProduct.retailer_id == retailer_id, RetailerProduct.source_product_id.in_(source_ids))
+                )
+            ).scalars()
+        }
+        existing_ids = [retailer_product.id for retailer_product in retailer_products.values()]
+        product_ids = {retailer_product.product_id for retailer_product in retailer_products.values()}
+        if product_ids:
+            # Loaded into the identity map so matched products resolve without a query each.
+            self.db.execute(select(Product).where(Product.id.in_(product_ids))).scalars().all()
+        previous: dict[str, tuple[PriceKey, str | None]] = {}
+        if existing_ids:
+            previous = {
+                latest.retailer_product_id: (
+                    self._price_key(latest.price_nzd, latest.promo_price_nzd, latest.promo_text, latest.discount_pct),
+                    latest.price_id,
+                )
+                for latest in self.db.execute(
+                    select(
+                        LatestPrice.retailer_product_id,
+                        LatestPrice.price_id,
+                        LatestPrice.price_nzd,
+                        LatestPrice.promo_price_nzd,
+                        LatestPrice.promo_text,
+                        LatestPrice.discount_pct,
+                    ).where(LatestPrice.retailer_product_id.in_(existing_ids))
+                )
+            }
+
+        matches = self.matcher.match_many(
+            items,
+            [
+                retailer_products[item.source_product_id].id if item.source_product_id in retailer_products else None
+                for item in items
+            ],
+        )
+        self._changes.clear()
+
+        outcomes: list[bool] = []
+        new_prices: dict[str, dict[str, object]] = {}
+        extended: list[dict[str, object]] = []
+        latest_rows: dict[str, dict[str, object]] = {}
+        for normalized, match in zip(items, matches):
+            retailer_product, is_new = self._stage_item(
+                retailer_id,
+                normalized,
+                retailer_products.get(normalized.source_product_id),
+                self._revised_match(normalized, match),
+            )
+            retailer_products[normalized.source_product_id] = retailer_product
+            outcomes.append(is_new)
+
+            row = self._price_values(normalized)
+            key = self._price_key(*(row[column] for column in PRICE_KEY_COLUMNS))
+            before_key, price_id = previous.get(retailer_product.id, (None, None))
+            if before_key is not None and self.adapter.frontier is not None and before_key[:2] != key[:2]:
+                self.adapter.frontier.mark_changed(normalized.url)
+            if self.collapse_unchanged_prices and price_id and before_key == key:
+                pending = new_prices.get(price_id)
+                if pending is not None:
+                    pending["last_seen_at"] = row["captured_at"]
+                    pending["observed_count"] += 1  # type: ignore[operator]
+                else:
+                    extended.append({"interval_id": price_id, "seen_at": row["captured_at"]})
+            else:
+                price_id = new_id()
+                new_prices[price_id] = {
+                    "id": price_id,
+                    "retailer_product_id": retailer_product.id,
+                    "last_seen_at": row["captured_at"],
+                    "observed_count": 1,
+                    **row,
+                }
+            previous[retailer_product.id] = (key, price_id)
+            latest_rows[retailer_product.id] = {"retailer_product_id": retailer_product.id, "price_id": price_id, **row}
+
+        self.db.flush()
+        if new_prices:
+            self.db.execute(insert(Price), list(new_prices.values()))
+        if extended:
+            prices = Price.__table__
+            self.db.execute(
+                update(prices)
+                .where(prices.c.id == bindparam("interval_id"))
+                .values(last_seen_at=bindparam("seen_at"), observed_count=prices.c.observed_count + 1),
+                extended,
+            )
+        self._upsert_latest_prices(list(latest_rows.values()))
+        return outcomes
+
+    def _upsert_latest_prices(self, rows: list[dict[str, object]]) -> None:
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            statement = postgresql.insert(LatestPrice)
+        elif dialect == "sqlite":
+            statement = sqlite.insert(LatestPrice)
+        else:
+            for row in rows:
+                self.db.merge(LatestPrice(**row))
+            self.db.flush()
+            return
+        statement = statement.on_conflict_do_update(
+            index_elements=[LatestPrice.retailer_product_id],
+            set_={column: statement.excluded[column] for column in LATEST_PRICE_COLUMNS},
+        )
+        self.db.execute(statement, rows)
+
     def _upsert_item(self, retailer_id: int, normalized) -> bool:
         retailer_product = self.db.execute(
             select(RetailerProduct).where(
                 and_(RetailerProduct.retailer_id == retailer_id, RetailerProduct.source_product_id == normalized.source_product_id)
             )
         ).scalar_one_or_none()
+        retailer_product, is_new = self._stage_item(retailer_id, normalized, retailer_product)
+
+        values = self._price_values(normalized)
+        # populate_existing: batched writes upsert LatestPrice without touching loaded instances.
+        latest = self.db.get(LatestPrice, retailer_product.id, populate_existing=True)
+        interval = self._current_interval(latest, values)
+        if interval is not None:
+            interval.last_seen_at = values["captured_at"]  # type: ignore[assignment]
+            interval.observed_count = (interval.observed_count or 1) + 1
+        else:
+            interval = Price(
+                id=new_id(),
+                retailer_product_id=retailer_product.id,
+                last_seen_at=values["captured_at"],
+                observed_count=1,
+                **values,
+            )
+            self.db.add(interval)
+
+        if latest is None:
+            latest = LatestPrice(retailer_product_id=retailer_product.id, price_id=interval.id, **values)
+            self.db.add(latest)
+        else:
+            if self.adapter.frontier is not None and (
+                latest.price_nzd != values["price_nzd"] or latest.promo_price_nzd != values["promo_price_nzd"]
+            ):
+                self.adapter.frontier.mark_changed(normalized.url)
+            latest.price_id = interval.id
+            latest.price_nzd = values["price_nzd"]  # type: ignore[assignment]
+            latest.promo_price_nzd = values["promo_price_nzd"]  # type: ignore[assignment]
+            latest.promo_text = values["promo_text"]  # type: ignore[assignment]
+            latest.discount_pct = values["discount_pct"]  # type: ignore[assignment]
+            latest.captured_at = values["captured_at"]  # type: ignore[assignment]
+
+        self.db.flush()
+        return is_new
 
-        retailer_product_id = retailer_product.id if retailer_product else None
-        match = self.matcher.match(normalized, retailer_product_id=retailer_product_id)
+    def _stage_item(
+        self,
+        retailer_id: int,
+        normalized,
+        retailer_product: RetailerProduct | None,
+        match: MatchResult | None = None,
+    ) -> tuple[RetailerProduct, bool]:
+        if match is None:
+            retailer_product_id = retailer_product.id if retailer_product else None
+            match = self.matcher.match(normalized, retailer_product_id=retailer_product_id)
 
         product_id = match.product_id
         product = self.db.get(Product, product_id) if product_id else None
+        if product_id and product is None:
+            # Created by a write that was rolled back since it was indexed.
+            self.matcher.forget(product_id)
         if not product_id or product is None:
             merged_attributes = self._merge_attributes(normalized.attributes, normalized.raw_attributes)
             product = Product(
@@ -90,10 +464,16 @@ class IngestionPipeline:
                     existing_text="",
                 ),
             )
+            self._normalize_columns(product)
             self.db.add(product)
+            # Flushed straight away so later items in the same batch can match it.
             self.db.flush()
+            self.matcher.register(product)
+            self._changes.record(product)
             product_id = product.id
         else:
+            match_keys = self._match_keys(product)
+            attributes = product.attributes
             if normalized.image_url and not product.image_url:
                 product.image_url = normalized.image_url
             if normalized.model_number and not product.model_number:
@@ -124,9 +504,20 @@ class IngestionPipeline:
                 raw_attributes=normalized.raw_attributes,
                 existing_text=product.searchable_text or "",
             )
+            reblock = self._match_keys(product) != match_keys
+            if reblock or not product.normalized_name:
+                self._normalize_columns(product)
+            if reblock or product.attributes != attributes:
+                self._changes.record(product)
+            if reblock:
+                # Fuzzy matching queries these columns; later items must see the new values.
+                self.db.flush()
+            # Re-keyed identifiers and merged pharma variant attributes take effect for later items.
+            self.matcher.register(product, reblock=reblock)
 
         if retailer_product is None:
             retailer_product = RetailerProduct(
+                id=new_id(),
                 retailer_id=retailer_id,
                 product_id=product_id,
                 source_product_id=normalized.source_product_id,
@@ -137,7 +528,6 @@ class IngestionPipeline:
                 availability=normalized.availability,
             )
             self.db.add(retailer_product)
-            self.db.flush()
             is_new = True
         else:
             retailer_product.product_id = product_id
@@ -148,36 +538,46 @@ class IngestionPipeline:
             retailer_product.availability = normalized.availability
             is_new = False
 
-        price = Price(
-            retailer_product_id=retailer_product.id,
-            price_nzd=Decimal(str(normalized.price_nzd)),
-            promo_price_nzd=Decimal(str(normalized.promo_price_nzd)) if normalized.promo_price_nzd is not None else None,
-            promo_text=normalized.promo_text,
-            discount_pct=Decimal(str(normalized.discount_pct)) if normalized.discount_pct is not None else None,
-            captured_at=normalized.captured_at,
-        )
-        self.db.add(price)
+        return retailer_product, is_new
 
-        latest = self.db.get(LatestPrice, retailer_product.id)
-        if latest is None:
-            latest = LatestPrice(
-                retailer_product_id=retailer_product.id,
-                price_nzd=price.price_nzd,
-                promo_price_nzd=price.promo_price_nzd,
-                promo_text=price.promo_text,
-                discount_pct=price.discount_pct,
-                captured_at=price.captured_at,
-            )
-            self.db.add(latest)
-        else:
-            latest.price_nzd = price.price_nzd
-            latest.promo_price_nzd = price.promo_price_nzd
-            latest.promo_text = price.promo_text
-            latest.discount_pct = price.discount_pct
-            latest.captured_at = price.captured_at
+    def _current_interval(self, latest: LatestPrice | None, values: dict[str, object]) -> Price | None:
+        if not self.collapse_unchanged_prices or latest is None or latest.price_id is None:
+            return None
+        current = self._price_key(latest.price_nzd, latest.promo_price_nzd, latest.promo_text, latest.discount_pct)
+        if current != self._price_key(*(values[column] for column in PRICE_KEY_COLUMNS)):
+            return None
+        return self.db.get(Price, latest.price_id)
 
-        self.db.flush()
-        return is_new
+    @staticmethod
+    def _price_key(price_nzd, promo_price_nzd, promo_text, discount_pct) -> PriceKey:
+        # Columns are Numeric(…, 2); compare at stored precision so re-seen prices collapse.
+        def cents(value) -> Decimal | None:
+            return Decimal(value).quantize(Decimal("0.01")) if value is not None else None
+
+        return (cents(price_nzd), cents(promo_price_nzd), promo_text, cents(discount_pct))
+
+    @staticmethod
+    def _match_keys(product: Product) -> tuple[str | None, ...]:
+        return (product.gtin, product.mpn, product.model_number, product.brand, product.category, product.vertical)
+
+    @staticmethod
+    def _normalize_columns(product: Product) -> None:
+        """Stores the normalized name and identifiers matching and search compare against."""
+        product.normalized_name = normalize_text(product.canonical_name)
+        product.name_tokens = name_tokens(product.canonical_name)
+        product.gtin_key = normalize_identifier(product.gtin)
+        product.mpn_key = normalize_identifier(product.mpn)
+        product.model_key = normalize_identifier(product.model_number)
+
+    @staticmethod
+    def _price_values(normalized) -> dict[str, object]:
+        return {
+            "price_nzd": Decimal(str(normalized.price_nzd)),
+            "promo_price_nzd": Decimal(str(normalized.promo_price_nzd)) if normalized.promo_price_nzd is not None else None,
+            "promo_text": normalized.promo_text,
+            "discount_pct": Decimal(str(normalized.discount_pct)) if normalized.discount_pct is not None else None,
+            "captured_at": normalized.captured_at,
+        }
 
     def _merge_attributes(self, base: dict[str, object] | None, incoming: dict[str, object] | None) -> dict[str, object]:
         merged = dict(base or {})
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import heapq
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import Select, Subquery, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from worker.models import LatestPrice, Price, Product, RetailerProduct, utc_now
+
+# Staleness is scaled to [0, 1] over this many days. At full weight it stays below a
+# listing whose price changes on half of its crawls, so neglect alone cannot outrank volatility.
+MAX_STALE_DAYS = 14.0
+
+
+@dataclass(frozen=True)
+class RecrawlWeights:
+    staleness: float = 1.5
+    volatility: float = 4.0
+    promo: float = 1.5
+    demand: float = 0.5
+
+
+@dataclass(frozen=True)
+class RecrawlCandidate:
+    retailer_product_id: str
+    source_product_id: str
+    url: str
+    score: float
+    stale_days: float
+    change_rate: float
+    on_promo: bool
+    view_count: int
+
+    def page(self) -> dict[str, object]:
+        return {"url": self.url, "source_product_id": self.source_product_id}
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def price_changes(listings: Select | None = None) -> Subquery:
+    """``prices`` rows with ``changed`` set when the row's price differs from the listing's previous row.
+
+    A listing's first row counts as changed. Comparing rows rather than counting
+    them keeps the rate right when ``collapse_unchanged_prices`` is off and every
+    observation has its own row. ``listings`` limits the rows to those ids.
+    """
+    window = {"partition_by": Price.retailer_product_id, "order_by": (Price.captured_at, Price.id)}
+    columns = (Price.price_nzd, Price.promo_price_nzd, Price.promo_text, Price.discount_pct)
+    changed = case(
+        (func.lag(Price.id).over(**window).is_(None), 1),
+        (or_(*(column.is_distinct_from(func.lag(column).over(**window)) for column in columns)), 1),
+        else_=0,
+    )
+    stmt = select(
+        Price.id,
+        Price.retailer_product_id,
+        Price.captured_at,
+        Price.last_seen_at,
+        Price.observed_count,
+        changed.label("changed"),
+    )
+    if listings is not None:
+        stmt = stmt.where(Price.retailer_product_id.in_(listings))
+    return stmt.subquery()
+
+
+def recrawl_queue(
+    db: Session,
+    retailer_id: int,
+    limit: int | None = None,
+    weights: RecrawlWeights | None = None,
+    now: datetime | None = None,
+) -> list[RecrawlCandidate]:
+    """Known listings of a retailer, best recrawl candidates first.
+
+    Each listing scores days since its price was last captured (as a share of
+    ``MAX_STALE_DAYS``), the share of
+    its observations that found a new price, whether it is on promotion (promos
+    end) and log-scaled detail views of its product from the API.
+    """
+    weights = weights or RecrawlWeights()
+    now = now or utc_now()
+    prices = price_changes(select(RetailerProduct.id).where(RetailerProduct.retailer_id == retailer_id))
+    history = (
+        select(
+            prices.c.retailer_product_id,
+            func.max(func.coalesce(prices.c.last_seen_at, prices.c.captured_at)).label("last_seen_at"),
+            func.sum(prices.c.changed).label("changes"),
+            func.sum(prices.c.observed_count).label("observations"),
+        )
+        .group_by(prices.c.retailer_product_id)
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            RetailerProduct.id,
+            RetailerProduct.source_product_id,
+            RetailerProduct.url,
+            history.c.last_seen_at,
+            history.c.changes,
+            history.c.observations,
+            LatestPrice.promo_price_nzd,
+            LatestPrice.promo_text,
+            Product.view_count,
+        )
+        .outerjoin(history, history.c.retailer_product_id == RetailerProduct.id)
+        .outerjoin(LatestPrice, LatestPrice.retailer_product_id == RetailerProduct.id)
+        .outerjoin(Product, Product.id == RetailerProduct.product_id)
+        .where(RetailerProduct.retailer_id == retailer_id)
+    )
+
+    candidates = []
+    for rp_id, source_product_id, url, last_seen_at, changes, observations, promo_price, promo_text, views in rows:
+        if last_seen_at is None:
+            stale_days = MAX_STALE_DAYS
+        else:
+            stale_days = min(MAX_STALE_DAYS, max(0.0, (now - _as_utc(last_seen_at)).total_seconds() / 86400))
+        # The first row is the listing being found, not a price change.
+        change_rate = (changes - 1) / observations if changes and observations else 0.0
+        on_promo = promo_price is not None or bool(promo_text)
+        view_count = int(views or 0)
+        score = (
+            weights.staleness * stale_days / MAX_STALE_DAYS
+            + weights.volatility * change_rate
+            + weights.promo * on_promo
+            + weights.demand * math.log1p(view_count)
+        )
+        candidates.append(
+            RecrawlCandidate(rp_id, source_product_id, url, score, stale_days, change_rate, on_promo, view_count)
+        )
+
+    if limit is None:
+        return sorted(candidates, key=lambda candidate: candidate.score, reverse=True)
+    return heapq.nlargest(max(0, limit), candidates, key=lambda candidate: candidate.score)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from worker.adapters.base import SourceAdapter
+from worker.models import IngestionRun, Price, Retailer, RetailerProduct
+from worker.recrawl import price_changes
+
+if TYPE_CHECKING:
+    from worker.main import RunSummary
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_INTERVAL = timedelta(hours=1)
+DEFAULT_MAX_INTERVAL = timedelta(hours=24)
+DEFAULT_VOLATILITY_WINDOW = timedelta(days=14)
+# Share of observations finding a new price at which a retailer is crawled at the minimum interval.
+DEFAULT_SATURATION_CHANGE_RATE = 0.25
+# Upper bound on one idle wait so a stop request or clock jump is noticed.
+MAX_IDLE_SECONDS = 60.0
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class RetailerVolatility:
+    changes: int
+    observations: int
+
+    @property
+    def change_rate(self) -> float | None:
+        if self.observations <= 0:
+            return None
+        return min(1.0, self.changes / self.observations)
+
+
+@dataclass(frozen=True)
+class CadencePolicy:
+    min_interval: timedelta = DEFAULT_MIN_INTERVAL
+    max_interval: timedelta = DEFAULT_MAX_INTERVAL
+    window: timedelta = DEFAULT_VOLATILITY_WINDOW
+    saturation: float = DEFAULT_SATURATION_CHANGE_RATE
+
+    def interval(self, change_rate: float | None) -> timedelta:
+        """Geometric step from ``max_interval`` (prices never move) to ``min_interval`` (at ``saturation``).
+
+        A retailer without price history is crawled at ``min_interval`` until it has some.
+        """
+        low = min(self.min_interval, self.max_interval)
+        high = max(self.min_interval, self.max_interval)
+        if change_rate is None or self.saturation <= 0:
+            return low
+        share = min(1.0, max(0.0, change_rate) / self.saturation)
+        return high * ((low / high) ** share)
+
+
+def retailer_volatility(db: Session, since: datetime) -> dict[str, RetailerVolatility]:
+    """Price changes since ``since`` against observations made since then.
+
+    A change is a row whose price differs from the listing's previous row, so the
+    ratio is the share of crawled prices that differed from the previous crawl
+    whether or not unchanged prices are collapsed into intervals. A listing seen
+    for the first time counts as a change.
+    Observations carry no timestamps of their own, so an interval opened before
+    ``since`` contributes its count prorated by the share of its span inside the
+    window, assuming evenly spaced crawls.
+    """
+    seen_at = func.coalesce(Price.last_seen_at, Price.captured_at)
+    prices = price_changes(select(Price.retailer_product_id).where(seen_at >= since))
+    opened = db.execute(
+        select(Retailer.slug, func.sum(prices.c.changed), func.sum(prices.c.observed_count))
+        .join(RetailerProduct, RetailerProduct.retailer_id == Retailer.id)
+        .join(prices, prices.c.retailer_product_id == RetailerProduct.id)
+        .where(prices.c.captured_at >= since)
+        .group_by(Retailer.slug)
+    )
+    changes: dict[str, int] = {}
+    observations: dict[str, float] = {}
+    for slug, count, observed in opened:
+        changes[slug] = int(count or 0)
+        observations[slug] = float(observed or 0)
+    straddling = db.execute(
+        select(Retailer.slug, Price.captured_at, seen_at, Price.observed_count)
+        .join(RetailerProduct, RetailerProduct.retailer_id == Retailer.id)
+        .join(Price, Price.retailer_product_id == RetailerProduct.id)
+        .where(Price.captured_at < since, seen_at >= since)
+    )
+    for slug, captured_at, last_seen_at, observed in straddling:
+        span = (_as_utc(last_seen_at) - _as_utc(captured_at)).total_seconds()
+        inside = (_as_utc(last_seen_at) - _as_utc(since)).total_seconds()
+        # The sighting at last_seen_at is always inside the window.
+        share = max(1.0, (observed or 1) * inside / span) if span > 0 else 1.0
+        observations[slug] = observations.get(slug, 0.0) + share
+        changes.setdefault(slug, 0)
+    return {slug: RetailerVolatility(changes[slug], round(observations[slug])) for slug in changes}
+
+
+def last_finished_runs(db: Session) -> dict[str, datetime]:
+    rows = db.execute(
+        select(Retailer.slug, func.max(IngestionRun.finished_at))
+        .join(IngestionRun, IngestionRun.retailer_id == Retailer.id)
+        .where(IngestionRun.finished_at.is_not(None))
+        .group_by(Retailer.slug)
+    )
+    return {slug: _as_utc(finished_at) for slug, finished_at in rows if finished_at is not None}
+
+
+@dataclass(frozen=True)
+class ScheduledRun:
+    retailer: str
+    status: str
+    seconds: float
+    next_run_at: datetime
+    change_rate: float | None = None
+    summary: RunSummary | None = None
+    error: str | None = None
+
+
+class WarmAdapters:
+    """Keeps one open adapter per retailer between runs so HTTP pools, browsers and caches stay warm."""
+
+    def __init__(self, build: Callable[[str], SourceAdapter]) -> None:
+        self.build = build
+        self._adapters: dict[str, SourceAdapter] = {}
+
+    def get(self, retailer: str) -> SourceAdapter:
+        adapter = self._adapters.get(retailer)
+        if adapter is None:
+            adapter = self._adapters[retailer] = self.build(retailer)
+        adapter.begin_run()
+        return adapter
+
+    def discard(self, retailer: str) -> None:
+        adapter = self._adapters.pop(retailer, None)
+        if adapter is not None:
+            adapter.close()
+
+    def close(self) -> None:
+        for retailer in list(self._adapters):
+            self.discard(retailer)
+
+    def __len__(self) -> int:
+        return len(self._adapters)
+
+
+class RecrawlScheduler:
+    """Crawls retailers one at a time, each again after an interval set by how often its prices move.
+
+    Due times start from each retailer's last finished run, so restarting the
+    daemon keeps the cadence instead of recrawling everything at once. A failed
+    run is retried after ``min_interval``.
+    """
+
+    def __init__(
+        self,
+        retailers: list[str],
+        runner: Callable[[str], RunSummary | None],
+        session_factory: Callable[[], Session],
+        policy: CadencePolicy | None = None,
+        clock: Callable[[], datetime] = _utc_now,
+    ) -> None:
+        self.retailers = list(dict.fromkeys(retailers))
+        self.runner = runner
+        self.session_factory = session_factory
+        self.policy = policy or CadencePolicy()
+        self.clock = clock
+        self._queue: list[tuple[datetime, int, str]] = []
+        self._order = itertools.count()
+
+    def plan(self) -> None:
+        now = self.clock()
+        with self.session_factory() as db:
+            finished = last_finished_runs(db)
+            volatility = retailer_volatility(db, now - self.policy.window)
+        self._queue = []
+        for retailer in self.retailers:
+            last = finished.get(retailer)
+            # Overdue retailers keep their past due time so the longest-waiting runs first.
+            self._push(last + self._interval(volatility, retailer) if last is not None else now, retailer)
+
+    def next_due(self) -> tuple[datetime, str] | None:
+        if not self._queue:
+            return None
+        due_at, _, retailer = self._queue[0]
+        return due_at, retailer
+
+    def upcoming(self) -> list[tuple[datetime, str]]:
+        return [(due_at, retailer) for due_at, _, retailer in sorted(self._queue)]
+
+    def run_next(self) -> ScheduledRun:
+        _, _, retailer = heapq.heappop(self._queue)
+        started = time.monotonic()
+        summary: RunSummary | None = None
+        error: str | None = None
+        try:
+            summary = self.runner(retailer)
+            status = summary.status if summary is not None else "completed"
+            error = summary.error_summary if summary is not None else None
+        except Exception as exc:
+            logger.exception("Scheduled run for %s failed", retailer)
+            status = "error"
+            error = f"{type(exc).__name__}: {exc}"
+        seconds = time.monotonic() - started
+
+        now = self.clock()
+        change_rate: float | None = None
+        if status == "completed":
+            with self.session_factory() as db:
+                volatility = retailer_volatility(db, now - self.policy.window).get(retailer)
+            change_rate = volatility.change_rate if volatility is not None else None
+            interval = self.policy.interval(change_rate)
+        else:
+            interval = min(self.policy.min_interval, self.policy.max_interval)
+        next_run_at = now + interval
+        self._push(next_run_at, retailer)
+        return ScheduledRun(retailer, status, seconds, next_run_at, change_rate, summary, error)
+
+    def run_forever(self, stop: threading.Event) -> None:
+        self.plan()
+        while not stop.is_set() and (upcoming := self.next_due()) is not None:
+            due_at, retailer = upcoming
+            wait = (due_at - self.clock()).total_seconds()
+            if wait > 0:
+                stop.wait(min(wait, MAX_IDLE_SECONDS))
+                continue
+            result = self.run_next()
+            rate = f"{result.change_rate:.1%}" if result.change_rate is not None else "n/a"
+            print(
+                f"[{retailer}] {result.status} in {result.seconds:.1f}s; change rate {rate}; "
+                f"next run {result.next_run_at:%Y-%m-%d %H:%M}Z",
+                flush=True,
+            )
+
+    def _interval(self, volatility: dict[str, RetailerVolatility], retailer: str) -> timedelta:
+        stats = volatility.get(retailer)
+        return self.policy.interval(stats.change_rate if stats is not None else None)
+
+    def _push(self, due_at: datetime, retailer: str) -> None:
+        heapq.heappush(self._queue, (due_at, next(self._order), retailer))
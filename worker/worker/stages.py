@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_STAGE_QUEUE_SIZE = 64
+
+_END = object()
+_POLL_SECONDS = 0.1
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+
+
+@dataclass(frozen=True)
+class StageError:
+    """Stands in for an item a stage failed on; later stages pass it through."""
+
+    stage: str
+    item: Any
+    error: Exception
+
+
+@dataclass(frozen=True)
+class _SourceFailure:
+    error: Exception
+
+
+@dataclass
+class _StageState:
+    remaining: int
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class StagedPipeline:
+    """Runs a source iterable and a chain of stages in threads joined by bounded queues.
+
+    Iterating yields the last stage's output on the calling thread. A full queue
+    blocks its producers, so no more than ``queue_size`` items wait between two
+    stages however long the source is. Each stage may run several workers; with
+    one worker per stage items keep their source order. An exception raised by
+    the source is re-raised to the consumer once everything before it drained.
+    """
+
+    def __init__(
+        self,
+        source: Callable[[], Iterable[Any]],
+        stages: list[Stage],
+        queue_size: int = DEFAULT_STAGE_QUEUE_SIZE,
+    ) -> None:
+        self.source = source
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def __iter__(self) -> Iterator[Any]:
+        queues: list[queue.Queue[Any]] = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        self._start("source", self._run_source, queues[0])
+        for stage, inbox, outbox in zip(self.stages, queues, queues[1:]):
+            state = _StageState(remaining=max(1, stage.workers))
+            for _ in range(state.remaining):
+                self._start(stage.name, self._run_stage, stage, inbox, outbox, state)
+
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is _END:
+                    return
+                if isinstance(item, _SourceFailure):
+                    raise item.error
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def _start(self, name: str, target: Callable[..., None], *args: Any) -> None:
+        thread = threading.Thread(target=target, args=args, name=f"ingest-{name}", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _run_source(self, outbox: queue.Queue[Any]) -> None:
+        try:
+            for item in self.source():
+                if not self._put(outbox, item):
+                    return
+        except Exception as exc:
+            self._put(outbox, _SourceFailure(exc))
+        self._put(outbox, _END)
+
+    def _run_stage(self, stage: Stage, inbox: queue.Queue[Any], outbox: queue.Queue[Any], state: _StageState) -> None:
+        while True:
+            item = self._get(inbox)
+            if item is None:
+                return
+            if item is _END:
+                # Hand the marker on to sibling workers; the last one out closes the stage.
+                self._put(inbox, _END)
+                with state.lock:
+                    state.remaining -= 1
+                    last = state.remaining == 0
+                if last:
+                    self._put(outbox, _END)
+                return
+            if isinstance(item, (StageError, _SourceFailure)):
+                if not self._put(outbox, item):
+                    return
+                continue
+            try:
+                for result in stage.fn(item):
+                    if not self._put(outbox, result):
+                        return
+            except Exception as exc:
+                if not self._put(outbox, StageError(stage.name, item, exc)):
+                    return
+
+    def _put(self, target: queue.Queue[Any], item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue[Any]) -> Any | None:
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+        return None